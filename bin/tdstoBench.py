@@ -0,0 +1,519 @@
+################################################################################
+# The contents of this file are Teradata Public Content
+# and have been released to the Public Domain.
+# Licensed under BSD; see "license.txt" file for more information.
+# Copyright (c) 2023 by Teradata
+################################################################################
+#
+# R And Python Analytics with SCRIPT Table Operator
+# Orange Book supplementary material
+# Alexander Kolovos - October 2026 - v.2.6
+#
+# tdstoBench: Throughput and latency benchmark of the Python example scripts
+# File     : tdstoBench.py
+#
+# Note: Present script is meant to be run on a client machine
+#
+# Runs every Python example script as a single SCRIPT instance on synthetic
+# inputs of increasing size, and records for each script and input size:
+# - rowsPerSec     : Input rows per second of wall time
+# - wallSecs       : Wall time of the instance (best of the repetitions)
+# - startupSecs    : Wall time of an instance with empty input, that is, the
+#                    time for the package imports and the model loading
+# - firstOutputSecs: Time until the first output byte of the instance
+# - peakRSSMB      : Peak resident memory of the instance
+# Each instance is started by a small launcher process, which measures the
+# times and the peak memory of the instance. The peak memory that the kernel
+# reports for a child process includes the memory of the process that started
+# it, so the memory of the benchmark process itself, such as the decoded ex3
+# models of --baseline, would otherwise count in the peak of every instance.
+# - outputBytes, outputRows: Size of the instance output
+# The synthetic inputs are drawn with a fixed seed from the example tables of
+# the data/ directory, and are formatted as the STO streams them to a script:
+# - ex1pSco.py, ex1pScoNonIter.py: Rows of ex1tblSco with unique cust_id
+# - ex2p.py     : Points of ObsGroup 1 of ex2tbl, for 7 clusters; also in
+#                 the streaming mode (case ex2pStream)
+# - ex3pFit.py  : Rows of product ID 1 of ex3tblMiniFit; also with compact
+#                 model output (case ex3pFitCompact), and in the streaming
+#                 mode (case ex3pFitStream)
+# - ex3pSco.py  : Rows of product ID 1 of ex3tblMiniSco, with the nRow column
+#                 and the model of ex3pFit.py on the first row; also with the
+#                 compact model (case ex3pScoCompact)
+# - ex3pFitSco.py: Half of the rows from ex3tblMiniFit and half from
+#                 ex3tblMiniSco, for product ID 1, with the flag column
+# - ex4pLoc.py  : Rows of the Clothing department of ex4tbl; also with the
+#                 StoreID column in the sketch mode (case ex4pLocSketch)
+# - ex4pGlb.py  : Partial department averages of one company, as produced by
+#                 ex4pLoc.py
+# - ex5p.py     : ESSCP matrix of CALCMATRIX, computed over the specified
+#                 number of rows of random data with 2 independent variables
+# - ex5pLoc.py  : The rows of random data with 2 independent variables
+#
+# Results are saved in a JSON file. Runs are compared as follows:
+# - --compare OLD.json: Flag regressions against the results of an earlier
+#   run: Throughput lower, or startup time or peak memory higher, by more
+#   than the tolerance.
+# - --baseline DIR: Check that the outputs remain numerically equivalent. The
+#   output of every script and input size is saved in the directory on the
+#   first run, and compared to the saved output on later runs. Numbers are
+#   compared with a relative tolerance; the ex3pFit.py models are compared by
+#   their coefficients.
+# The script exits with status 1 if a regression or a difference is found.
+#
+# Usage:
+#   python tdstoBench.py [--cases CASE ...] [--sizes N ...] [--repeat R]
+#          [--out FILE] [--compare OLD.json] [--baseline DIR]
+#          [--tolerance T] [--rtol R] [--scripts-dir DIR] [--all-sizes]
+# Default sizes are 1000, 10000 and 100000 rows; specify up to 10000000. Each
+# case has a maximum input size beyond which the script cannot run within
+# reasonable time or memory (see MAX_ROWS); use --all-sizes to run anyway.
+# The scripts run with TDSTO_WORKER_SOCKET=off, and with TDSTO_RANDOM_SEED set
+# for reproducible ex2p.py clusters, unless the variables are already set.
+#
+# Requires numpy. The example scripts require their own add-on packages.
+#
+################################################################################
+
+import argparse
+import base64
+import itertools
+import json
+import os
+import pickle
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import tdstoEmulate
+
+DELIMITER = '\t'
+BLOCK_ROWS = 100000
+SEED = 20260101
+
+# Launcher of a script instance: Forks and executes the command, and writes
+# the start and end times and the peak resident memory (ru_maxrss) of the
+# instance to the file of its first argument. The launcher imports no add-on
+# packages, so its own memory stays below that of any script.
+LAUNCHER = '''
+import os, sys, time
+tStart = time.perf_counter()
+pid = os.fork()
+if pid == 0:
+    os.execv(sys.argv[2], sys.argv[2:])
+_, status, usage = os.wait4(pid, 0)
+tEnd = time.perf_counter()
+with open(sys.argv[1], 'w') as fOut:
+    fOut.write('%r %r %d' % (tStart, tEnd, usage.ru_maxrss))
+code = os.waitstatus_to_exitcode(status)
+sys.exit(code if code >= 0 else 128 - code)
+'''
+
+# Largest input size per case, beyond which the script is impractical. The
+# exact silhouette coefficients of ex2p.py take time of order n^2.
+MAX_ROWS = {'ex2p': 100000, 'ex2pStream': 1000000}
+
+
+class BenchCase:
+    """A script and the generator of its synthetic input.
+
+    makeInput: Function (bench, nRows, rng) that yields blocks of input rows,
+               each row a list of text values
+    """
+
+    def __init__(self, name, script, makeInput, args=(), canonical=None):
+        self.name = name
+        self.script = script
+        self.makeInput = makeInput
+        self.args = list(args)
+        self.canonical = canonical
+
+
+def _resample(rows, nRows, rng, fix=None):
+    """Yield blocks of rows drawn at random from rows. The fix function can
+    replace values per row, given the row and its 0-based position."""
+    for start in range(0, nRows, BLOCK_ROWS):
+        idx = rng.integers(0, len(rows), min(BLOCK_ROWS, nRows - start))
+        block = [list(rows[i]) for i in idx]
+        if fix is not None:
+            for n, row in enumerate(block, start):
+                fix(row, n)
+        yield block
+
+
+def _ex1Input(bench, nRows, rng):
+    table = bench.emulator.table('ex1tblSco')
+
+    def fix(row, n):
+        row[0] = str(n + 1)
+    return _resample(table.rows, nRows, rng, fix)
+
+
+def _ex2Input(bench, nRows, rng):
+    table = bench.emulator.table('ex2tbl')
+    group = table.col('ObsGroup')
+    rows = [row for row in table.rows if row[group] == '1']
+
+    def fix(row, n):
+        row[0] = str(n + 1)
+    return _resample(rows, nRows, rng, fix)
+
+
+def _ex3Rows(bench, tableName):
+    table = bench.emulator.table(tableName)
+    return [row for row in table.rows if tdstoEmulate.keyOf(row[0]) == '1.0']
+
+
+def _ex3FitInput(bench, nRows, rng):
+    return _resample(_ex3Rows(bench, 'ex3tblMiniFit'), nRows, rng)
+
+
+def _ex3ScoInput(bench, nRows, rng, compact=False):
+    model = bench.ex3Model(compact)
+
+    def fix(row, n):
+        row.extend([str(n + 1), model if n == 0 else ''])
+    return _resample(_ex3Rows(bench, 'ex3tblMiniSco'), nRows, rng, fix)
+
+
+def _ex3ScoCompactInput(bench, nRows, rng):
+    return _ex3ScoInput(bench, nRows, rng, compact=True)
+
+
+def _ex3FitScoInput(bench, nRows, rng):
+    nFit = nRows // 2
+
+    def flag(value):
+        def fix(row, n):
+            row.append(value)
+        return fix
+    return itertools.chain(
+        _resample(_ex3Rows(bench, 'ex3tblMiniFit'), nFit, rng, flag('0')),
+        _resample(_ex3Rows(bench, 'ex3tblMiniSco'), nRows - nFit, rng,
+                  flag('1')))
+
+
+def _ex4LocInput(bench, nRows, rng, sketch=False):
+    columns = ['CompanyID', 'DepartmentID', 'Department', 'Revenue']
+    table = bench.emulator.table('ex4tbl').select(
+        columns + ['StoreID'] if sketch else columns)
+    rows = [row for row in table.rows if row[2] == 'Clothing']
+    return _resample(rows, nRows, rng)
+
+
+def _ex4LocSketchInput(bench, nRows, rng):
+    return _ex4LocInput(bench, nRows, rng, sketch=True)
+
+
+def _ex4GlbInput(bench, nRows, rng):
+    for start in range(0, nRows, BLOCK_ROWS):
+        n = min(BLOCK_ROWS, nRows - start)
+        avgRev = rng.uniform(1e6, 3e8, n)
+        nStores = rng.integers(1, 2000, n)
+        yield [['923843851', str(start + i + 1), 'Dept%d' % (start + i + 1),
+                '%.2f' % avgRev[i], str(nStores[i])] for i in range(n)]
+
+
+def _ex5Input(bench, nRows, rng):
+    # Accumulate the ESSCP matrix of [1, x1, x2, y] block by block
+    names = ['x1', 'x2', 'y']
+    sscp = np.zeros((4, 4))
+    for start in range(0, nRows, BLOCK_ROWS):
+        n = min(BLOCK_ROWS, nRows - start)
+        x = rng.uniform(0, 100, (n, 2))
+        y = 3.0 + x @ np.array([2.0, -1.5]) + rng.normal(0, 1, n)
+        data = np.column_stack([np.ones(n), x, y])
+        sscp += data.T @ data
+    # Columns: rownum, rowname, c, s, x1, x2, y
+    yield [[str(i + 1), name, '%d' % nRows]
+           + [repr(float(v)) for v in sscp[i + 1, :]]
+           for i, name in enumerate(names)]
+
+
+def _ex5LocInput(bench, nRows, rng):
+    for start in range(0, nRows, BLOCK_ROWS):
+        n = min(BLOCK_ROWS, nRows - start)
+        x = rng.uniform(0, 100, (n, 2))
+        y = 3.0 + x @ np.array([2.0, -1.5]) + rng.normal(0, 1, n)
+        yield [[repr(float(v)) for v in row]
+               for row in np.column_stack([x, y])]
+
+
+def _ex3FitCanonical(fields):
+    """Compare the ex3 models by their coefficients."""
+    model = fields[1]
+    if model.startswith('tdstoGLM1|'):
+        # Compact model format of tdstoGLM.py: the coefficients are field 4
+        params = [float(v) for v in model.split('|')[4].split(',')]
+        return fields[:1] + [repr(v) for v in params]
+    if model.startswith("b'"):
+        model = model[2:-1]
+    try:
+        params = pickle.loads(base64.b64decode(model)).params
+        return fields[:1] + [repr(float(v)) for v in params]
+    except Exception:
+        return fields
+
+
+CASES = [
+    BenchCase('ex1pSco', 'ex1pSco.py', _ex1Input),
+    BenchCase('ex1pScoNonIter', 'ex1pScoNonIter.py', _ex1Input),
+    BenchCase('ex2p', 'ex2p.py', _ex2Input, args=['7']),
+    BenchCase('ex2pStream', 'ex2p.py', _ex2Input, args=['7', '--stream']),
+    BenchCase('ex3pFit', 'ex3pFit.py', _ex3FitInput,
+              canonical=_ex3FitCanonical),
+    BenchCase('ex3pFitCompact', 'ex3pFit.py', _ex3FitInput,
+              args=['--compact'], canonical=_ex3FitCanonical),
+    BenchCase('ex3pFitStream', 'ex3pFit.py', _ex3FitInput,
+              args=['--stream'], canonical=_ex3FitCanonical),
+    BenchCase('ex3pSco', 'ex3pSco.py', _ex3ScoInput),
+    BenchCase('ex3pScoCompact', 'ex3pSco.py', _ex3ScoCompactInput),
+    BenchCase('ex3pFitSco', 'ex3pFitSco.py', _ex3FitScoInput),
+    BenchCase('ex4pLoc', 'ex4pLoc.py', _ex4LocInput),
+    BenchCase('ex4pLocSketch', 'ex4pLoc.py', _ex4LocSketchInput,
+              args=['sketch']),
+    BenchCase('ex4pGlb', 'ex4pGlb.py', _ex4GlbInput),
+    BenchCase('ex5p', 'ex5p.py', _ex5Input),
+    BenchCase('ex5pLoc', 'ex5pLoc.py', _ex5LocInput),
+]
+
+
+def _numbersClose(a, b, rtol):
+    try:
+        x, y = float(a.replace(' ', '')), float(b.replace(' ', ''))
+    except ValueError:
+        return a == b
+    if x == y or (x != x and y != y):        # Equal, or both NaN
+        return True
+    return abs(x - y) <= rtol * max(abs(x), abs(y), 1e-12)
+
+
+def compareOutputs(newFile, baseFile, canonical=None, rtol=1e-9):
+    """Compare two script outputs line by line and field by field. Return
+    None if equivalent, or a description of the first difference."""
+    with open(newFile) as fNew, open(baseFile) as fBase:
+        for n, (new, base) in enumerate(zip(fNew, fBase), 1):
+            newFields = [f.strip() for f in new.rstrip('\n').split(DELIMITER)]
+            baseFields = [f.strip()
+                          for f in base.rstrip('\n').split(DELIMITER)]
+            if canonical is not None:
+                newFields = canonical(newFields)
+                baseFields = canonical(baseFields)
+            if len(newFields) != len(baseFields) or not all(
+                    _numbersClose(a, b, rtol)
+                    for a, b in zip(newFields, baseFields)):
+                return "line %d differs: %s" % (n, new.strip()[:120])
+        if fNew.readline() or fBase.readline():
+            return "number of output lines differs"
+    return None
+
+
+class StoBench:
+    """Runs the benchmark cases in a work directory with installed scripts."""
+
+    def __init__(self, scriptsDir=tdstoEmulate.SCRIPTS_DIR,
+                 dataDir=tdstoEmulate.DATA_DIR, python=sys.executable):
+        self.emulator = tdstoEmulate.StoEmulator(scriptsDir=scriptsDir,
+                                                 dataDir=dataDir)
+        self.python = python
+        self.workDir = tempfile.mkdtemp(prefix='tdstoBench')
+        tdstoEmulate.installScripts(scriptsDir, self.workDir)
+        self.env = dict(os.environ)
+        self.env.setdefault('TDSTO_WORKER_SOCKET', 'off')
+        self.env.setdefault('TDSTO_RANDOM_SEED', str(SEED))
+        self._ex3Models = {}
+
+    def close(self):
+        shutil.rmtree(self.workDir, ignore_errors=True)
+
+    def ex3Model(self, compact=False):
+        """Fit the ex3 model of product ID 1 once, for the scoring input."""
+        if compact not in self._ex3Models:
+            inFile = os.path.join(self.workDir, 'ex3model.in')
+            self._writeInput(inFile, [_ex3Rows(self, 'ex3tblMiniFit')])
+            outFile = os.path.join(self.workDir, 'ex3model.out')
+            self.runScript('ex3pFit.py', ['--compact'] if compact else [],
+                           inFile, outFile)
+            with open(outFile) as fIn:
+                self._ex3Models[compact] = \
+                    fIn.readline().split(DELIMITER)[1].strip()
+        return self._ex3Models[compact]
+
+    def _writeInput(self, fileName, blocks):
+        with open(fileName, 'w') as fOut:
+            for block in blocks:
+                fOut.writelines(DELIMITER.join(row) + '\n' for row in block)
+
+    def runScript(self, script, args, inFile, outFile):
+        """Run a script instance and return its measurements."""
+        errFile = outFile + '.err'
+        usageFile = outFile + '.usage'
+        cmd = [self.python, '-S', '-c', LAUNCHER, usageFile, self.python,
+               './myDB/' + script] + args
+        firstOutput = None
+        outputBytes = 0
+        outputRows = 0
+        with open(inFile, 'rb') as fIn, open(outFile, 'wb') as fOut, \
+                open(errFile, 'wb') as fErr:
+            proc = subprocess.Popen(cmd, stdin=fIn, stdout=subprocess.PIPE,
+                                    stderr=fErr, cwd=self.workDir,
+                                    env=self.env)
+            while True:
+                block = proc.stdout.read1(1 << 16)
+                if not block:
+                    break
+                if firstOutput is None:
+                    firstOutput = time.perf_counter()
+                fOut.write(block)
+                outputBytes += len(block)
+                outputRows += block.count(b'\n')
+            proc.wait()
+            proc.stdout.close()
+        if proc.returncode != 0:
+            with open(errFile, errors='replace') as fIn:
+                sys.exit("tdstoBench: Script %s failed:\n%s"
+                         % (script, fIn.read()[-2000:]))
+        # The times of the launcher and of the present process are on the
+        # same monotonic clock.
+        with open(usageFile) as fIn:
+            tStart, tEnd, maxRSS = fIn.read().split()
+        os.remove(usageFile)
+        tStart = float(tStart)
+        if firstOutput is not None:
+            firstOutput -= tStart
+        return {'wallSecs': float(tEnd) - tStart,
+                'firstOutputSecs': firstOutput,
+                'peakRSSMB': int(maxRSS) / 1024.0,
+                'outputBytes': outputBytes, 'outputRows': outputRows}
+
+    def run(self, case, nRows, repeat=1, baselineDir=None, rtol=1e-9):
+        """Benchmark a case for an input size. Return the result record."""
+        inFile = os.path.join(self.workDir, case.name + '.in')
+        outFile = os.path.join(self.workDir, case.name + '.out')
+        emptyFile = os.path.join(self.workDir, 'empty.in')
+        open(emptyFile, 'w').close()
+        startup = self.runScript(case.script, case.args, emptyFile,
+                                 outFile)['wallSecs']
+        rng = np.random.default_rng(SEED)
+        self._writeInput(inFile, case.makeInput(self, nRows, rng))
+        best = None
+        for _ in range(repeat):
+            meas = self.runScript(case.script, case.args, inFile, outFile)
+            if best is None or meas['wallSecs'] < best['wallSecs']:
+                best = meas
+        result = {'case': case.name, 'rows': nRows, 'startupSecs': startup,
+                  'rowsPerSec': nRows / best['wallSecs']}
+        result.update(best)
+        if baselineDir:
+            baseFile = os.path.join(baselineDir,
+                                    '%s_%d.out' % (case.name, nRows))
+            if os.path.exists(baseFile):
+                diff = compareOutputs(outFile, baseFile, case.canonical, rtol)
+                result['equivalent'] = diff is None
+                if diff:
+                    result['difference'] = diff
+            else:
+                os.makedirs(baselineDir, exist_ok=True)
+                shutil.copyfile(outFile, baseFile)
+                result['equivalent'] = None      # Baseline recorded
+        os.remove(inFile)
+        return result
+
+
+def findRegressions(results, oldResults, tolerance):
+    """Return descriptions of the results that are worse than the old ones
+    beyond the tolerance."""
+    old = {(r['case'], r['rows']): r for r in oldResults}
+    found = []
+    for r in results:
+        o = old.get((r['case'], r['rows']))
+        if o is None:
+            continue
+        tag = '%s @ %d rows: ' % (r['case'], r['rows'])
+        if r['rowsPerSec'] < o['rowsPerSec'] * (1 - tolerance):
+            found.append(tag + 'rows/s %.0f -> %.0f'
+                         % (o['rowsPerSec'], r['rowsPerSec']))
+        if r['startupSecs'] > o['startupSecs'] * (1 + tolerance):
+            found.append(tag + 'startup %.3f s -> %.3f s'
+                         % (o['startupSecs'], r['startupSecs']))
+        if r['peakRSSMB'] > o['peakRSSMB'] * (1 + tolerance):
+            found.append(tag + 'peak RSS %.1f MB -> %.1f MB'
+                         % (o['peakRSSMB'], r['peakRSSMB']))
+    return found
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the Python "
+                                     "example scripts on synthetic inputs.")
+    parser.add_argument('--cases', nargs='*',
+                        default=[case.name for case in CASES],
+                        help="Cases to run (default: all)")
+    parser.add_argument('--sizes', nargs='*', type=float,
+                        default=[1e3, 1e4, 1e5])
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--out', default='tdstoBench.json')
+    parser.add_argument('--compare', help="Earlier results to compare to")
+    parser.add_argument('--baseline', help="Directory of baseline outputs")
+    parser.add_argument('--tolerance', type=float, default=0.10)
+    parser.add_argument('--rtol', type=float, default=1e-9,
+                        help="Relative tolerance of output numbers")
+    parser.add_argument('--all-sizes', action='store_true')
+    parser.add_argument('--scripts-dir', default=tdstoEmulate.SCRIPTS_DIR)
+    parser.add_argument('--data-dir', default=tdstoEmulate.DATA_DIR)
+    args = parser.parse_args()
+
+    cases = {case.name: case for case in CASES}
+    unknown = [name for name in args.cases if name not in cases]
+    if unknown:
+        parser.error("unknown cases: " + ', '.join(unknown))
+
+    bench = StoBench(args.scripts_dir, args.data_dir)
+    results = []
+    print("%-16s %9s %11s %9s %9s %9s %9s %12s  %s"
+          % ('Case', 'Rows', 'Rows/s', 'Wall s', 'Start s', 'First s',
+             'Peak MB', 'Out bytes', 'Equivalent'))
+    try:
+        for name in args.cases:
+            for nRows in (int(size) for size in args.sizes):
+                if nRows > MAX_ROWS.get(name, nRows) and not args.all_sizes:
+                    print("%-16s %9d   skipped (beyond %d rows)"
+                          % (name, nRows, MAX_ROWS[name]))
+                    continue
+                r = bench.run(cases[name], nRows, args.repeat, args.baseline,
+                              args.rtol)
+                results.append(r)
+                print("%-16s %9d %11.0f %9.3f %9.3f %9.3f %9.1f %12d  %s"
+                      % (name, nRows, r['rowsPerSec'], r['wallSecs'],
+                         r['startupSecs'], r['firstOutputSecs'] or 0.0,
+                         r['peakRSSMB'], r['outputBytes'],
+                         {True: 'yes', False: 'NO', None: 'recorded'}
+                         .get(r.get('equivalent', '-'), '-')))
+    finally:
+        bench.close()
+
+    with open(args.out, 'w') as fOut:
+        json.dump({'python': platform.python_version(),
+                   'platform': platform.platform(),
+                   'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+                   'results': results}, fOut, indent=1)
+    print("Results saved in", args.out)
+
+    failed = False
+    differ = [r for r in results if r.get('equivalent') is False]
+    for r in differ:
+        print("Output differs from baseline: %s @ %d rows: %s"
+              % (r['case'], r['rows'], r['difference']))
+        failed = True
+    if args.compare:
+        with open(args.compare) as fIn:
+            regressions = findRegressions(results, json.load(fIn)['results'],
+                                          args.tolerance)
+        for line in regressions:
+            print("Regression:", line)
+        failed = failed or bool(regressions)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,365 @@
+################################################################################
+# The contents of this file are Teradata Public Content
+# and have been released to the Public Domain.
+# Licensed under BSD; see "license.txt" file for more information.
+# Copyright (c) 2023 by Teradata
+################################################################################
+#
+# R And Python Analytics with SCRIPT Table Operator
+# Orange Book supplementary material
+# Alexander Kolovos - October 2026 - v.2.6
+#
+# tdstoCapacity: Capacity planner for the SCRIPT Table Operator
+# File     : tdstoCapacity.py
+#
+# Note: Present script is meant to be run on a client machine. In probe mode,
+#       it is run on a node of the Vantage system, like tdstoMemInspect.sh.
+#
+# Combines the node memory computation of tdstoMemInspect.sh with memory
+# models of the Python example scripts, and reports the largest partition
+# size and the largest concurrency that every script can run with safely, for
+# a sweep of AMPs per node, concurrency values and partition sizes. It asks
+# no questions, so the sweep can be repeated for planned node configurations.
+#
+# Node memory, like in tdstoMemInspect.sh:
+#   available = (node memory * (100 - FSG cache %) / 100 - 39 MB * AMPs
+#                - QueryGrid memory) * 85 / 100
+#   per AMP per query = available / AMPs / concurrency
+# A script instance must stay within both the ScriptMemLimit value, beyond
+# which the query is aborted, and the available memory per AMP per query,
+# beyond which the node swaps. The budget of an instance is the smaller of
+# the two. With PARTITION BY, the partitions of an AMP run one after the
+# other, so a query has one instance per AMP at a time.
+#
+# Script memory: An instance takes a fixed memory for the packages and the
+# model, plus a number of bytes per input row that it holds at a time:
+# - partition: The script reads the whole partition (or AMP input) before it
+#              processes it, such as ex3pFit.py. The memory grows with the
+#              partition size, and the largest safe partition size is
+#              (safety * budget - fixed memory) / bytes per row.
+# - chunk    : The script processes its input in chunks, such as ex1pSco.py.
+#              The tdstoIO chunk sizer keeps the chunks within 75% of the
+#              budget, so any partition size is safe if a chunk of minimum
+#              size fits. The report shows the largest chunk size instead.
+# The default models were measured with the tdstoMemCollect.py memory trace
+# on tdstoBench.py inputs of 200000 rows with Python 3.11, pandas 2, and
+# scikit-learn 1.3 on Linux. Measure the models on the target environment and
+# supply the tdstoMem summaries with --trace to replace them: the fixed
+# memory and the bytes per row are the largest of all instances. Scripts that
+# read their input with readAll() are modeled per partition, others per chunk.
+#
+# Usage:
+#   python tdstoCapacity.py --node-mem-gb G --fsg-percent F
+#          --script-mem-limit-mb L --amps A [A ...] [--querygrid-mb Q]
+#          [--concurrency C [C ...]] [--rows N [N ...]] [--safety S]
+#          [--trace FILE ...] [--scripts NAME ...] [--json]
+# or, on a node of the system, with the node values probed like
+# tdstoMemInspect.sh does:
+#   python tdstoCapacity.py --probe [--concurrency C ...] [--rows N ...] ...
+# - --amps        : AMPs per node to plan for (simulation mode)
+# - --concurrency : Concurrent STO queries. Default: 1 2 4 8
+# - --rows        : Partition sizes for the concurrency table.
+#                   Default: 100000 1000000 10000000
+# - --safety      : Fraction of the budget that a script may fill. Default 0.8
+# - --trace FILE  : scriptlog or standard error files with tdstoMem lines
+# - --scripts NAME: Only the models of the specified scripts
+#
+# Output:
+# - Node memory per AMP per query, and the instance budget, for every number
+#   of AMPs per node and concurrency
+# - Largest safe partition size (partition scripts) or chunk size (chunk
+#   scripts) per script, for every number of AMPs per node and concurrency
+# - Largest safe concurrency per script, for every number of AMPs per node
+#   and partition size
+#
+# Requires only standard Python library modules.
+#
+################################################################################
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import tdstoMemCollect
+
+# Node memory parameters of tdstoMemInspect.sh
+AMP_MEM_MB = 39.0
+PERC_FOR_STO = 85.0
+MIN_SUGGESTED_PER_AMP_PER_QUERY_MB = 1000.0
+
+# Smallest and largest chunk sizes of the tdstoIO chunk sizer, and the
+# fraction of the budget that the chunk sizer lets a script fill
+MIN_CHUNK_ROWS = 100
+MAX_CHUNK_ROWS = 1000000
+CHUNK_MEM_FRACTION = 0.75
+
+# Measured memory models: script command, fixed memory in MB, bytes per row
+# held at a time, and whether the script holds the partition or a chunk
+MODELS = {
+    'ex1pSco':        ('ex1pSco.py', 157.1, 1330, 'chunk'),
+    'ex1pScoNonIter': ('ex1pScoNonIter.py', 157.2, 634, 'partition'),
+    'ex2p':           ('ex2p.py', 158.3, 3660, 'partition'),
+    'ex2pStream':     ('ex2p.py --stream', 158.3, 1638, 'chunk'),
+    'ex3pFit':        ('ex3pFit.py', 169.8, 2226, 'partition'),
+    'ex3pFitCompact': ('ex3pFit.py --compact', 170.1, 1370, 'partition'),
+    'ex3pFitStream':  ('ex3pFit.py --stream', 169.9, 664, 'chunk'),
+    'ex3pSco':        ('ex3pSco.py', 141.9, 1162, 'chunk'),
+    'ex3pScoCompact': ('ex3pSco.py (compact model)', 68.2, 1165, 'chunk'),
+    'ex3pFitSco':     ('ex3pFitSco.py', 169.7, 974, 'partition'),
+    'ex4pLoc':        ('ex4pLoc.py', 67.5, 639, 'chunk'),
+    'ex4pLocSketch':  ('ex4pLoc.py sketch', 67.8, 635, 'chunk'),
+    'ex4pGlb':        ('ex4pGlb.py', 67.7, 926, 'chunk'),
+    'ex5pLoc':        ('ex5pLoc.py', 67.6, 927, 'chunk'),
+}
+
+
+class NodeConfig:
+    """Memory configuration of a node.
+
+    nodeMemMB    : Total memory of the node in MB
+    fsgPercent   : FSG cache percentage
+    scriptLimitMB: ScriptMemLimit value in MB
+    queryGridMB  : Memory dedicated to QueryGrid in MB
+    """
+
+    def __init__(self, nodeMemMB, fsgPercent, scriptLimitMB, queryGridMB=0.):
+        self.nodeMemMB = nodeMemMB
+        self.fsgPercent = fsgPercent
+        self.scriptLimitMB = scriptLimitMB
+        self.queryGridMB = queryGridMB
+
+    def availableMB(self, nAmps):
+        """Memory of the node available to STO queries, for nAmps AMPs."""
+        nonFSG = self.nodeMemMB * (100. - self.fsgPercent) / 100.
+        avail = ((nonFSG - AMP_MEM_MB * nAmps - self.queryGridMB)
+                 * PERC_FOR_STO / 100.)
+        return max(0., avail)
+
+    def perAmpPerQueryMB(self, nAmps, concurrency):
+        """Average available memory per AMP per STO query."""
+        return self.availableMB(nAmps) / nAmps / concurrency
+
+    def budgetMB(self, nAmps, concurrency):
+        """Memory that a script instance can use without an abort or swap."""
+        return min(self.scriptLimitMB,
+                   self.perAmpPerQueryMB(nAmps, concurrency))
+
+
+def _run(cmd, text=None):
+    try:
+        return subprocess.run(cmd, input=text, capture_output=True,
+                              text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        sys.exit("tdstoCapacity: Cannot run %s. Run the probe mode on a node "
+                 "of the system, or specify the node values." % cmd[0])
+
+
+def probeNode():
+    """Return the number of AMPs and the NodeConfig of the present node, from
+    the ampload, cufconfig and ctl utilities and /proc/meminfo, like
+    tdstoMemInspect.sh does."""
+    nAmps = len(_run(['ampload']).splitlines()) - 3
+    scriptLimitMB = None
+    for line in _run(['cufconfig', '-o']).splitlines():
+        if 'ScriptMemLimit' in line:
+            scriptLimitMB = float(line.split()[-1]) / 1048576.
+    nodeMemMB = None
+    with open('/proc/meminfo') as fIn:
+        for line in fIn:
+            if line.startswith('MemTotal'):
+                nodeMemMB = float(line.split()[-2]) / 1024.
+    fsgPercent = None
+    for line in _run(['ctl'], 'scr dbs\n').splitlines():
+        if ') FSG cache Percent' in line:
+            fsgPercent = float(line.split()[-1])
+    if None in (scriptLimitMB, nodeMemMB, fsgPercent) or nAmps <= 0:
+        sys.exit("tdstoCapacity: Cannot probe the node configuration.")
+    return nAmps, NodeConfig(nodeMemMB, fsgPercent, scriptLimitMB)
+
+
+def modelsFromTraces(fileNames):
+    """Return the memory models of the tdstoMem summaries in files."""
+    summaries = []
+    for fileName in fileNames:
+        with open(fileName, errors='replace') as fIn:
+            summaries.extend(tdstoMemCollect.parseLines(fIn))
+    holds = {}
+    for summary in summaries:
+        if 'input' in summary.get('stagesMB', {}):
+            holds[summary['script']] = 'partition'
+    models = {}
+    for script, agg in tdstoMemCollect.aggregate(summaries).items():
+        if agg['bytesPerRowMax'] is None:
+            continue                    # No input rows: no model
+        models[os.path.splitext(script)[0]] = (
+            script, agg['baseMBMax'], max(1, agg['bytesPerRowMax']),
+            holds.get(script, 'chunk'))
+    return models
+
+
+def maxRows(model, budgetMB, safety):
+    """Largest number of rows that an instance can hold at a time."""
+    _, fixedMB, bytesPerRow, holds = model
+    fraction = safety if holds == 'partition' else CHUNK_MEM_FRACTION
+    rows = int((fraction * budgetMB - fixedMB) * 1048576. / bytesPerRow)
+    if holds == 'chunk':
+        return min(rows, MAX_CHUNK_ROWS) if rows >= MIN_CHUNK_ROWS else 0
+    return max(0, rows)
+
+
+def maxConcurrency(model, node, nAmps, nRows, safety, limit=64):
+    """Largest concurrency up to limit at which an instance fits for a
+    partition of nRows rows, or 0."""
+    best = 0
+    for concurrency in range(1, limit + 1):
+        budgetMB = node.budgetMB(nAmps, concurrency)
+        if model[3] == 'chunk':
+            fits = maxRows(model, budgetMB, safety) > 0
+        else:
+            fits = maxRows(model, budgetMB, safety) >= nRows
+        if not fits:
+            break
+        best = concurrency
+    return best
+
+
+def plan(node, ampsList, concurrencies, rowsList, models, safety):
+    """Return the plan as a dict: the node budgets, the largest rows per
+    script, and the largest concurrency per script."""
+    result = {'node': vars(node), 'safety': safety, 'budgets': [],
+              'maxRows': [], 'maxConcurrency': []}
+    for nAmps in ampsList:
+        for concurrency in concurrencies:
+            budgetMB = node.budgetMB(nAmps, concurrency)
+            result['budgets'].append({
+                'amps': nAmps, 'concurrency': concurrency,
+                'perAmpPerQueryMB': round(
+                    node.perAmpPerQueryMB(nAmps, concurrency), 1),
+                'budgetMB': round(budgetMB, 1)})
+            for name, model in models.items():
+                result['maxRows'].append({
+                    'script': name, 'holds': model[3], 'amps': nAmps,
+                    'concurrency': concurrency,
+                    'maxRows': maxRows(model, budgetMB, safety)})
+        for nRows in rowsList:
+            for name, model in models.items():
+                result['maxConcurrency'].append({
+                    'script': name, 'amps': nAmps, 'rows': nRows,
+                    'maxConcurrency': maxConcurrency(model, node, nAmps,
+                                                     nRows, safety)})
+    return result
+
+
+def printPlan(result, models, ampsList, concurrencies, rowsList):
+    """Print the plan of plan() as tables."""
+    node = result['node']
+    print("Node: %.1f GB memory, FSG cache %.0f%%, ScriptMemLimit %.0f MB, "
+          "QueryGrid %.0f MB; safety %.2f"
+          % (node['nodeMemMB'] / 1024., node['fsgPercent'],
+             node['scriptLimitMB'], node['queryGridMB'], result['safety']))
+    print("")
+    print("Memory per AMP per query (MB) / instance budget (MB):")
+    print("  %6s" % 'AMPs' + ''.join('%16s' % ('conc %d' % c)
+                                     for c in concurrencies))
+    for nAmps in ampsList:
+        cells = [b for b in result['budgets'] if b['amps'] == nAmps]
+        print("  %6d" % nAmps + ''.join(
+            '%16s' % ('%.0f / %.0f' % (b['perAmpPerQueryMB'], b['budgetMB']))
+            for b in cells))
+        low = [b['concurrency'] for b in cells if b['perAmpPerQueryMB']
+               < MIN_SUGGESTED_PER_AMP_PER_QUERY_MB]
+        if low:
+            print("  %6s  below the suggested 1 GB per AMP per query from "
+                  "concurrency %d" % ('', min(low)))
+
+    print("")
+    print("Largest safe partition rows (partition scripts) or chunk rows "
+          "(chunk scripts):")
+    header = ''.join('%11s' % ('%d/c%d' % (a, c))
+                     for a in ampsList for c in concurrencies)
+    print("  %-16s %-9s %7s %7s" % ('Script', 'Holds', 'MB', 'B/row')
+          + header)
+    for name, model in models.items():
+        cells = [r['maxRows'] for r in result['maxRows']
+                 if r['script'] == name]
+        print("  %-16s %-9s %7.1f %7d" % (name, model[3], model[1], model[2])
+              + ''.join('%11d' % rows for rows in cells))
+    print("  (columns: AMPs per node/concurrency; 0: does not fit)")
+
+    print("")
+    print("Largest safe concurrency for partitions of N rows:")
+    header = ''.join('%11s' % ('%d/%s' % (a, _rowsText(n)))
+                     for a in ampsList for n in rowsList)
+    print("  %-16s" % 'Script' + header)
+    for name in models:
+        cells = [r['maxConcurrency'] for r in result['maxConcurrency']
+                 if r['script'] == name]
+        print("  %-16s" % name + ''.join('%11d' % c for c in cells))
+    print("  (columns: AMPs per node/partition rows; chunk scripts do not "
+          "depend on the partition size)")
+
+
+def _rowsText(nRows):
+    for divisor, suffix in ((1000000, 'M'), (1000, 'k')):
+        if nRows >= divisor and nRows % divisor == 0:
+            return '%d%s' % (nRows // divisor, suffix)
+    return str(nRows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Plan the partition sizes "
+                                     "and concurrency of the example scripts "
+                                     "for a node configuration.")
+    parser.add_argument('--probe', action='store_true',
+                        help="Probe the present node for its configuration")
+    parser.add_argument('--node-mem-gb', type=float)
+    parser.add_argument('--fsg-percent', type=float)
+    parser.add_argument('--script-mem-limit-mb', type=float)
+    parser.add_argument('--querygrid-mb', type=float, default=0.)
+    parser.add_argument('--amps', type=int, nargs='+')
+    parser.add_argument('--concurrency', type=int, nargs='+',
+                        default=[1, 2, 4, 8])
+    parser.add_argument('--rows', type=int, nargs='+',
+                        default=[100000, 1000000, 10000000])
+    parser.add_argument('--safety', type=float, default=0.8)
+    parser.add_argument('--trace', nargs='+', default=[],
+                        help="Files with tdstoMem summaries of the scripts")
+    parser.add_argument('--scripts', nargs='+',
+                        help="Names of the models to report")
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    if args.probe:
+        nAmps, node = probeNode()
+        node.queryGridMB = args.querygrid_mb
+        ampsList = args.amps or [nAmps]
+    else:
+        if None in (args.node_mem_gb, args.fsg_percent,
+                    args.script_mem_limit_mb) or not args.amps:
+            parser.error("specify --node-mem-gb, --fsg-percent, "
+                         "--script-mem-limit-mb and --amps, or --probe")
+        if not 0 < args.fsg_percent < 100:
+            parser.error("--fsg-percent must be in 1-99")
+        node = NodeConfig(args.node_mem_gb * 1024., args.fsg_percent,
+                          args.script_mem_limit_mb, args.querygrid_mb)
+        ampsList = args.amps
+    if min(ampsList) <= 0 or min(args.concurrency) <= 0:
+        parser.error("AMPs and concurrency must be positive")
+
+    models = dict(MODELS)
+    models.update(modelsFromTraces(args.trace))
+    if args.scripts:
+        unknown = set(args.scripts) - set(models)
+        if unknown:
+            parser.error("no model for " + ', '.join(sorted(unknown)))
+        models = {name: models[name] for name in args.scripts}
+
+    result = plan(node, ampsList, args.concurrency, args.rows, models,
+                  args.safety)
+    if args.json:
+        print(json.dumps(result, indent=1))
+    else:
+        printPlan(result, models, ampsList, args.concurrency, args.rows)
@@ -0,0 +1,773 @@
+################################################################################
+# The contents of this file are Teradata Public Content
+# and have been released to the Public Domain.
+# Licensed under BSD; see "license.txt" file for more information.
+# Copyright (c) 2023 by Teradata
+################################################################################
+#
+# R And Python Analytics with SCRIPT Table Operator
+# Orange Book supplementary material
+# Alexander Kolovos - October 2026 - v.2.6
+#
+# tdstoEmulate: Local SCRIPT Table Operator emulator
+# File     : tdstoEmulate.py
+#
+# Note: Present script is meant to be run on a client machine
+#
+# Runs the Python example scripts of the package the way the SCRIPT Table
+# Operator (STO) runs them on a Vantage system, but locally and without a
+# database. The emulator:
+# - Loads the example tables from the data/ directory. Table names, column
+#   names and types, primary index, delimiter, and data file are read from the
+#   FastLoad script of each table.
+# - Distributes the rows of a table across N simulated AMPs by hashing the
+#   value of a key column: the PARTITION BY or HASH BY column of the query, or
+#   the primary index of the table otherwise.
+# - Installs the scripts/ directory files in a work directory "myDB/" and runs
+#   the script command "python ./myDB/<script> [args]" as a subprocess with the
+#   AMP rows streamed as tab-delimited standard input. Without PARTITION BY,
+#   one script instance runs per AMP. With PARTITION BY, one instance runs
+#   per partition, and the partitions of an AMP run one after the other. The
+#   rows of a partition are sorted by the ORDER BY column, if any.
+# - Runs up to a given number of AMPs concurrently in a pool, and collects the
+#   standard output of all instances into a result table. The result columns
+#   are named and cast according to the RETURNS clause of the stage.
+# - Feeds the result table of a stage into the next stage of a pipeline, as
+#   in the two-stage queries ex4pLoc.py -> ex4pGlb.py and ex3pFit.py ->
+#   ex3pSco.py of the examples. A stage can also save its result as a named
+#   table, and a loop of stages can repeat until a condition holds, like the
+#   iterations of the stored procedure in ex2pDist.sql.
+# For each stage, the emulator reports the rows, time and peak resident
+# memory of every AMP, the throughput, and the skew of the rows across AMPs.
+#
+# The SQL parts of the example queries that are not script invocations are
+# emulated by the pipeline definitions in the present file. In particular,
+# the ex3 scoring input joins every scoring row with its row number "nRow"
+# in the partition, and with the fitted model on the first row. The
+# single-pass ex3FitSco input is the union of the fitting and scoring rows
+# with the flag column "scoFlag". The ex2Dist initial centroids are random
+# observations of every group, and the centroid rows are sent to every AMP
+# with one hash key value per AMP. The ex5 pipeline runs the second query of
+# ex5p.sql with the scripts ex5pLoc.py -> ex5pGlb.py -> ex5p.py. The first
+# query of ex5p.sql runs on CALCMATRIX output and is not emulated. Tables
+# without a FastLoad script, like ex5tbl, are loaded from the INSERT
+# statements of their table definition script.
+#
+# Usage:
+#   python tdstoEmulate.py PIPELINE [--amps N] [--concurrency C] [--non-iter]
+#                          [--out FILE] [--keep DIR] [--mem]
+# where PIPELINE is one of ex1, ex2, ex2Dist, ex3, ex3Mini, ex3FitSco,
+# ex3MiniFitSco, ex4, ex4Loc, ex4Sketch, or ex5.
+# With --non-iter, the non-iterative versions of the scoring scripts are used.
+# Or, to run any script on any table in a single stage:
+#   python tdstoEmulate.py --script SCRIPT --table TABLE
+#          [--partition-by COL | --hash-by COL] [--order-by COL]
+#          [--returns "oc1 INTEGER, oc2 FLOAT, ..."] [--args ARG ...]
+# - --out FILE : Write the final result table into a tab-delimited file
+# - --keep DIR : Keep the input, output and standard error files of every
+#                script instance in the specified directory
+# - --mem      : Run the scripts with the TDSTO_MEM_TRACE environment variable
+#                set, and report the memory summaries of the instances of
+#                every stage, like tdstoMemCollect.py does
+# Script errors abort the emulation like they abort the query, and the
+# standard error output of the failing instance is shown.
+#
+# Requires only standard Python library modules. The example scripts require
+# their own add-on packages in the Python environment that runs them.
+#
+################################################################################
+
+import argparse
+import glob
+import os
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import tdstoMemCollect
+
+DELIMITER = '\t'
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.join(HERE, '..', 'scripts')
+DATA_DIR = os.path.join(HERE, '..', 'data')
+
+# SQL column types as the types of the tdstoIO reader
+_INT_TYPES = ('INTEGER', 'INT', 'SMALLINT', 'BIGINT', 'BYTEINT')
+_FLOAT_TYPES = ('FLOAT', 'REAL', 'DOUBLE', 'DECIMAL', 'NUMBER', 'NUMERIC')
+_columnRe = re.compile(r'^\s*\(?\s*"?(\w+)"?\s+([A-Za-z]+)', re.MULTILINE)
+
+
+def parseColumns(text):
+    """Parse 'name TYPE, ...' column definitions into names and types.
+
+    The types are 'int', 'float', or 'str' like in the tdstoIO module.
+    """
+    names, types = [], []
+    for name, sqlType in _columnRe.findall(text.replace(',', '\n')):
+        sqlType = sqlType.upper()
+        if sqlType in ('DEFAULT', 'NO', 'CHECKSUM'):
+            continue
+        names.append(name)
+        types.append('int' if sqlType in _INT_TYPES else
+                     'float' if sqlType in _FLOAT_TYPES else 'str')
+    return names, types
+
+
+def keyOf(value):
+    """Normalize a key value, so that numbers like "1" and "1.0" match."""
+    try:
+        return repr(float(value.replace(' ', '')))
+    except ValueError:
+        return value.strip()
+
+
+def ampOf(value, nAmps):
+    """Return the simulated AMP of a key value."""
+    return zlib.crc32(keyOf(value).encode('utf-8')) % nAmps
+
+
+def _castValue(value, colType):
+    value = value.strip()
+    if colType == 'str' or value == '':
+        return value
+    try:
+        number = float(value.replace(' ', ''))
+    except ValueError:
+        return value
+    return str(int(number)) if colType == 'int' else repr(number)
+
+
+class StoTable:
+    """Rows of text values with named and typed columns."""
+
+    def __init__(self, name, columns, types, rows, primaryIndex=None):
+        self.name = name
+        self.columns = list(columns)
+        self.types = list(types)
+        self.rows = rows
+        self.primaryIndex = primaryIndex or self.columns[0]
+
+    def col(self, name):
+        """Return the position of a column, case-insensitive like in SQL."""
+        lower = [c.lower() for c in self.columns]
+        try:
+            return lower.index(name.lower())
+        except ValueError:
+            sys.exit("tdstoEmulate: Table %s has no column %s"
+                     % (self.name, name))
+
+    def select(self, columns):
+        """Return a table with the specified columns only."""
+        pos = [self.col(c) for c in columns]
+        return StoTable(self.name, [self.columns[i] for i in pos],
+                        [self.types[i] for i in pos],
+                        [[row[i] for i in pos] for row in self.rows],
+                        self.primaryIndex)
+
+
+def tableSpec(fastloadFile):
+    """Return the layout of the table that a FastLoad script of the data/
+    directory loads, as a dict with the table name, columns, types, primary
+    index, field delimiter, number of lines to skip, and data file name."""
+    with open(fastloadFile) as fIn:
+        script = fIn.read()
+    name = re.search(r'CREATE\s+(?:MULTISET\s+)?TABLE\s+(\w+)', script,
+                     re.IGNORECASE).group(1)
+    body = re.search(r'CREATE.*?\((.*?)\)\s*PRIMARY\s+INDEX', script,
+                     re.IGNORECASE | re.DOTALL).group(1)
+    columns, types = parseColumns(body)
+    primaryIndex = re.search(r'PRIMARY\s+INDEX\s*\(\s*"?(\w+)', script,
+                             re.IGNORECASE).group(1)
+    delimiter = re.search(r'VARTEXT\s+"(.)"', script, re.IGNORECASE).group(1)
+    startRecord = re.search(r'^\s*RECORD\s+(\d+)', script,
+                            re.IGNORECASE | re.MULTILINE)
+    skip = int(startRecord.group(1)) - 1 if startRecord else 0
+    dataFile = os.path.join(os.path.dirname(fastloadFile),
+                            re.search(r'FILE\s*=\s*([^;\s]+)', script,
+                                      re.IGNORECASE).group(1))
+    return {'name': name, 'columns': columns, 'types': types,
+            'primaryIndex': primaryIndex, 'delimiter': delimiter,
+            'skip': skip, 'dataFile': dataFile}
+
+
+def loadTable(fastloadFile):
+    """Load the table that a FastLoad script of the data/ directory loads."""
+    spec = tableSpec(fastloadFile)
+    if not os.path.exists(spec['dataFile']):
+        sys.exit("tdstoEmulate: Data file %s of table %s not found"
+                 % (spec['dataFile'], spec['name']))
+    with open(spec['dataFile']) as fIn:
+        lines = fIn.read().splitlines()[spec['skip']:]
+    rows = [line.split(spec['delimiter']) for line in lines if line]
+    return StoTable(spec['name'], spec['columns'], spec['types'], rows,
+                    spec['primaryIndex'])
+
+
+def loadInsertTable(sqlFile):
+    """Load the table that a table definition script of the data/ directory
+    creates and fills with INSERT statements."""
+    with open(sqlFile) as fIn:
+        script = fIn.read()
+    match = re.search(r'CREATE\s+(?:MULTISET\s+)?TABLE\s+(\w+)\s*\((.*?)\)'
+                      r'\s*(?:PRIMARY\s+INDEX\s*\(\s*"?(\w+))?', script,
+                      re.IGNORECASE | re.DOTALL)
+    name, body, primaryIndex = match.groups()
+    columns, types = parseColumns(body)
+    rows = [[value.strip().strip("'") for value in values.split(',')]
+            for values in re.findall(r'INSERT\s+INTO\s+' + name +
+                                     r'\s+VALUES\s*\((.*?)\)\s*;', script,
+                                     re.IGNORECASE)]
+    return StoTable(name, columns, types,
+                    [[_castValue(v, t) for v, t in zip(row, types)]
+                     for row in rows], primaryIndex)
+
+
+def installScripts(scriptsDir, workDir):
+    """Install the scripts and model files into the myDB/ directory of a
+    work directory, where the script commands find them."""
+    installDir = os.path.join(workDir, 'myDB')
+    os.makedirs(installDir, exist_ok=True)
+    for fileName in os.listdir(scriptsDir):
+        if fileName.endswith('.sql'):
+            continue
+        target = os.path.join(installDir, fileName)
+        if not os.path.exists(target):
+            os.symlink(os.path.join(os.path.abspath(scriptsDir), fileName),
+                       target)
+
+
+class Stage:
+    """One SCRIPT invocation of a query.
+
+    on      : Function that returns the input table of the stage, given the
+              emulator (to access tables and the result of the last stage)
+    returns : RETURNS clause column definitions, such as 'oc1 INTEGER, ...'
+    into    : Name of a table to save the result of the stage as, like an
+              INSERT INTO ... SELECT of the query
+    """
+
+    def __init__(self, script, on, partitionBy=None, hashBy=None,
+                 orderBy=None, args=(), returns='', into=None):
+        self.script = script
+        self.on = on
+        self.partitionBy = partitionBy
+        self.hashBy = hashBy
+        self.orderBy = orderBy
+        self.args = list(args)
+        self.returns = returns
+        self.into = into
+
+    def describe(self):
+        clause = ('PARTITION BY ' + self.partitionBy if self.partitionBy else
+                  'HASH BY ' + self.hashBy if self.hashBy else
+                  'no partitioning')
+        if self.orderBy:
+            clause += ' ORDER BY ' + self.orderBy
+        return ' '.join([self.script] + self.args) + '  (' + clause + ')'
+
+
+class Loop:
+    """Stages of an iterative query that are repeated until a condition
+    holds, like the WHILE loop of a stored procedure.
+
+    until   : Function of the emulator that returns True to stop the loop
+              after an iteration
+    maxIter : Maximum number of iterations
+    """
+
+    def __init__(self, stages, until, maxIter=20):
+        self.stages = list(stages)
+        self.until = until
+        self.maxIter = maxIter
+
+
+def _ex2DistInput(emu, nClusters):
+    """Observation rows of ex2tbl after the centroid rows of every group.
+    The centroid rows are repeated with one hashKey value per AMP, the
+    smallest ObsID of the AMP, so that every AMP gets all centroids. On the
+    first iteration, random observations are the initial centroids."""
+    obs = emu.table('ex2tbl')
+    oid, grp = obs.col('ObsID'), obs.col('ObsGroup')
+    xc, yc = obs.col('X_Coord'), obs.col('Y_Coord')
+    if 'ex2pcentroids' not in emu.saved:
+        rng = random.Random(os.environ.get('TDSTO_RANDOM_SEED', '1'))
+        groups = {}
+        for row in obs.rows:
+            groups.setdefault(keyOf(row[grp]), []).append(row)
+        rows = []
+        for members in groups.values():
+            for n, row in enumerate(rng.sample(members,
+                                               min(nClusters, len(members))),
+                                    1):
+                rows.append([row[grp], str(n), row[xc], row[yc]])
+        emu.saved['ex2pcentroids'] = StoTable(
+            'ex2pCentroids', ['ObsGroup', 'ClustID', 'X_Centroid',
+                              'Y_Centroid'],
+            ['int', 'int', 'float', 'float'], rows)
+    cen = emu.saved['ex2pcentroids']
+    ampKeys = {}
+    for row in obs.rows:
+        amp = ampOf(row[oid], emu.nAmps)
+        if amp not in ampKeys or int(row[oid]) < int(ampKeys[amp]):
+            ampKeys[amp] = row[oid]
+    cols = [cen.col(c) for c in ('ObsGroup', 'ClustID', 'X_Centroid',
+                                 'Y_Centroid')]
+    rows = [['0', row[cols[0]], '', row[cols[1]], row[cols[2]],
+             row[cols[3]], hashKey]
+            for row in cen.rows for hashKey in ampKeys.values()]
+    rows += [['1', row[grp], row[oid], '', row[xc], row[yc], row[oid]]
+             for row in obs.rows]
+    return StoTable('ex2tbl', ['rowType', 'ObsGroup', 'ObsID', 'ClustID',
+                               'X_Coord', 'Y_Coord', 'hashKey'],
+                    ['int', 'int', 'int', 'int', 'float', 'float', 'int'],
+                    rows)
+
+
+def _ex2DistStages(nClusters, tol=1e-6, maxIter=20):
+    locReturns = ('ObsGroup INTEGER, ClustID INTEGER, N INTEGER, '
+                  'SumX FLOAT, SumY FLOAT, SSE FLOAT, X_Old FLOAT, '
+                  'Y_Old FLOAT')
+    return [Loop([Stage('ex2pLoc.py',
+                        lambda emu: _ex2DistInput(emu, nClusters),
+                        hashBy='hashKey', orderBy='rowType',
+                        args=['partial'], returns=locReturns),
+                  Stage('ex2pGlb.py', lambda emu: emu.last,
+                        hashBy='ObsGroup',
+                        returns='ObsGroup INTEGER, ClustID INTEGER, '
+                                'X_Centroid FLOAT, Y_Centroid FLOAT, '
+                                'N INTEGER, SSE FLOAT, Shift FLOAT',
+                        into='ex2pCentroids')],
+                 until=lambda emu: max(
+                     (float(row[emu.last.col('Shift')])
+                      for row in emu.last.rows), default=0.0) <= tol,
+                 maxIter=maxIter),
+            Stage('ex2pLoc.py', lambda emu: _ex2DistInput(emu, nClusters),
+                  hashBy='hashKey', orderBy='rowType', args=['assign'],
+                  returns='ObsID INTEGER, ObsGroup INTEGER, ClustID INTEGER, '
+                          'X_Centroid FLOAT, Y_Centroid FLOAT, Dist FLOAT')]
+
+
+def _ex3ScoreInput(emu, scoTable):
+    """Scoring rows of the product IDs with a model, with row number nRow,
+    and with the model on the first row of every partition."""
+    sco = emu.table(scoTable)
+    fit = emu.last
+    models = {keyOf(row[0]): row[1] for row in fit.rows}
+    pid = sco.col('p_id')
+    nRow = {}
+    rows = []
+    for row in sco.rows:
+        key = keyOf(row[pid])
+        if key not in models:
+            continue
+        nRow[key] = nRow.get(key, 0) + 1
+        rows.append(row + [str(nRow[key]),
+                           models[key] if nRow[key] == 1 else ''])
+    return StoTable(sco.name, sco.columns + ['nRow', 'r_model'],
+                    sco.types + ['int', 'str'], rows, sco.primaryIndex)
+
+
+_EX1_RETURNS = 'oc1 INTEGER, oc2 FLOAT, oc3 FLOAT, oc4 INTEGER'
+_EX3_FIT_RETURNS = 'oc1 INTEGER, oc2 CLOB'
+_EX3_SCO_RETURNS = ('oc1 INTEGER, oc2 FLOAT, oc3 FLOAT, oc4 FLOAT, '
+                    'oc5 FLOAT, oc6 FLOAT, oc7 FLOAT')
+_EX4_LOC_RETURNS = ('CompanyID INTEGER, DepartmentID INTEGER, '
+                    'Department VARCHAR(25), AvgRev_Dept FLOAT, '
+                    'N_Stores INTEGER')
+
+
+_EX4_GLB_SKETCH_RETURNS = ('CompanyID INTEGER, AllDepts INTEGER, '
+                           'Avg_Dept_Revenue FLOAT, Distinct_Stores INTEGER, '
+                           'Std_Revenue FLOAT, Min_Revenue FLOAT, '
+                           'Max_Revenue FLOAT, P50_Revenue FLOAT, '
+                           'P90_Revenue FLOAT, P99_Revenue FLOAT')
+
+
+def _ex4LocStage(sketch=False):
+    columns = ['CompanyID', 'DepartmentID', 'Department', 'Revenue']
+    if sketch:
+        return Stage('ex4pLoc.py',
+                     lambda emu: emu.table('ex4tbl').select(
+                         columns + ['StoreID']),
+                     hashBy='DepartmentID', args=['sketch'],
+                     returns=_EX4_LOC_RETURNS + ', Sketch VARCHAR(32000)')
+    return Stage('ex4pLoc.py',
+                 lambda emu: emu.table('ex4tbl').select(columns),
+                 hashBy='DepartmentID', returns=_EX4_LOC_RETURNS)
+
+
+def _ex3FitScoInput(emu, fitTable, scoTable):
+    """Fitting rows with scoFlag 0 and scoring rows with scoFlag 1."""
+    fit = emu.table(fitTable)
+    sco = emu.table(scoTable).select(fit.columns)
+    return StoTable(fit.name, fit.columns + ['scoFlag'], fit.types + ['int'],
+                    [row + ['0'] for row in fit.rows]
+                    + [row + ['1'] for row in sco.rows], fit.primaryIndex)
+
+
+def _ex3FitScoStages(fitTable, scoTable):
+    return [Stage('ex3pFitSco.py',
+                  lambda emu: _ex3FitScoInput(emu, fitTable, scoTable),
+                  partitionBy='p_id', orderBy='scoFlag',
+                  returns=_EX3_SCO_RETURNS)]
+
+
+def _ex3Stages(fitTable, scoTable, scoScript):
+    return [Stage('ex3pFit.py', lambda emu: emu.table(fitTable),
+                  partitionBy='p_id', returns=_EX3_FIT_RETURNS),
+            Stage(scoScript, lambda emu: _ex3ScoreInput(emu, scoTable),
+                  partitionBy='p_id', orderBy='nRow',
+                  returns=_EX3_SCO_RETURNS)]
+
+
+_EX5_SSCP_RETURNS = ('rownum INTEGER, rowname VARCHAR(128), c BIGINT, '
+                     's FLOAT, x1 FLOAT, x2 FLOAT, y FLOAT')
+
+
+def _ex5GlbInput(emu):
+    """Rows of the ex5pLoc.py instances with a leading ampkey column of the
+    session number, so that they are all sent to one AMP."""
+    loc = emu.last
+    return StoTable(loc.name, ['ampkey'] + loc.columns, ['int'] + loc.types,
+                    [['1'] + row for row in loc.rows])
+
+
+def _ex5Stages():
+    columns = ['x1', 'x2', 'y']
+    # The result of ex5pGlb.py stays on the AMP of the script instance. All
+    # its rows have the same count c, so hashing them by c keeps them on one
+    # AMP.
+    return [Stage('ex5pLoc.py',
+                  lambda emu: emu.table('ex5tbl').select(columns),
+                  args=columns, returns=_EX5_SSCP_RETURNS),
+            Stage('ex5pGlb.py', _ex5GlbInput, hashBy='ampkey', args=columns,
+                  returns=_EX5_SSCP_RETURNS),
+            Stage('ex5p.py', lambda emu: emu.last, hashBy='c',
+                  returns='oc1 VARCHAR(20), oc2 FLOAT')]
+
+
+def pipeline(name, nonIter=False):
+    """Return the stages of an example query by name."""
+    sco = 'ScoNonIter.py' if nonIter else 'Sco.py'
+    pipelines = {
+        'ex1': lambda: [Stage('ex1p' + sco,
+                              lambda emu: emu.table('ex1tblSco'),
+                              returns=_EX1_RETURNS)],
+        'ex2': lambda: [Stage('ex2p.py', lambda emu: emu.table('ex2tbl'),
+                              partitionBy='ObsGroup', orderBy='ObsID',
+                              args=['7'],
+                              returns='oc1 INT, oc2 INT, oc3 INT, oc4 FLOAT, '
+                                      'oc5 FLOAT, oc6 FLOAT, oc7 FLOAT, '
+                                      'oc8 FLOAT')],
+        'ex2Dist': lambda: _ex2DistStages(7),
+        'ex3': lambda: _ex3Stages('ex3tblFit', 'ex3tblSco', 'ex3p' + sco),
+        'ex3Mini': lambda: _ex3Stages('ex3tblMiniFit', 'ex3tblMiniSco',
+                                      'ex3p' + sco),
+        'ex3FitSco': lambda: _ex3FitScoStages('ex3tblFit', 'ex3tblSco'),
+        'ex3MiniFitSco': lambda: _ex3FitScoStages('ex3tblMiniFit',
+                                                  'ex3tblMiniSco'),
+        'ex4': lambda: [_ex4LocStage(),
+                        Stage('ex4pGlb.py', lambda emu: emu.last,
+                              hashBy='CompanyID',
+                              returns='CompanyID INTEGER, AllDepts INTEGER, '
+                                      'Avg_Dept_Revenue FLOAT')],
+        'ex4Loc': lambda: [_ex4LocStage()],
+        'ex4Sketch': lambda: [_ex4LocStage(sketch=True),
+                              Stage('ex4pGlb.py', lambda emu: emu.last,
+                                    hashBy='CompanyID', args=['sketch'],
+                                    returns=_EX4_GLB_SKETCH_RETURNS)],
+        'ex5': _ex5Stages,
+    }
+    if name not in pipelines:
+        sys.exit("tdstoEmulate: Unknown pipeline %s. Choose one of: %s"
+                 % (name, ', '.join(pipelines)))
+    return pipelines[name]()
+
+
+class StoEmulator:
+    """Runs script stages across simulated AMPs.
+
+    nAmps      : Number of simulated AMPs
+    concurrency: Maximum number of AMPs that run script instances at a time.
+                 Default: nAmps
+    keepDir    : Directory to keep the files of every script instance in
+    memTrace   : Run the scripts with the memory trace of tdstoIO, and collect
+                 the memory summaries of the instances
+    """
+
+    def __init__(self, nAmps=4, concurrency=None, scriptsDir=SCRIPTS_DIR,
+                 dataDir=DATA_DIR, keepDir=None, python=sys.executable,
+                 memTrace=False):
+        self.nAmps = nAmps
+        self.concurrency = concurrency or nAmps
+        self.scriptsDir = os.path.abspath(scriptsDir)
+        self.dataDir = os.path.abspath(dataDir)
+        self.keepDir = keepDir
+        self.python = python
+        self.memTrace = memTrace
+        self.last = None
+        self.saved = {}
+        self._tables = {}
+
+    def table(self, name):
+        """Return a table saved by a stage, or a table of the data/
+        directory, by its table name."""
+        if name.lower() in self.saved:
+            return self.saved[name.lower()]
+        if not self._tables:
+            # The FastLoad scripts take precedence over the table definition
+            # scripts with INSERT statements
+            for pattern in ('*.sql', '*.fastload'):
+                for tableFile in glob.glob(os.path.join(self.dataDir,
+                                                        pattern)):
+                    with open(tableFile) as fIn:
+                        text = fIn.read()
+                    match = re.search(r'CREATE\s+(?:MULTISET\s+)?TABLE\s+'
+                                      r'(\w+)', text, re.IGNORECASE)
+                    if match and (pattern == '*.fastload' or
+                                  re.search(r'INSERT\s+INTO', text,
+                                            re.IGNORECASE)):
+                        self._tables[match.group(1).lower()] = tableFile
+        key = name.lower()
+        if key not in self._tables:
+            sys.exit("tdstoEmulate: No FastLoad or table definition script "
+                     "for table " + name)
+        if not isinstance(self._tables[key], StoTable):
+            tableFile = self._tables[key]
+            self._tables[key] = (loadTable(tableFile)
+                                 if tableFile.endswith('.fastload')
+                                 else loadInsertTable(tableFile))
+        return self._tables[key]
+
+    def _distribute(self, stage, table):
+        """Return the partitions of every AMP as lists of rows."""
+        amps = [[] for _ in range(self.nAmps)]
+        key = table.col(stage.partitionBy or stage.hashBy
+                        or table.primaryIndex)
+        if stage.partitionBy:
+            partitions = {}
+            for row in table.rows:
+                partitions.setdefault(keyOf(row[key]), []).append(row)
+            for value, rows in partitions.items():
+                amps[ampOf(value, self.nAmps)].append(rows)
+        else:
+            for amp in amps:
+                amp.append([])
+            for row in table.rows:
+                amps[ampOf(row[key], self.nAmps)][0].append(row)
+        if stage.orderBy:
+            order = table.col(stage.orderBy)
+            isText = table.types[order] == 'str'
+            for amp in amps:
+                for rows in amp:
+                    rows.sort(key=lambda row: row[order] if isText
+                              else float(row[order]))
+        return amps
+
+    def _runInstance(self, stage, workDir, tag, rows, env):
+        """Run one script instance and return its output and statistics."""
+        inFile = os.path.join(workDir, tag + '.in')
+        outFile = os.path.join(workDir, tag + '.out')
+        errFile = os.path.join(workDir, tag + '.err')
+        with open(inFile, 'w') as fOut:
+            fOut.writelines(DELIMITER.join(row) + '\n' for row in rows)
+        cmd = [self.python, './myDB/' + stage.script] + stage.args
+        t0 = time.perf_counter()
+        with open(inFile, 'rb') as fIn, open(outFile, 'wb') as fOut, \
+                open(errFile, 'wb') as fErr:
+            proc = subprocess.Popen(cmd, stdin=fIn, stdout=fOut, stderr=fErr,
+                                    cwd=workDir, env=env)
+            # Wait with wait4() for the resource usage of the instance
+            _, status, usage = os.wait4(proc.pid, 0)
+            proc.returncode = os.waitstatus_to_exitcode(status)
+        secs = time.perf_counter() - t0
+        if proc.returncode != 0:
+            with open(errFile, errors='replace') as fIn:
+                errText = fIn.read()[-2000:]
+            raise RuntimeError("Script %s failed with exit code %d in %s:\n%s"
+                               % (stage.script, proc.returncode, tag, errText))
+        with open(outFile, errors='replace') as fIn:
+            lines = [line for line in fIn.read().splitlines() if line.strip()]
+        memSummaries = []
+        if self.memTrace:
+            with open(errFile, errors='replace') as fIn:
+                memSummaries = tdstoMemCollect.parseLines(fIn)
+        return lines, secs, usage.ru_maxrss, memSummaries
+
+    def _runAmp(self, stage, workDir, amp, partitions, env):
+        stat = {'amp': amp, 'partitions': 0, 'rowsIn': 0, 'rowsOut': 0,
+                'secs': 0.0, 'peakRSSMB': 0.0, 'mem': []}
+        lines = []
+        for i, rows in enumerate(partitions):
+            if stage.partitionBy and not rows:
+                continue
+            tag = 'amp%03d_part%04d' % (amp, i)
+            out, secs, maxRSSKB, mem = self._runInstance(stage, workDir,
+                                                         tag, rows, env)
+            lines.extend(out)
+            stat['mem'].extend(mem)
+            stat['partitions'] += 1
+            stat['rowsIn'] += len(rows)
+            stat['rowsOut'] += len(out)
+            stat['secs'] += secs
+            stat['peakRSSMB'] = max(stat['peakRSSMB'], maxRSSKB / 1024.0)
+        return lines, stat
+
+    def runStage(self, stage):
+        """Run a stage across the AMPs. Return the result table and the
+        statistics of every AMP."""
+        table = stage.on(self)
+        amps = self._distribute(stage, table)
+        workDir = tempfile.mkdtemp(prefix='tdstoEmulate')
+        installScripts(self.scriptsDir, workDir)
+        env = dict(os.environ)
+        env.setdefault('TDSTO_CONCURRENCY', str(self.concurrency))
+        if self.memTrace:
+            env['TDSTO_MEM_TRACE'] = '1'
+        t0 = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+                futures = [pool.submit(self._runAmp, stage, workDir, amp,
+                                       partitions, env)
+                           for amp, partitions in enumerate(amps)]
+                results = [future.result() for future in futures]
+        except RuntimeError as err:
+            sys.exit("tdstoEmulate: " + str(err))
+        finally:
+            wallSecs = time.perf_counter() - t0
+            if self.keepDir:
+                stageDir = os.path.join(self.keepDir,
+                                        os.path.splitext(stage.script)[0])
+                shutil.rmtree(stageDir, ignore_errors=True)
+                shutil.copytree(workDir, stageDir, symlinks=True)
+            shutil.rmtree(workDir, ignore_errors=True)
+
+        # Collect the output of all instances into the result table
+        lines = [line for ampLines, _ in results for line in ampLines]
+        rows = [[field.strip() for field in line.split(DELIMITER)]
+                for line in lines]
+        columns, types = parseColumns(stage.returns)
+        if not columns:
+            nCols = max((len(row) for row in rows), default=0)
+            columns = ['oc%d' % (i + 1) for i in range(nCols)]
+            types = ['str'] * nCols
+        rows = [[_castValue(v, t) for v, t in zip(row, types)]
+                for row in rows]
+        self.last = StoTable(os.path.splitext(stage.script)[0], columns,
+                             types, rows)
+        if stage.into:
+            self.saved[stage.into.lower()] = self.last
+        stats = [stat for _, stat in results]
+        return self.last, stats, wallSecs
+
+    def run(self, stages, report=True):
+        """Run the stages of a pipeline one after the other. Return the
+        result table of the last stage and the statistics of all stages."""
+        allStats = []
+        for step in stages:
+            loop = step if isinstance(step, Loop) else Loop([step], None, 1)
+            for iteration in range(1, loop.maxIter + 1):
+                for stage in loop.stages:
+                    result, stats, wallSecs = self.runStage(stage)
+                    allStats.append({'stage': stage.script,
+                                     'wallSecs': wallSecs, 'amps': stats})
+                    if report:
+                        printReport(len(allStats), stage, stats, wallSecs)
+                        if self.memTrace:
+                            tdstoMemCollect.printReport(
+                                tdstoMemCollect.aggregate(
+                                    [summary for stat in stats
+                                     for summary in stat['mem']]),
+                                indent='  ')
+                if loop.until is not None and loop.until(self):
+                    if report:
+                        print("Loop converged after %d iteration(s)"
+                              % iteration)
+                    break
+        return self.last, allStats
+
+
+def skewOf(values):
+    """Ratio of the maximum to the average of the per-AMP values."""
+    avg = sum(values) / len(values) if values else 0
+    return max(values) / avg if avg else 0.0
+
+
+def printReport(n, stage, stats, wallSecs):
+    """Print the per-AMP statistics of a stage."""
+    print("Stage %d: %s" % (n, stage.describe()))
+    print("  %4s %6s %10s %10s %9s %10s"
+          % ('AMP', 'Parts', 'Rows in', 'Rows out', 'Secs', 'Peak MB'))
+    for stat in stats:
+        print("  %4d %6d %10d %10d %9.3f %10.1f"
+              % (stat['amp'], stat['partitions'], stat['rowsIn'],
+                 stat['rowsOut'], stat['secs'], stat['peakRSSMB']))
+    rowsIn = [stat['rowsIn'] for stat in stats]
+    secs = [stat['secs'] for stat in stats]
+    print("  Rows in: %d  Rows out: %d  Wall: %.3f s  Throughput: %.0f rows/s"
+          % (sum(rowsIn), sum(stat['rowsOut'] for stat in stats), wallSecs,
+             sum(rowsIn) / wallSecs if wallSecs else 0.0))
+    print("  Skew (max/avg per AMP): rows %.2f, time %.2f"
+          % (skewOf(rowsIn), skewOf(secs)))
+
+
+def writeTable(table, fileName):
+    """Write a table into a tab-delimited file with a header line."""
+    with open(fileName, 'w') as fOut:
+        fOut.write(DELIMITER.join(table.columns) + '\n')
+        fOut.writelines(DELIMITER.join(row) + '\n' for row in table.rows)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run the example scripts "
+                                     "across simulated AMPs like the SCRIPT "
+                                     "Table Operator.")
+    parser.add_argument('pipeline', nargs='?',
+                        help="Example pipeline: ex1, ex2, ex2Dist, ex3, "
+                             "ex3Mini, ex3FitSco, ex3MiniFitSco, ex4, "
+                             "ex4Loc, ex4Sketch, or ex5")
+    parser.add_argument('--amps', type=int, default=4)
+    parser.add_argument('--concurrency', type=int)
+    parser.add_argument('--non-iter', action='store_true',
+                        help="Use the non-iterative scoring scripts")
+    parser.add_argument('--script', help="Script of a single stage")
+    parser.add_argument('--table', help="Input table of a single stage")
+    parser.add_argument('--partition-by')
+    parser.add_argument('--hash-by')
+    parser.add_argument('--order-by')
+    parser.add_argument('--returns', default='')
+    parser.add_argument('--args', nargs='*', default=[])
+    parser.add_argument('--scripts-dir', default=SCRIPTS_DIR)
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--out', help="File for the final result table")
+    parser.add_argument('--keep', help="Directory to keep instance files in")
+    parser.add_argument('--mem', action='store_true',
+                        help="Report the memory summaries of the instances")
+    args = parser.parse_args()
+
+    if args.script:
+        if not args.table:
+            parser.error("--script requires --table")
+        stages = [Stage(args.script,
+                        lambda emu: emu.table(args.table),
+                        partitionBy=args.partition_by, hashBy=args.hash_by,
+                        orderBy=args.order_by, args=args.args,
+                        returns=args.returns)]
+    elif args.pipeline:
+        stages = pipeline(args.pipeline, args.non_iter)
+    else:
+        parser.error("specify a pipeline or --script and --table")
+
+    emulator = StoEmulator(args.amps, args.concurrency, args.scripts_dir,
+                           args.data_dir, args.keep, memTrace=args.mem)
+    result, _ = emulator.run(stages)
+    if args.out:
+        writeTable(result, args.out)
+        print("Result table:", len(result.rows), "rows written to", args.out)
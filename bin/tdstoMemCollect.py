@@ -0,0 +1,171 @@
+################################################################################
+# The contents of this file are Teradata Public Content
+# and have been released to the Public Domain.
+# Licensed under BSD; see "license.txt" file for more information.
+# Copyright (c) 2023 by Teradata
+################################################################################
+#
+# R And Python Analytics with SCRIPT Table Operator
+# Orange Book supplementary material
+# Alexander Kolovos - October 2026 - v.2.6
+#
+# tdstoMemCollect: Collector of the memory traces of script instances
+# File     : tdstoMemCollect.py
+#
+# Note: Present script is meant to be run on a client machine
+#
+# With the TDSTO_MEM_TRACE environment variable set to 1, every script that
+# imports the tdstoIO module writes a summary of its resident memory to
+# standard error at exit, in a single line of the form
+#   tdstoMem {"script": "ex3pSco.py", "peakMB": 95.2, ...}
+# On a Vantage system, the line ends up in the scriptlog file of the node,
+# with the lines of all other instances. The present script finds the
+# summary lines in one or more files, or in the standard input, and reports
+# for each script:
+# - instances  : Number of script instances with a summary
+# - rows       : Total input rows of the instances
+# - peakMB     : Largest and average peak resident memory of an instance
+# - baseMB     : Largest memory of an instance before its first input rows,
+#                that is, with the packages and the model loaded
+# - modelMB    : Largest memory growth from the package imports to the model
+#                load, for the scripts that mark the "model" stage
+# - bytesPerRow: Largest and median memory growth per input row held at a
+#                time, from the base to the peak memory of an instance
+# - stagesMB   : Largest memory at every stage that the instances recorded
+# With --rows N, the report adds the estimated memory of an instance that
+# holds N rows at a time, as baseMB + N * bytesPerRow with the largest values.
+#
+# Usage:
+#   python tdstoMemCollect.py [FILE ...] [--rows N] [--json]
+# - FILE   : scriptlog file, or standard error files of instances, such as
+#            those kept by "tdstoEmulate.py --keep DIR" (DIR/*/*.err).
+#            Default: the standard input
+# - --json : Print the report in JSON format
+# The "tdstoEmulate.py --mem" option runs the instances with the trace on and
+# prints the same report for every stage.
+#
+# Requires only standard Python library modules.
+#
+################################################################################
+
+import argparse
+import json
+import statistics
+import sys
+
+MARKER = 'tdstoMem '
+
+
+def parseLines(lines):
+    """Return the summaries of the tdstoMem lines of an iterable of text
+    lines, as dicts. The marker may follow a prefix, like a time stamp."""
+    summaries = []
+    for line in lines:
+        pos = line.find(MARKER + '{')
+        if pos < 0:
+            continue
+        try:
+            summary = json.loads(line[pos + len(MARKER):])
+        except ValueError:
+            continue                      # Truncated or interleaved line
+        if isinstance(summary, dict) and 'script' in summary:
+            summaries.append(summary)
+    return summaries
+
+
+def aggregate(summaries):
+    """Return the aggregates of summaries per script, as a dict of dicts."""
+    byScript = {}
+    for summary in summaries:
+        byScript.setdefault(summary['script'], []).append(summary)
+    result = {}
+    for script, group in sorted(byScript.items()):
+        peaks = [s.get('peakMB', 0.0) for s in group]
+        perRow = [s['bytesPerRow'] for s in group
+                  if s.get('bytesPerRow') is not None]
+        models = [s['modelMB'] for s in group if 'modelMB' in s]
+        stages = {}
+        for s in group:
+            for stage, mb in s.get('stagesMB', {}).items():
+                stages[stage] = max(stages.get(stage, 0.0), mb)
+        result[script] = {
+            'instances': len(group),
+            'rows': sum(s.get('rows', 0) for s in group),
+            'maxChunkRows': max(s.get('maxChunkRows', 0) for s in group),
+            'peakMBMax': max(peaks),
+            'peakMBAvg': round(sum(peaks) / len(peaks), 1),
+            'baseMBMax': max(s.get('baseMB', 0.0) for s in group),
+            'modelMBMax': max(models) if models else None,
+            'bytesPerRowMax': max(perRow) if perRow else None,
+            'bytesPerRowMedian': (round(statistics.median(perRow))
+                                  if perRow else None),
+            'stagesMB': stages}
+    return result
+
+
+def estimateMB(agg, nRows):
+    """Estimated memory in MB of an instance that holds nRows at a time."""
+    if agg['bytesPerRowMax'] is None:
+        return agg['peakMBMax']
+    return (agg['baseMBMax']
+            + nRows * max(0, agg['bytesPerRowMax']) / 1048576.0)
+
+
+def _fmt(value, spec):
+    return ('%' + spec) % value if value is not None else '-'
+
+
+def printReport(aggregates, nRows=None, indent=''):
+    """Print the aggregates of aggregate() as a table."""
+    if not aggregates:
+        print(indent + "No tdstoMem summaries found. Set TDSTO_MEM_TRACE=1 "
+              "for the scripts.")
+        return
+    print(indent + "%-20s %5s %10s %9s %9s %8s %8s %10s %10s"
+          % ('Script', 'Inst', 'Rows', 'Peak max', 'Peak avg', 'Base',
+             'Model', 'B/row max', 'B/row med')
+          + ('  %s' % ('MB @%d rows' % nRows) if nRows else ''))
+    for script, agg in aggregates.items():
+        line = ("%-20s %5d %10d %9.1f %9.1f %8.1f %8s %10s %10s"
+                % (script, agg['instances'], agg['rows'], agg['peakMBMax'],
+                   agg['peakMBAvg'], agg['baseMBMax'],
+                   _fmt(agg['modelMBMax'], '.1f'),
+                   _fmt(agg['bytesPerRowMax'], 'd'),
+                   _fmt(agg['bytesPerRowMedian'], 'd')))
+        if nRows:
+            line += '  %11.1f' % estimateMB(agg, nRows)
+        print(indent + line)
+        print(indent + "  stages (max MB): "
+              + ', '.join('%s %.1f' % item
+                          for item in agg['stagesMB'].items()))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Aggregate the tdstoMem "
+                                     "memory summaries of script instances.")
+    parser.add_argument('files', nargs='*',
+                        help="scriptlog or standard error files. Default: "
+                             "the standard input")
+    parser.add_argument('--rows', type=int,
+                        help="Estimate the memory of an instance that holds "
+                             "this many rows at a time")
+    parser.add_argument('--json', action='store_true',
+                        help="Print the report in JSON format")
+    args = parser.parse_args()
+
+    summaries = []
+    if args.files:
+        for fileName in args.files:
+            with open(fileName, errors='replace') as fIn:
+                summaries.extend(parseLines(fIn))
+    else:
+        summaries = parseLines(sys.stdin)
+
+    aggregates = aggregate(summaries)
+    if args.json:
+        if args.rows:
+            for agg in aggregates.values():
+                agg['estimateMB'] = round(estimateMB(agg, args.rows), 1)
+        print(json.dumps(aggregates, indent=1))
+    else:
+        printReport(aggregates, args.rows)
@@ -0,0 +1,352 @@
+################################################################################
+# The contents of this file are Teradata Public Content
+# and have been released to the Public Domain.
+# Licensed under BSD; see "license.txt" file for more information.
+# Copyright (c) 2023 by Teradata
+################################################################################
+#
+# R And Python Analytics with SCRIPT Table Operator
+# Orange Book supplementary material
+# Alexander Kolovos - October 2026 - v.2.6
+#
+# tdstoSkew: Partition skew analyzer for the SCRIPT Table Operator
+# File     : tdstoSkew.py
+#
+# Note: Present script is meant to be run on a client machine
+#
+# A SCRIPT query takes as long as its busiest AMP, and aborts if a script
+# instance exceeds its memory limit. Both depend on how the rows are spread
+# by the PARTITION BY or HASH BY column of the query. The present script
+# reads the rows of a table, and distributes them across N simulated AMPs by
+# a candidate key column with the hash function of tdstoEmulate.py, without
+# running any script. For every candidate key, it reports:
+# - Per AMP    : Partitions, rows, estimated input bytes, and the estimated
+#                memory of the script on the AMP
+# - Per key    : The largest partitions, with their AMP, rows, estimated
+#                input bytes, and estimated script memory
+# - Skew       : Ratio of the maximum to the average rows and bytes per AMP,
+#                and the number of AMPs without rows
+# With PARTITION BY, one script instance runs per partition, and the
+# partitions of an AMP run one after the other: the memory of an AMP is that
+# of its largest partition. With HASH BY, or without either clause, one
+# instance runs per AMP on all the rows of the AMP.
+#
+# The script memory is estimated with the memory models of tdstoCapacity.py
+# (fixed memory plus bytes per row held), or with models measured on the
+# target system and supplied with --trace. Scripts that process their input
+# in chunks hold at most the rows of a chunk that the tdstoIO chunk sizer
+# allows. Partitions and AMPs whose estimate exceeds the memory budget of an
+# instance (ScriptMemLimit divided by the concurrency, like in tdstoIO.py)
+# are flagged "OVER", and those above the safety fraction of the budget are
+# flagged "HIGH".
+#
+# The input bytes are estimated from the extract ("Extract MB" columns): the
+# size of every line, with its values separated by a single tab like in the
+# rows that the STO streams to a script. The STO may format some values
+# differently from the extract, such as FLOAT values in scientific format, so
+# the actual input bytes of a script can differ.
+# Large tables are read line by line, so extracts larger than the client
+# memory can be analyzed; only the counts per key value are kept.
+#
+# Usage:
+#   python tdstoSkew.py --table TABLE [--data-file FILE]
+#          (--partition-by COL ... | --hash-by COL ...) [--amps N]
+#          [--script NAME | --fixed-mb F --bytes-per-row B] [--trace FILE ...]
+#          [--mem-limit-mb L] [--concurrency C] [--safety S] [--top K] [--json]
+# or, for an extract with a header line of column names:
+#   python tdstoSkew.py --csv FILE [--delimiter D] (--partition-by COL ...
+#          | --hash-by COL ...) ...
+# - --table TABLE   : Table of the data/ directory, by the name in its
+#                     FastLoad script, such as ex3tblFit
+# - --data-file FILE: Extract of the table in the format of the FastLoad
+#                     data file, instead of the data file of the package
+# - --partition-by, --hash-by: Candidate key columns; each one is analyzed
+#                     Default: HASH BY the primary index of a --table
+# - --amps N        : Number of AMPs (default: 4)
+# - --script NAME   : Memory model of tdstoCapacity.py, such as ex3pFit
+# - --fixed-mb, --bytes-per-row: Memory model of a script that holds all of
+#                     its input rows
+# - --mem-limit-mb L: ScriptMemLimit value in MB (default: 1024)
+# - --concurrency C : Expected concurrent STO queries (default: 1)
+# - --safety S      : Fraction of the budget flagged "HIGH" (default: 0.8)
+# - --top K         : Number of largest partitions to list (default: 10)
+#
+# Requires only standard Python library modules.
+#
+################################################################################
+
+import argparse
+import glob
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import tdstoCapacity
+import tdstoEmulate
+
+
+class KeyStats:
+    """Rows and estimated input bytes per key value and per AMP for a
+    candidate key.
+
+    column     : Name of the key column
+    partitionBy: True for PARTITION BY, False for HASH BY
+    """
+
+    def __init__(self, column, partitionBy, nAmps):
+        self.column = column
+        self.partitionBy = partitionBy
+        self.nAmps = nAmps
+        self.keys = {}                # Key value -> [rows, bytes]
+        self.ampRows = [0] * nAmps
+        self.ampBytes = [0] * nAmps
+
+    def add(self, value, nBytes):
+        if self.partitionBy:
+            key = tdstoEmulate.keyOf(value)
+            stat = self.keys.get(key)
+            if stat is None:
+                self.keys[key] = [1, nBytes]
+            else:
+                stat[0] += 1
+                stat[1] += nBytes
+        else:
+            amp = tdstoEmulate.ampOf(value, self.nAmps)
+            self.ampRows[amp] += 1
+            self.ampBytes[amp] += nBytes
+
+    def partitions(self):
+        """Return the partitions as (key, amp, rows, bytes), largest first."""
+        parts = [(key, tdstoEmulate.ampOf(key, self.nAmps), rows, nBytes)
+                 for key, (rows, nBytes) in self.keys.items()]
+        parts.sort(key=lambda part: -part[2])
+        return parts
+
+
+def scanLines(lines, delimiter, stats, positions):
+    """Add the rows of text lines to the KeyStats of the key positions. The
+    bytes of a row are those of its line with tab delimiters."""
+    nRows = 0
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if not line:
+            continue
+        fields = line.split(delimiter)
+        nBytes = (len(line.encode('utf-8')) + 1
+                  - (len(delimiter) - 1) * (len(fields) - 1))
+        for stat, pos in zip(stats, positions):
+            stat.add(fields[pos] if pos < len(fields) else '', nBytes)
+        nRows += 1
+    return nRows
+
+
+def findTable(dataDir, name):
+    """Return the layout of a table of the data/ directory by its name."""
+    for fastloadFile in glob.glob(os.path.join(dataDir, '*.fastload')):
+        spec = tdstoEmulate.tableSpec(fastloadFile)
+        if spec['name'].lower() == name.lower():
+            return spec
+    sys.exit("tdstoSkew: No FastLoad script for table " + name)
+
+
+class MemModel:
+    """Estimated script memory of an instance that reads a number of rows.
+
+    model   : Memory model of tdstoCapacity.py, or None for no estimate
+    budgetMB: Memory budget of an instance
+    """
+
+    def __init__(self, model, budgetMB, safety):
+        self.model = model
+        self.budgetMB = budgetMB
+        self.safety = safety
+        self.chunkRows = None
+        if model is not None and model[3] == 'chunk':
+            self.chunkRows = max(tdstoCapacity.MIN_CHUNK_ROWS,
+                                 tdstoCapacity.maxRows(model, budgetMB,
+                                                       safety))
+
+    def estimateMB(self, nRows):
+        if self.model is None:
+            return None
+        held = nRows if self.chunkRows is None else min(nRows,
+                                                        self.chunkRows)
+        return self.model[1] + held * self.model[2] / 1048576.
+
+    def flag(self, mb):
+        if mb is None:
+            return ''
+        if mb > self.budgetMB:
+            return 'OVER'
+        return 'HIGH' if mb > self.safety * self.budgetMB else ''
+
+
+def analyze(stat, mem, top):
+    """Return the report of a candidate key as a dict."""
+    amps = [{'amp': amp, 'partitions': 0, 'rows': stat.ampRows[amp],
+             'bytes': stat.ampBytes[amp], 'largestRows': stat.ampRows[amp]}
+            for amp in range(stat.nAmps)]
+    parts = []
+    if stat.partitionBy:
+        for amp in amps:
+            amp['largestRows'] = 0
+        for key, ampNo, rows, nBytes in stat.partitions():
+            amp = amps[ampNo]
+            amp['partitions'] += 1
+            amp['rows'] += rows
+            amp['bytes'] += nBytes
+            amp['largestRows'] = max(amp['largestRows'], rows)
+            mb = mem.estimateMB(rows)
+            parts.append({'key': key, 'amp': ampNo, 'rows': rows,
+                          'bytes': nBytes, 'estMB': mb,
+                          'flag': mem.flag(mb)})
+    else:
+        for amp in amps:
+            amp['partitions'] = 1 if amp['rows'] else 0
+    for amp in amps:
+        amp['estMB'] = mem.estimateMB(amp['largestRows']) \
+            if amp['rows'] else None
+        amp['flag'] = mem.flag(amp['estMB'])
+    rows = [amp['rows'] for amp in amps]
+    nBytes = [amp['bytes'] for amp in amps]
+    return {'column': stat.column,
+            'clause': 'PARTITION BY' if stat.partitionBy else 'HASH BY',
+            'amps': amps,
+            'rowSkew': round(tdstoEmulate.skewOf(rows), 3),
+            'byteSkew': round(tdstoEmulate.skewOf(nBytes), 3),
+            'emptyAmps': rows.count(0),
+            'nPartitions': len(parts) if stat.partitionBy else None,
+            'flaggedPartitions': {flag: sum(1 for p in parts
+                                            if p['flag'] == flag)
+                                  for flag in ('OVER', 'HIGH')},
+            'largestPartitions': parts[:top]}
+
+
+def _mbText(mb):
+    return '%.1f' % mb if mb is not None else '-'
+
+
+def printReport(report, mem):
+    """Print the report of analyze() for a candidate key."""
+    print("%s %s on %d AMPs" % (report['clause'], report['column'],
+                                len(report['amps'])))
+    if mem.model is not None:
+        print("  Memory model: %s, %.1f MB + %d bytes/row (%s); budget "
+              "%.0f MB per instance"
+              % (mem.model[0], mem.model[1], mem.model[2],
+                 'holds a chunk of up to %d rows' % mem.chunkRows
+                 if mem.chunkRows else 'holds all its rows', mem.budgetMB))
+    print("  %4s %7s %11s %10s %12s %9s %5s"
+          % ('AMP', 'Parts', 'Rows', 'Extract MB', 'Largest rows', 'Est MB',
+             'Flag'))
+    for amp in report['amps']:
+        print("  %4d %7d %11d %10.2f %12d %9s %5s"
+              % (amp['amp'], amp['partitions'], amp['rows'],
+                 amp['bytes'] / 1048576., amp['largestRows'],
+                 _mbText(amp['estMB']), amp['flag']))
+    print("  Skew (max/avg per AMP): rows %.2f, bytes %.2f; empty AMPs: %d"
+          % (report['rowSkew'], report['byteSkew'], report['emptyAmps']))
+    if report['nPartitions'] is not None:
+        flagged = report['flaggedPartitions']
+        print("  Partitions: %d; over the budget: %d; above the safety "
+              "fraction: %d" % (report['nPartitions'], flagged['OVER'],
+                                flagged['HIGH']))
+        print("  Largest partitions:")
+        print("    %-20s %4s %11s %10s %9s %5s"
+              % ('Key', 'AMP', 'Rows', 'Extract MB', 'Est MB', 'Flag'))
+        for part in report['largestPartitions']:
+            print("    %-20s %4d %11d %10.2f %9s %5s"
+                  % (part['key'][:20], part['amp'], part['rows'],
+                     part['bytes'] / 1048576., _mbText(part['estMB']),
+                     part['flag']))
+    print("")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Report the rows, bytes and "
+                                     "script memory per AMP and partition "
+                                     "for candidate PARTITION BY and HASH BY "
+                                     "columns.")
+    parser.add_argument('--table', help="Table of the data/ directory")
+    parser.add_argument('--data-file', help="Extract of the table")
+    parser.add_argument('--csv', help="Extract with a header line")
+    parser.add_argument('--delimiter', default=',')
+    parser.add_argument('--partition-by', nargs='+', default=[])
+    parser.add_argument('--hash-by', nargs='+', default=[])
+    parser.add_argument('--amps', type=int, default=4)
+    parser.add_argument('--script', help="Memory model of tdstoCapacity.py")
+    parser.add_argument('--fixed-mb', type=float)
+    parser.add_argument('--bytes-per-row', type=float)
+    parser.add_argument('--trace', nargs='+', default=[],
+                        help="Files with tdstoMem summaries of the scripts")
+    parser.add_argument('--mem-limit-mb', type=float, default=1024.)
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--safety', type=float, default=0.8)
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--data-dir', default=tdstoEmulate.DATA_DIR)
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    if bool(args.table) == bool(args.csv):
+        parser.error("specify one of --table or --csv")
+    if args.amps <= 0 or args.concurrency <= 0:
+        parser.error("--amps and --concurrency must be positive")
+
+    # Columns and lines of the input
+    if args.table:
+        spec = findTable(args.data_dir, args.table)
+        dataFile = args.data_file or spec['dataFile']
+        columns, delimiter, skip = (spec['columns'], spec['delimiter'],
+                                    spec['skip'])
+        if not (args.partition_by or args.hash_by):
+            args.hash_by = [spec['primaryIndex']]
+    else:
+        dataFile, delimiter, skip = args.csv, args.delimiter, 1
+        with open(dataFile) as fIn:
+            columns = fIn.readline().rstrip('\r\n').split(delimiter)
+        if not (args.partition_by or args.hash_by):
+            parser.error("specify --partition-by or --hash-by")
+    if not os.path.exists(dataFile):
+        sys.exit("tdstoSkew: Data file %s not found" % dataFile)
+
+    lower = [c.lower() for c in columns]
+    candidates = ([(col, True) for col in args.partition_by]
+                  + [(col, False) for col in args.hash_by])
+    for col, _ in candidates:
+        if col.lower() not in lower:
+            parser.error("no column %s in %s" % (col, ', '.join(columns)))
+    positions = [lower.index(col.lower()) for col, _ in candidates]
+    stats = [KeyStats(col, partitionBy, args.amps)
+             for col, partitionBy in candidates]
+
+    # Memory model of the script
+    model = None
+    if args.script:
+        models = dict(tdstoCapacity.MODELS)
+        models.update(tdstoCapacity.modelsFromTraces(args.trace))
+        if args.script not in models:
+            parser.error("no model for %s; one of %s"
+                         % (args.script, ', '.join(sorted(models))))
+        model = models[args.script]
+    elif args.bytes_per_row is not None:
+        model = ('custom', args.fixed_mb or 0., args.bytes_per_row,
+                 'partition')
+    mem = MemModel(model, args.mem_limit_mb / args.concurrency, args.safety)
+
+    with open(dataFile, errors='replace') as fIn:
+        for _ in range(skip):
+            fIn.readline()
+        nRows = scanLines(fIn, delimiter, stats, positions)
+
+    reports = [analyze(stat, mem, args.top) for stat in stats]
+    if args.json:
+        print(json.dumps({'dataFile': dataFile, 'rows': nRows,
+                          'amps': args.amps, 'model': model,
+                          'budgetMB': mem.budgetMB, 'candidates': reports},
+                         indent=1))
+    else:
+        print("%s: %d rows" % (dataFile, nRows))
+        print("")
+        for report in reports:
+            printReport(report, mem)
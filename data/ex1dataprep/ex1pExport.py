@@ -0,0 +1,80 @@
+################################################################################
+# The contents of this file are Teradata Public Content
+# and have been released to the Public Domain.
+# Licensed under BSD; see "license.txt" file for more information.
+# Copyright (c) 2023 by Teradata
+################################################################################
+#
+# R And Python Analytics with SCRIPT Table Operator
+# Orange Book supplementary material
+# Alexander Kolovos - October 2026 - v.2.6
+#
+# Example 1: Scoring (Python version)
+# File     : ex1pExport.py
+#
+# Note: Present script is meant to be run on a client machine
+#
+# Export the Random Forests model of "ex1pMod.out" into a flattened format of
+# contiguous numpy arrays that is scored in the database by the pure numpy
+# engine in the shared module "tdstoForest.py". The scoring nodes then need
+# no scikit-learn package, and script instances start faster.
+# Execute this script after "ex1pFit.py" and in advance of using the scoring
+# script "ex1pSco.py" in the database. The script checks that the exported
+# forest reproduces the scikit-learn predict_proba() values on the fitting
+# data before it saves the output file.
+#
+# Requires sklearn, pandas, numpy, pickle, and base64 add-on packages, and
+# the "tdstoForest.py" module from the scripts/ directory of this package.
+#
+# Required input:
+# - Python model file "ex1pMod.out" produced by "ex1pFit.py"
+# - model fitting data from the file "ex1dataFit.csv"
+#
+# Output:
+# - Flattened model file "ex1pForest.npz". To be imported in the database
+#   together with the scoring Python script.
+#
+################################################################################
+
+# Load dependency packages
+import os
+import sys
+import pandas as pd
+import numpy as np
+import pickle
+import base64
+
+# The tdstoForest module resides in the scripts/ directory of the package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', '..', 'scripts'))
+import tdstoForest
+
+# Load the model in the same manner as the scoring script does
+with open('ex1pMod.out', 'rb') as fIn:
+    classifier = pickle.loads(base64.b64decode(fIn.read()))
+
+if classifier.n_outputs_ != 1:
+    sys.exit("ex1pExport: Only single-output classifiers can be exported.")
+
+predictor_columns = ["tot_income", "tot_age", "tot_cust_years", "tot_children",
+                     "female_ind", "single_ind", "married_ind", "separated_ind",
+                     "ck_acct_ind", "sv_acct_ind", "ck_avg_bal", "sv_avg_bal",
+                     "ck_avg_tran_amt", "sv_avg_tran_amt", "q1_trans_cnt",
+                     "q2_trans_cnt", "q3_trans_cnt", "q4_trans_cnt"]
+
+# Flatten the nodes of all trees into one set of arrays
+forest = tdstoForest.StoForest.fromClassifier(classifier, predictor_columns)
+
+# Check the flattened forest against scikit-learn on the fitting data
+trainDataDF = pd.read_csv("ex1dataFit.csv", sep=",", index_col=None)
+X = trainDataDF[predictor_columns]
+maxDiff = np.abs(forest.predict_proba(X) - classifier.predict_proba(X)).max()
+print("Trees:", forest.nTrees, " Nodes:", forest.nNodes,
+      " Max depth:", forest.maxDepth,
+      " Max abs difference to predict_proba():", maxDiff)
+if maxDiff > 1e-9:
+    sys.exit("ex1pExport: Flattened forest does not match the model.")
+
+# Export the flattened forest into file
+with open('ex1pForest.npz', 'wb') as fOut:
+    forest.save(fOut)
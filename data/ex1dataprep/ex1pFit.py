@@ -24,12 +24,39 @@
 # into "ex1pMod.out". This task is assumed to take place on a client machine
 # where the present script and the data file with the fitting data reside.
 # Execute this script in advance of using the scoring script "ex1pSco.py"
-# in the database.
+# in the database. Optionally, execute "ex1pExport.py" next to export the
+# model into a flattened format that is scored without scikit-learn.
+#
+# The fitting data are read in chunks of typed columns into a float32 feature
+# matrix in a memory-mapped temporary file, so that training extracts larger
+# than the client memory can be used. scikit-learn fits its trees on float32
+# features, so the matrix is used without a copy, and the model is the same
+# as when the data are fitted from a pandas DataFrame. The trees are fitted
+# in parallel on all cores of the client. The saved model scores on a single
+# core in the database, like before.
+#
+# A saved model can be grown with more trees that are fitted on new data,
+# without refitting the existing trees (option --add-trees). The new trees
+# only see the new data; the model stays loadable by "ex1pSco.py" and
+# "ex1pExport.py".
 #
 # Requires sklearn, pandas, numpy, pickle, and base64 add-on packages.
 #
 # Required input:
-# - model fitting data from the file "ex1dataFit.csv"
+# - model fitting data from the file "ex1dataFit.csv", or from a CSV file with
+#   the same columns
+#
+# Input Parameters (all optional):
+# - --data FILE     : CSV file with the fitting data (default: ex1dataFit.csv)
+# - --model FILE    : Model file to write, or to grow (default: ex1pMod.out)
+# - --trees N       : Number of trees of a new model (default: 10)
+# - --max-depth N   : Maximum depth of the trees of a new model (default:
+#                     unlimited). See "ex1pTune.py" to choose the model size.
+# - --add-trees N   : Load the model file, and add N trees fitted on the data
+# - --n-jobs N      : Number of cores to fit with (default: -1, all cores)
+# - --chunk-rows N  : Number of CSV rows to read at a time (default: 100000)
+# - --work-dir DIR  : Directory for the temporary feature matrix file
+#                     (default: the system temporary directory)
 #
 # Output:
 # - Python model file "ex1pMod.out". To be imported in the database together
@@ -39,14 +66,25 @@
 
 # Load dependency packages
 from sklearn.ensemble import RandomForestClassifier
+import argparse
+import sys
+import tempfile
 import pandas as pd
 import numpy as np
 import pickle
 import base64
 
-# Import the fitting data from CSV file
-trainDataDF = pd.read_csv("ex1dataFit.csv", sep=",", index_col=None)
-trainDataDF.head()
+parser = argparse.ArgumentParser(description="Fit the ex1 Random Forests "
+                                 "model.")
+parser.add_argument('--data', default='ex1dataFit.csv')
+parser.add_argument('--model', default='ex1pMod.out')
+parser.add_argument('--trees', type=int, default=10)
+parser.add_argument('--max-depth', type=int)
+parser.add_argument('--add-trees', type=int, default=0)
+parser.add_argument('--n-jobs', type=int, default=-1)
+parser.add_argument('--chunk-rows', type=int, default=100000)
+parser.add_argument('--work-dir')
+args = parser.parse_args()
 
 # Create a classification model training with Random Forests.
 # Determine the columns that the predictor accounts for:
@@ -56,6 +94,28 @@ predictor_columns = ["tot_income", "tot_age", "tot_cust_years", "tot_children",
                      "ck_avg_tran_amt", "sv_avg_tran_amt", "q1_trans_cnt",
                      "q2_trans_cnt", "q3_trans_cnt", "q4_trans_cnt"]
 
+
+def loadFeatures(fileName, featFile, chunkRows):
+    """Read the fitting data of a CSV file in chunks. Append the predictor
+    columns of every chunk to featFile as float32 rows, and return the
+    memory-mapped feature matrix of the file and the class labels."""
+    labels = []
+    dtypes = dict.fromkeys(predictor_columns, np.float32)
+    for dfChunk in pd.read_csv(fileName, sep=",", index_col=None,
+                               usecols=predictor_columns + ["cc_acct_ind"],
+                               dtype=dtypes, chunksize=chunkRows):
+        np.ascontiguousarray(dfChunk[predictor_columns].to_numpy(),
+                             dtype=np.float32).tofile(featFile)
+        labels.append(dfChunk["cc_acct_ind"].to_numpy())
+    featFile.flush()
+    y = np.concatenate(labels)
+    if y.size == 0:
+        sys.exit("ex1pFit: No fitting data in " + fileName)
+    X = np.memmap(featFile.name, dtype=np.float32, mode='r',
+                  shape=(y.size, len(predictor_columns)))
+    return X, y
+
+
 # Note: The Random Forests classifier from the scikit-learn package that you
 #       use in the present file must be compatible with the corresponding
 #       classifier version in the scikit-learn package that is installed in the
@@ -66,16 +126,41 @@ predictor_columns = ["tot_income", "tot_age", "tot_cust_years", "tot_children",
 #       scikit-learn version to match in-nodes. You can check the version
 #       installed on your client with "pip install scikit-learn==<version>".
 
-# For the classifier, specify the following parameters:
-# ntree: n_estimators=10, mtry: max_features=3,
-# nodesize: min_samples_leaf=1 (default; skipped)
-classifier = RandomForestClassifier(n_estimators=10, max_features=3, random_state=0)
-X = trainDataDF[predictor_columns]
-y = trainDataDF["cc_acct_ind"]
+if args.add_trees > 0:
+    # Grow the saved model: the existing trees are kept, and only the added
+    # trees are fitted on the present data.
+    with open(args.model, 'rb') as fIn:
+        classifier = pickle.loads(base64.b64decode(fIn.read()))
+    classifier.set_params(warm_start=True,
+                          n_estimators=classifier.n_estimators
+                          + args.add_trees)
+else:
+    # For the classifier, specify the following parameters:
+    # ntree: n_estimators=10, mtry: max_features=3,
+    # nodesize: min_samples_leaf=1 (default; skipped)
+    classifier = RandomForestClassifier(n_estimators=args.trees,
+                                        max_features=3,
+                                        max_depth=args.max_depth,
+                                        random_state=0)
+classifier.set_params(n_jobs=args.n_jobs)
 
 # Train the Random Forest model to predict Credit Card account ownership based
 # upon the specified independent variables.
-classifier = classifier.fit(X, y)
+with tempfile.NamedTemporaryFile(dir=args.work_dir, prefix='ex1pFit',
+                                 suffix='.f32') as featFile:
+    X, y = loadFeatures(args.data, featFile, args.chunk_rows)
+    nTreesBefore = len(getattr(classifier, 'estimators_', []))
+    classifier = classifier.fit(X, y)
+    del X
+
+# The matrix has no column names, so set the names that a fit from a pandas
+# DataFrame sets, and that the scoring script input has. Reset the options
+# of the fit, so that the model scores on a single core in the database.
+classifier.feature_names_in_ = np.asarray(predictor_columns, dtype=object)
+classifier.set_params(n_jobs=None, warm_start=False)
+print("Rows:", y.size, " Trees fitted:",
+      len(classifier.estimators_) - nTreesBefore,
+      " Trees in model:", len(classifier.estimators_))
 
 # Export the Random Forest model into file
 # Note: In the following, we use both pickle (serialize) and base64 (encode)
@@ -86,5 +171,5 @@ classifier = classifier.fit(X, y)
 #       https://docs.python.org/3/library/pickle.html#pickling-class-instances
 classifierPkl = pickle.dumps(classifier)
 classifierPklB64 = base64.b64encode(classifierPkl)
-with open('ex1pMod.out', 'wb') as fOut:   # Using "wb" to write in binary format
+with open(args.model, 'wb') as fOut:   # Using "wb" to write in binary format
     fOut.write(classifierPklB64)
@@ -0,0 +1,236 @@
+################################################################################
+# The contents of this file are Teradata Public Content
+# and have been released to the Public Domain.
+# Licensed under BSD; see "license.txt" file for more information.
+# Copyright (c) 2023 by Teradata
+################################################################################
+#
+# R And Python Analytics with SCRIPT Table Operator
+# Orange Book supplementary material
+# Alexander Kolovos - October 2026 - v.2.6
+#
+# Example 1: Scoring (Python version)
+# File     : ex1pTune.py
+#
+# Note: Present script is meant to be run on a client machine
+#
+# Explore the trade-off between the cost and the accuracy of the Random
+# Forests model of "ex1pFit.py". The model of "ex1pFit.py" has 10 trees of
+# unlimited depth, and its cost in the database grows with the number of
+# trees and of nodes: every script instance decodes the model, and scores
+# every row through every tree. The present script fits a grid of models
+# with different numbers of trees and maximum depths on part of the fitting
+# data, and measures for each model:
+# - usSklearn  : Scoring time per row in microseconds with scikit-learn
+#                predict_proba() on a single core, like "ex1pSco.py" does
+#                with the pickled model
+# - usNumpy    : Scoring time per row with the numpy engine of
+#                "tdstoForest.py", like "ex1pSco.py" does with the flattened
+#                model of "ex1pExport.py"
+# The scoring times are measured on a batch of the size of an input chunk of
+# "ex1pSco.py", made of copies of the holdout rows, so that the fixed cost
+# per call does not inflate the time per row.
+# - modelKB    : Size of the model file "ex1pMod.out" (base64-encoded pickle)
+# - forestKB   : Size of the flattened model file "ex1pForest.npz"
+# - decodedMB  : Memory of the node and value arrays of the trees of the
+#                decoded scikit-learn model
+# - accuracy, auc: Accuracy and ROC AUC of the model on the holdout rows
+# The holdout rows are a stratified random part of the fitting data, which
+# the models are not fitted on. The models are therefore fitted on the other
+# (1 - holdout) part of the data, and their accuracy is somewhat lower than
+# that of the same model fitted on all data by "ex1pFit.py".
+# A model is on the Pareto frontier if no other model is at least as fast and
+# as accurate (in AUC), and better in one of these. The model sizes and memory
+# grow with the number of nodes, and are reported alongside. The script
+# reports all models with the frontier models marked, and recommends the
+# fastest model whose AUC meets a target.
+#
+# Requires sklearn, pandas, numpy, pickle, and base64 add-on packages, and the
+# "tdstoForest.py" module from the scripts/ directory of this package.
+#
+# Required input:
+# - model fitting data from the file "ex1dataFit.csv", or from a CSV file with
+#   the same columns
+#
+# Input Parameters (all optional):
+# - --data FILE      : CSV file with the fitting data (default: ex1dataFit.csv)
+# - --trees N ...    : Numbers of trees (default: 5 10 25 50 100)
+# - --depths D ...   : Maximum depths; "none" for unlimited depth
+#                      (default: 4 6 8 12 none)
+# - --holdout F      : Fraction of the rows held out (default: 0.25)
+# - --batch N        : Rows per scoring call (default: 50000, a typical input
+#                      chunk of "ex1pSco.py" once the chunk sizer has grown
+#                      the chunks)
+# - --repeat R       : Scoring repetitions; the fastest counts (default: 5)
+# - --min-auc A      : AUC target for the recommendation (default: the AUC of
+#                      the model of "ex1pFit.py" on the holdout rows, minus
+#                      0.005)
+# - --engine NAME    : Scoring time of the frontier: sklearn or numpy
+#                      (default: sklearn)
+# - --json FILE      : Also write the results into a JSON file
+#
+# Output:
+# - Table of the measures of every model, with the Pareto frontier marked
+# - Recommended model parameters for "ex1pFit.py"
+#
+################################################################################
+
+# Load dependency packages
+import argparse
+import io
+import json
+import os
+import sys
+import time
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score, roc_auc_score
+from sklearn.model_selection import train_test_split
+import pandas as pd
+import pickle
+import base64
+
+# The tdstoForest module resides in the scripts/ directory of the package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', '..', 'scripts'))
+import tdstoForest
+
+parser = argparse.ArgumentParser(description="Measure the cost and the "
+                                 "accuracy of a grid of ex1 forest models.")
+parser.add_argument('--data', default='ex1dataFit.csv')
+parser.add_argument('--trees', type=int, nargs='+', default=[5, 10, 25, 50,
+                                                             100])
+parser.add_argument('--depths', nargs='+', default=['4', '6', '8', '12',
+                                                    'none'])
+parser.add_argument('--holdout', type=float, default=0.25)
+parser.add_argument('--batch', type=int, default=50000)
+parser.add_argument('--repeat', type=int, default=5)
+parser.add_argument('--min-auc', type=float)
+parser.add_argument('--engine', choices=['sklearn', 'numpy'],
+                    default='sklearn')
+parser.add_argument('--json')
+args = parser.parse_args()
+
+predictor_columns = ["tot_income", "tot_age", "tot_cust_years", "tot_children",
+                     "female_ind", "single_ind", "married_ind", "separated_ind",
+                     "ck_acct_ind", "sv_acct_ind", "ck_avg_bal", "sv_avg_bal",
+                     "ck_avg_tran_amt", "sv_avg_tran_amt", "q1_trans_cnt",
+                     "q2_trans_cnt", "q3_trans_cnt", "q4_trans_cnt"]
+
+trainDataDF = pd.read_csv(args.data, sep=",", index_col=None)
+X = trainDataDF[predictor_columns]
+y = trainDataDF["cc_acct_ind"]
+XFit, XHold, yFit, yHold = train_test_split(X, y, test_size=args.holdout,
+                                            random_state=0, stratify=y)
+# Scoring batch of the size of an input chunk, from copies of the holdout rows
+nCopies = -(-args.batch // XHold.shape[0])
+XBatch = pd.concat([XHold] * nCopies, ignore_index=True).iloc[:args.batch]
+
+
+def bestSecs(score, repeat):
+    """Fastest wall time of repeated calls of score()."""
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        score()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def measure(nTrees, maxDepth):
+    """Fit a model on the fitting rows, and return its measures."""
+    classifier = RandomForestClassifier(n_estimators=nTrees, max_features=3,
+                                        max_depth=maxDepth, random_state=0)
+    classifier.set_params(n_jobs=-1)
+    classifier.fit(XFit, yFit)
+    classifier.set_params(n_jobs=None)     # Score on one core, like in-nodes
+
+    # Model file sizes, and the memory of the decoded model
+    modelPkl = pickle.dumps(classifier)
+    forest = tdstoForest.StoForest.fromClassifier(classifier,
+                                                  predictor_columns)
+    forestFile = io.BytesIO()
+    forest.save(forestFile)
+    decodedBytes = 0
+    for estimator in pickle.loads(modelPkl).estimators_:
+        state = estimator.tree_.__getstate__()
+        decodedBytes += state['nodes'].nbytes + state['values'].nbytes
+
+    proba = classifier.predict_proba(XHold)[:, 1]
+    nRows = XBatch.shape[0]
+    return {
+        'trees': nTrees,
+        'depth': maxDepth,
+        'nodes': forest.nNodes,
+        'usSklearn': 1e6 * bestSecs(lambda: classifier.predict_proba(XBatch),
+                                    args.repeat) / nRows,
+        'usNumpy': 1e6 * bestSecs(lambda: forest.predict_proba(XBatch),
+                                  args.repeat) / nRows,
+        'modelKB': len(base64.b64encode(modelPkl)) / 1024.,
+        'forestKB': len(forestFile.getvalue()) / 1024.,
+        'decodedMB': decodedBytes / 1048576.,
+        'accuracy': accuracy_score(yHold, classifier.predict(XHold)),
+        'auc': roc_auc_score(yHold, proba)}
+
+
+def paretoFrontier(results, latency):
+    """Mark the results that no other result dominates in the scoring time
+    and the AUC."""
+    for r in results:
+        r['pareto'] = not any(
+            other[latency] <= r[latency] and other['auc'] >= r['auc']
+            and (other[latency] < r[latency] or other['auc'] > r['auc'])
+            for other in results if other is not r)
+
+
+depths = [None if depth.lower() == 'none' else int(depth)
+          for depth in args.depths]
+results = []
+for nTrees in args.trees:
+    for maxDepth in depths:
+        results.append(measure(nTrees, maxDepth))
+        sys.stdout.write('.')
+        sys.stdout.flush()
+print("")
+
+latency = 'usSklearn' if args.engine == 'sklearn' else 'usNumpy'
+paretoFrontier(results, latency)
+
+# The AUC target defaults to the AUC of the model of ex1pFit.py
+minAuc = args.min_auc
+if minAuc is None:
+    reference = [r for r in results if r['trees'] == 10 and r['depth'] is None]
+    minAuc = (reference[0] if reference else measure(10, None))['auc'] - 0.005
+
+print("Models fitted on %d of %d rows; AUC and accuracy on the %d holdout "
+      "rows." % (XFit.shape[0], X.shape[0], XHold.shape[0]))
+print("Scoring time per row on batches of %d rows. Frontier (*) by %s "
+      "scoring time and AUC." % (XBatch.shape[0], args.engine))
+print("  %5s %5s %7s %10s %10s %9s %9s %10s %8s %7s"
+      % ('Trees', 'Depth', 'Nodes', 'us/row skl', 'us/row np', 'Model KB',
+         'NPZ KB', 'Decoded MB', 'Accuracy', 'AUC'))
+for r in sorted(results, key=lambda r: r[latency]):
+    print("%s %5d %5s %7d %10.2f %10.2f %9.1f %9.1f %10.2f %8.4f %7.4f"
+          % ('*' if r['pareto'] else ' ', r['trees'],
+             'none' if r['depth'] is None else r['depth'], r['nodes'],
+             r['usSklearn'], r['usNumpy'], r['modelKB'], r['forestKB'],
+             r['decodedMB'], r['accuracy'], r['auc']))
+
+meeting = [r for r in results if r['auc'] >= minAuc]
+if meeting:
+    best = min(meeting, key=lambda r: (r[latency], r['modelKB']))
+    print("Fastest model with AUC >= %.4f: %d trees, max depth %s (AUC %.4f, "
+          "%.2f us/row, %.1f KB)"
+          % (minAuc, best['trees'], best['depth'] or 'unlimited',
+             best['auc'], best[latency], best['modelKB']))
+    print("Fit it with: python ex1pFit.py --trees %d%s"
+          % (best['trees'], '' if best['depth'] is None
+             else ' --max-depth %d' % best['depth']))
+else:
+    print("No model reaches AUC %.4f" % minAuc)
+
+if args.json:
+    with open(args.json, 'w') as fOut:
+        json.dump({'engine': args.engine, 'minAuc': minAuc,
+                   'fitRows': XFit.shape[0], 'holdoutRows': XHold.shape[0],
+                   'batchRows': XBatch.shape[0],
+                   'results': results}, fOut, indent=1)
@@ -21,6 +21,11 @@
 -- Required input:
 -- - "ex1pSco.py" Python scoring script to install in database
 -- - "ex1pMod.out" scoring model Python object file to install in database
+-- - "tdstoIO.py" shared input/output Python module to install in database
+-- - "tdstoModelCache.py" shared model cache Python module to install in database
+-- - "tdstoForest.py" shared forest scoring Python module to install in database
+-- - "tdstoWorker.py" shared scoring worker Python module to install in database
+-- - Optional: "ex1pForest.npz" flattened model file from ex1pExport.py
 -- - ex1tblSco table data from file "ex1dataSco.csv"
 --
 -- Reminder: In case of errors, you can find the STO full standard error output
@@ -42,9 +47,26 @@ SET SESSION SEARCHUIFDBPATH = myDB;
 .set errorout stdout
 .set width 100
 
+-- Install the shared input/output module that the Python scripts import.
+CALL SYSUIF.REMOVE_FILE('tdstoIO',1);
+CALL SYSUIF.INSTALL_FILE('tdstoIO','tdstoIO.py','cz!/root/stoTests/tdstoIO.py');
+-- Install the shared module that caches the decoded model on each node.
+CALL SYSUIF.REMOVE_FILE('tdstoModelCache',1);
+CALL SYSUIF.INSTALL_FILE('tdstoModelCache','tdstoModelCache.py','cz!/root/stoTests/tdstoModelCache.py');
+-- Install the shared module that scores flattened forests without scikit-learn.
+CALL SYSUIF.REMOVE_FILE('tdstoForest',1);
+CALL SYSUIF.INSTALL_FILE('tdstoForest','tdstoForest.py','cz!/root/stoTests/tdstoForest.py');
+-- Install the shared module that relays the rows to a node scoring worker.
+CALL SYSUIF.REMOVE_FILE('tdstoWorker',1);
+CALL SYSUIF.INSTALL_FILE('tdstoWorker','tdstoWorker.py','cz!/root/stoTests/tdstoWorker.py');
+
 -- Install model file. Adjust names and paths appropriately for your filesystem.
 CALL SYSUIF.REMOVE_FILE('ex1pMod',1);
 CALL SYSUIF.INSTALL_FILE('ex1pMod','ex1pMod.out','cb!/root/stoTests/ex1pMod.out');
+-- Optional: Install the flattened forest produced by ex1pExport.py. When this
+-- file is present, the scoring scripts use it instead of ex1pMod.out.
+-- CALL SYSUIF.REMOVE_FILE('ex1pForest',1);
+-- CALL SYSUIF.INSTALL_FILE('ex1pForest','ex1pForest.npz','cb!/root/stoTests/ex1pForest.npz');
 
 -- Scoring with the model
 --
@@ -21,11 +21,18 @@
 # Script performs identical task as ex1pScoNonIter.py. Reads in data in chunks.
 # Script accounts for the general scenario that an AMP might have no data.
 #
-# Requires numpy, pandas, scikitlearn, pickle, and base64 add-on packages.
+# Requires numpy, pandas, and scikitlearn add-on packages.
+# The scikit-learn package is not needed, if the model is scored with the
+# flattened forest "ex1pForest.npz" (see below).
 #
 # Required input:
 # - ex1tblSco table data from file "ex1dataSco.csv"
-# - scoring model saved in Python model object "ex1pMod.out"
+# - scoring model saved in Python model object "ex1pMod.out", or
+#   scoring model saved in flattened forest file "ex1pForest.npz"
+# - shared input/output module "tdstoIO.py" installed next to the script
+# - shared model cache module "tdstoModelCache.py" installed next to the script
+# - shared forest scoring module "tdstoForest.py" installed next to the script
+# - shared scoring worker module "tdstoWorker.py" installed next to the script
 #
 # Output:
 # - cust_id    : The customer ID
@@ -36,13 +43,22 @@
 ################################################################################
 
 # Load dependency packages
+import os
 import sys
-import numpy as np
-import pandas as pd
-from sklearn.ensemble import RandomForestClassifier
-import pickle
-import base64
+import time
+import tdstoWorker
+
+# Optional persistent worker mode: If a pre-warmed scoring worker is running
+# on the node (see tdstoWorker.py), then relay the input rows to the worker and
+# exit. This skips the package imports and the model loading that follow.
+# If no worker is running, then the script scores the rows in-process.
+if tdstoWorker.relay('ex1', {'modelDir': os.path.realpath('myDB')}):
+    sys.exit()
+
 import warnings
+import tdstoIO
+import tdstoModelCache
+import tdstoForest
 
 # pickle will issue a caution warning, if model pickling was done with
 # different library version than used here. The following disables any warnings
@@ -68,50 +84,29 @@ colNames = ['cust_id', 'tot_income', 'tot_age', 'tot_cust_years',
            'q2_trans_cnt', 'q3_trans_cnt', 'q4_trans_cnt']
 # Of the above input columns, the following ones are of type float: tot_income,
 # ck_avg_bal, sv_avg_bal, cc_avg_bal, ck_avg_tran_amt, sv_avg_tran_amt, and
-# cc_avg_tran_amt. The rest are integer variables.
-# If any numbers are streamed in scientific format that contains blanks i
-# (such as "1 E002" for 100), the following Lambda functions remove blanks
-# from the input string so that Python interprets the number correctly.
-sciStrToFloat = lambda x: float("".join(x.split()))
-sciStrToInt = lambda x: int(float("".join(x.split())))
-# Use these Lambda functions in the following converters for each input culumn.
-converters = { 0: sciStrToInt,
-               1: sciStrToFloat,
-               2: sciStrToInt,
-               3: sciStrToInt,
-               4: sciStrToInt,
-               5: sciStrToInt,
-               6: sciStrToInt,
-               7: sciStrToInt,
-               8: sciStrToInt,
-               9: sciStrToInt,
-              10: sciStrToInt,
-              11: sciStrToInt,
-              12: sciStrToInt,
-              13: sciStrToInt,
-              14: sciStrToInt,
-              15: sciStrToInt,
-              16: sciStrToInt,
-              17: sciStrToInt,
-              18: sciStrToFloat,
-              19: sciStrToFloat,
-              20: sciStrToFloat,
-              21: sciStrToFloat,
-              22: sciStrToFloat,
-              23: sciStrToFloat,
-              24: sciStrToInt,
-              25: sciStrToInt,
-              26: sciStrToInt,
-              27: sciStrToInt}
-
-# Load model from input file
-fIn = open('myDB/ex1pMod.out', 'rb')   # 'rb' for reading binary file
-classifierPklB64 = fIn.read()
-fIn.close()
-
-# Decode and unserialize from imported format
-classifierPkl = base64.b64decode(classifierPklB64)
-classifier = pickle.loads(classifierPkl)
+# cc_avg_tran_amt. The rest are integer variables. Declare the types once for
+# the typed reader in tdstoIO. The reader also takes care of any numbers that
+# are streamed in scientific format with blanks (such as "1 E002" for 100).
+floatCols = ['tot_income', 'ck_avg_bal', 'sv_avg_bal', 'cc_avg_bal',
+             'ck_avg_tran_amt', 'sv_avg_tran_amt', 'cc_avg_tran_amt']
+colTypes = {name: (tdstoIO.FLOAT if name in floatCols else tdstoIO.INT)
+            for name in colNames}
+
+# Load model from input file. The file contents are decoded by the first
+# script instance on the node only. That instance saves the decoded model in
+# the node model cache, and the other instances on the node attach to the
+# cached copy. See tdstoModelCache.py for details.
+# If the flattened forest file "ex1pForest.npz" from ex1pExport.py has been
+# installed, then score with the numpy engine in tdstoForest.py. This avoids
+# importing scikit-learn. Otherwise, use the pickled scikit-learn model.
+if os.path.exists('myDB/ex1pForest.npz'):
+    classifier = tdstoModelCache.loadModel('myDB/ex1pForest.npz',
+                                           tdstoForest.decodeForest)
+else:
+    classifier = tdstoModelCache.loadModel('myDB/ex1pMod.out',
+                                           tdstoModelCache.decodeB64Pickle)
+# Optionally record the memory of the script with the model loaded
+tdstoIO.memMark('model')
 
 # Score the test table data with the given model
 predictor_columns = ["tot_income", "tot_age", "tot_cust_years", "tot_children",
@@ -122,49 +117,84 @@ predictor_columns = ["tot_income", "tot_age", "tot_cust_years", "tot_children",
 
 ### Ingest and process the rest of the input data rows, nRowsIn at a pass
 ###
-nRowsIn = 500
-
-# To read input in chunks, the read_csv reader function must have the
-# iterator argument set to True. The following assigns the function to
-# an object that we name reader. The reader object will be used in the
-# following with the get_chunk() function to read the data in chunks.
-reader = pd.read_csv(sys.stdin, sep=DELIMITER, header=None, names=colNames,
-                     index_col=False, iterator=True, converters=converters)
-
-# Use try...except to produce an error if something goes wrong in the try block
-try:
-
+# The number of rows nRowsIn in each pass adapts to the data. The chunk sizer
+# starts from the memory budget of the script (ScriptMemLimit divided by the
+# expected concurrency, see tdstoIO.py), and then grows or shrinks the chunks
+# based on the measured time per chunk and resident memory of the script.
+# With the score pool below, several chunks are in memory at a time: the
+# chunks being scored, and the chunks read ahead.
+nWorkers = tdstoIO.scoreWorkers()
+
+# The typed reader parses the input with the pandas C engine and only keeps
+# the columns that the script needs. Like the pandas reader, it is used with
+# the get_chunk() function to read the data in chunks. The prefetch reader
+# reads and parses the next chunk on a background thread while the present
+# chunk is scored and written (see tdstoIO.py). The script holds up to one
+# chunk per score worker, and marks each chunk as done once it is written.
+schema = tdstoIO.StoSchema(colNames, colTypes,
+                           useCols=['cust_id', 'cc_acct_ind'] +
+                                   predictor_columns)
+reader = tdstoIO.StoPrefetchReader(schema, delimiter=DELIMITER,
+                                   held=nWorkers)
+sizer = tdstoIO.StoChunkSizer(heldChunks=nWorkers + reader.prefetch)
+# The bulk writer formats each chunk of results at once and writes it to the
+# standard output in one call.
+writer = tdstoIO.StoWriter(delimiter=DELIMITER)
+
+
+def scoreChunk(dfToScore):
+    """Specify the rows to be scored by the model and call the predictor.
+    Also return the scoring time of the chunk, for the chunk sizer."""
+    tScore = time.perf_counter()
+    X_test = dfToScore[predictor_columns]
+    return classifier.predict_proba(X_test), time.perf_counter() - tScore
+
+
+def inputChunks():
+    """Yield the input chunks, with the size adapted by the chunk sizer."""
     while 1:
 
+        nRowsIn = sizer.nRows
+
         try:
-            # CAUTION: The following statement CONTINUES the row index count for
-            #          the DataFrame from where the previous iteration stopped!
-            dfToScore = reader.get_chunk(nRowsIn)
+            # The row index of each chunk starts at 0.
+            dfToScore = reader.getChunk(nRowsIn)
         except (EOFError, StopIteration):
             # Exit gracefully if no input received at all or iteration complete
-            sys.exit()
+            return
         except:              # Raise an exception if other error encountered
             raise
 
         # Exit gracefully if DataFrame is empty
         if dfToScore.empty:
-            sys.exit()
+            return
+
+        yield dfToScore
+
+
+# Optionally, score several chunks at a time on idle cores of the node. The
+# pool is off unless the TDSTO_SCORE_WORKERS environment variable is set, and
+# returns the scores in the order of the input (see tdstoIO.py).
+pool = tdstoIO.StoScorePool(scoreChunk, nWorkers)
+
+# Use try...except to produce an error if something goes wrong in the try block
+try:
 
-        # Specify the rows to be scored by the model and call the predictor.
-        X_test = dfToScore[predictor_columns]
-        PredictionProba = classifier.predict_proba(X_test)
+    for dfToScore, (PredictionProba, scoreSecs) in pool.map(inputChunks()):
 
         # Export results to the Database through standard output.
-        # In the following, the iterative process increases the dfToScore
-        # index values even across iterations. For this reason, we use
-        # positional indices with iat to print specific values.
-        # The cust_id is at column 0, and the cc_acct_ind is at column 17.
-        # In PredictionProba array, elem. 0 is Prob(0) and elem. 0 is Prob(1).
-        for i in range(0, dfToScore.shape[0]):
-            print(dfToScore.iat[i, 0], DELIMITER,
-                  PredictionProba[i, 0], DELIMITER,
-                  PredictionProba[i, 1], DELIMITER,
-                  dfToScore.iat[i, 17])
+        tWrite = time.perf_counter()
+        # In PredictionProba array, col. 0 is Prob(0) and col. 1 is Prob(1).
+        writer.writeColumns(dfToScore['cust_id'],
+                            PredictionProba[:, 0], PredictionProba[:, 1],
+                            dfToScore['cc_acct_ind'])
+        reader.done()
+
+        # Adapt the size of the next chunk to the time spent on the present
+        # one. With the score pool, several chunks are in progress at a time,
+        # so the time is measured on the chunk itself.
+        sizer.update(dfToScore,
+                     secs=scoreSecs + time.perf_counter() - tWrite)
 
 except (SystemExit):
     # Skip exception if system exit requested in try block
@@ -173,3 +203,6 @@ except:    # Specify in standard error any other error encountered
     print("Script Failure :", sys.exc_info()[0], file=sys.stderr)
     raise
     sys.exit()
+finally:
+    # Stop the workers of the score pool, also after an error
+    pool.close()
@@ -22,11 +22,17 @@
 # are not read in chunks (practice not recommended for In-Database execution).
 # Script accounts for the general scenario that an AMP might have no data.
 #
-# Requires numpy, pandas, scikitlearn, pickle, and base64 add-on packages.
+# Requires numpy, pandas, and scikitlearn add-on packages.
+# The scikit-learn package is not needed, if the model is scored with the
+# flattened forest "ex1pForest.npz" (see below).
 #
 # Required input:
 # - ex1tblSco table data from file "ex1dataSco.csv"
-# - scoring model saved in Python model object "ex1pMod.out"
+# - scoring model saved in Python model object "ex1pMod.out", or
+#   scoring model saved in flattened forest file "ex1pForest.npz"
+# - shared input/output module "tdstoIO.py" installed next to the script
+# - shared model cache module "tdstoModelCache.py" installed next to the script
+# - shared forest scoring module "tdstoForest.py" installed next to the script
 #
 # Output:
 # - cust_id    : The customer ID
@@ -37,13 +43,12 @@
 ################################################################################
 
 # Load dependency packages
+import os
 import sys
-import numpy as np
-import pandas as pd
-from sklearn.ensemble import RandomForestClassifier
-import pickle
-import base64
 import warnings
+import tdstoIO
+import tdstoModelCache
+import tdstoForest
 
 # pickle will issue a caution warning, if model pickling was done with
 # different library version than used here. The following disables any warnings
@@ -69,50 +74,29 @@ colNames = ['cust_id', 'tot_income', 'tot_age', 'tot_cust_years',
            'q2_trans_cnt', 'q3_trans_cnt', 'q4_trans_cnt']
 # Of the above input columns, the following ones are of type float: tot_income,
 # ck_avg_bal, sv_avg_bal, cc_avg_bal, ck_avg_tran_amt, sv_avg_tran_amt, and
-# cc_avg_tran_amt. The rest are integer variables.
-# If any numbers are streamed in scientific format that contains blanks i
-# (such as "1 E002" for 100), the following Lambda functions remove blanks
-# from the input string so that Python interprets the number correctly.
-sciStrToFloat = lambda x: float("".join(x.split()))
-sciStrToInt = lambda x: int(float("".join(x.split())))
-# Use these Lambda functions in the following converters for each input column.
-converters = { 0: sciStrToInt,
-               1: sciStrToFloat,
-               2: sciStrToInt,
-               3: sciStrToInt,
-               4: sciStrToInt,
-               5: sciStrToInt,
-               6: sciStrToInt,
-               7: sciStrToInt,
-               8: sciStrToInt,
-               9: sciStrToInt,
-              10: sciStrToInt,
-              11: sciStrToInt,
-              12: sciStrToInt,
-              13: sciStrToInt,
-              14: sciStrToInt,
-              15: sciStrToInt,
-              16: sciStrToInt,
-              17: sciStrToInt,
-              18: sciStrToFloat,
-              19: sciStrToFloat,
-              20: sciStrToFloat,
-              21: sciStrToFloat,
-              22: sciStrToFloat,
-              23: sciStrToFloat,
-              24: sciStrToInt,
-              25: sciStrToInt,
-              26: sciStrToInt,
-              27: sciStrToInt}
+# cc_avg_tran_amt. The rest are integer variables. Declare the types once for
+# the typed reader in tdstoIO. The reader also takes care of any numbers that
+# are streamed in scientific format with blanks (such as "1 E002" for 100).
+floatCols = ['tot_income', 'ck_avg_bal', 'sv_avg_bal', 'cc_avg_bal',
+             'ck_avg_tran_amt', 'sv_avg_tran_amt', 'cc_avg_tran_amt']
+colTypes = {name: (tdstoIO.FLOAT if name in floatCols else tdstoIO.INT)
+            for name in colNames}
 
-# Load model from input file
-fIn = open('myDB/ex1pMod.out', 'rb')   # 'rb' for reading binary file
-classifierPklB64 = fIn.read()
-fIn.close()
-
-# Decode and unserialize from imported format
-classifierPkl = base64.b64decode(classifierPklB64)
-classifier = pickle.loads(classifierPkl)
+# Load model from input file. The file contents are decoded by the first
+# script instance on the node only. That instance saves the decoded model in
+# the node model cache, and the other instances on the node attach to the
+# cached copy. See tdstoModelCache.py for details.
+# If the flattened forest file "ex1pForest.npz" from ex1pExport.py has been
+# installed, then score with the numpy engine in tdstoForest.py. This avoids
+# importing scikit-learn. Otherwise, use the pickled scikit-learn model.
+if os.path.exists('myDB/ex1pForest.npz'):
+    classifier = tdstoModelCache.loadModel('myDB/ex1pForest.npz',
+                                           tdstoForest.decodeForest)
+else:
+    classifier = tdstoModelCache.loadModel('myDB/ex1pMod.out',
+                                           tdstoModelCache.decodeB64Pickle)
+# Optionally record the memory of the script with the model loaded
+tdstoIO.memMark('model')
 
 # Score the test table data with the given model
 predictor_columns = ["tot_income", "tot_age", "tot_cust_years", "tot_children",
@@ -123,8 +107,10 @@ predictor_columns = ["tot_income", "tot_age", "tot_cust_years", "tot_children",
 
 ### Ingest and process the rest of the input data rows
 ###
-dfToScore = pd.read_csv(sys.stdin, sep=DELIMITER, header=None, names=colNames,
-                        index_col=False, iterator=False, converters=converters)
+schema = tdstoIO.StoSchema(colNames, colTypes,
+                           useCols=['cust_id', 'cc_acct_ind'] +
+                                   predictor_columns)
+dfToScore = tdstoIO.StoReader(schema, delimiter=DELIMITER).readAll()
 
 # For AMPs that receive no data, exit the script instance gracefully.
 if dfToScore.empty:
@@ -137,13 +123,8 @@ PredictionProba = classifier.predict_proba(X_test)
 #dfToScore = pd.concat([dfToScore, pd.DataFrame(data=PredictionProba,
 #                       columns=['Prob0', 'Prob1'])], axis=1)
 
-# Export results to the SQL Engine database through standard output
-for i in range(0, dfToScore.shape[0]):
-    print(dfToScore.at[i, 'cust_id'], DELIMITER,
-          PredictionProba[i, 0], DELIMITER,
-          PredictionProba[i, 1], DELIMITER,
-          dfToScore.at[i, 'cc_acct_ind'])
-
-#for index, row in dfToScore.iterrows():
-#    print(row['cust_id'], DELIMITER, row['Prob0'], DELIMITER,
-#          row['Prob1'], DELIMITER, row['cc_acct_ind'])
+# Export results to the SQL Engine database through standard output. The bulk
+# writer formats all result rows at once and writes them in one call.
+tdstoIO.StoWriter(delimiter=DELIMITER).writeColumns(
+    dfToScore['cust_id'], PredictionProba[:, 0], PredictionProba[:, 1],
+    dfToScore['cc_acct_ind'])
@@ -21,7 +21,9 @@
 #
 # Script accounts for the general scenario that an AMP might have no data.
 #
-# Requires numpy, sys and scikit-learn packages.
+# Requires numpy, pandas, sys and scikit-learn packages, the shared
+# input/output module "tdstoIO.py", and the shared silhouette module
+# "tdstoSilhouette.py" installed next to the script.
 #
 # Data Input:
 # - ex2tbl table data from file "ex2data.csv". Contains the variables:
@@ -32,6 +34,28 @@
 #
 # Input Parameter:
 # - n         : The number of clusters we want to create (default: n=5)
+# - nSample   : [Optional] Silhouette sample size. If specified, then the
+#               silhouette coefficients are computed only for a random sample
+#               of nSample observations. The average silhouette coefficient is
+#               then an estimate; its 95% error bound is written to the
+#               standard error. The isil value of the other observations is
+#               NULL. Default: compute all coefficients exactly.
+# - --stream  : [Optional] Streaming mode for partitions that do not fit in
+#               memory. See below.
+#
+# Streaming mode: The script reads its input in chunks and updates the cluster
+# centroids with mini-batch K-means after every chunk. Meanwhile, it spills the
+# input rows to a local temporary file, and keeps a random reservoir sample of
+# nSample observations (default: 10000). In a second pass over the temporary
+# file, it assigns every observation to its cluster and writes the results.
+# Before the second pass, the streamed centroids are refined with K-means
+# iterations on the reservoir sample.
+# The silhouette coefficients are estimated against the reservoir sample, and
+# the average coefficient is the one of the reservoir sample; its 95% error
+# bound is written to the standard error. If the partition has no more than
+# nSample observations, then the silhouette values are exact. The memory use
+# depends on the chunk size and nSample, and not on the partition size. The
+# output columns are the same as in the default mode.
 #
 # Output:
 # - X_Centroid: The cluster centroid x coordinate
@@ -48,19 +72,25 @@
 ################################################################################
 
 # Load dependency packages
-import pandas as pd
+import os
 import sys
 from sklearn.cluster import KMeans
-from sklearn.metrics import silhouette_samples
-from sklearn.metrics import silhouette_score
+from sklearn.cluster import MiniBatchKMeans
+import numpy as np
+import tempfile
+import tdstoIO
+import tdstoSilhouette
 
 # The present script expects the number of clusters as an input argument.
 # If no argument is specified, then use a default number of 5 clusters.
-nIn = sys.argv[1]
+stream = '--stream' in sys.argv[1:]
+args = [arg for arg in sys.argv[1:] if arg != '--stream']
+nIn = args[0]
 if int(nIn) < 1:
     n = 5
 else:
     n = int(nIn)
+nSample = int(args[1]) if len(args) > 1 else 0
 
 DELIMITER = '\t'
 
@@ -70,22 +100,119 @@ DELIMITER = '\t'
 # 0: ObsID, 1: X coordinate, 2: Y coordinate, 3: ObsGroup
 colNames = ['ObsID', 'x_coord', 'y_coord', 'ObsGroup']
 # Of the above input columns, ObsID and ObsGroup are integers, and the
-# coordinates are float variables.
-# If any numbers are streamed in scientific format that contains blanks i
-# (such as "1 E002" for 100), the following Lambda functions remove blanks
-# from the input string so that Python interprets the number correctly.
-sciStrToFloat = lambda x: float("".join(x.split()))
-sciStrToInt = lambda x: int(float("".join(x.split())))
-# Use these Lambda functions in the following converters for each input column.
-converters = {0: sciStrToInt,
-              1: sciStrToFloat,
-              2: sciStrToFloat,
-              3: sciStrToInt}
+# coordinates are float variables. Declare the types once for the typed reader
+# in tdstoIO. The reader also takes care of any numbers that are streamed in
+# scientific format with blanks (such as "1 E002" for 100).
+colTypes = {'ObsID': tdstoIO.INT,
+            'x_coord': tdstoIO.FLOAT,
+            'y_coord': tdstoIO.FLOAT,
+            'ObsGroup': tdstoIO.INT}
+
+schema = tdstoIO.StoSchema(colNames, colTypes)
+
+# The initial centroids are random. To reproduce the same clusters in repeated
+# runs, such as in benchmarks, specify a seed with the environment variable
+# TDSTO_RANDOM_SEED.
+seed = os.environ.get('TDSTO_RANDOM_SEED')
+seed = None if seed is None else int(seed)
+
+### Streaming mode
+###
+if stream:
+    nRef = nSample if nSample > 0 else 10000
+    rng = np.random.default_rng(seed)
+    mbkmeans = MiniBatchKMeans(n_clusters = n, random_state = seed)
+    sizer = tdstoIO.StoChunkSizer()
+    reader = tdstoIO.StoReader(schema, delimiter=DELIMITER)
+    spill = tempfile.TemporaryFile()
+    refData = np.empty((nRef, 2))
+    refObs = np.empty(nRef, dtype=np.int64)  # Input position of the sample
+    nSeen = 0
+
+    # First pass: Update the centroids with every mini-batch of each chunk,
+    # spill the chunk, and update the reservoir sample (algorithm R).
+    while 1:
+        tChunk = sizer.start()
+        try:
+            dfChunk = reader.getChunk(sizer.nRows)
+        except (EOFError, StopIteration):
+            break
+        if dfChunk.empty:
+            break
+        chunk = dfChunk[['x_coord', 'y_coord']].to_numpy(dtype=np.float64)
+        # The first mini-batch also initializes the centroids
+        for start in range(0, chunk.shape[0], mbkmeans.batch_size):
+            mbkmeans.partial_fit(chunk[start:start + mbkmeans.batch_size])
+        np.column_stack([dfChunk['ObsID'], dfChunk['ObsGroup'], chunk]) \
+            .astype(np.float64).tofile(spill)
+        obsIdx = np.arange(nSeen, nSeen + chunk.shape[0])
+        isFill = obsIdx < nRef
+        refData[obsIdx[isFill]] = chunk[isFill]
+        refObs[obsIdx[isFill]] = obsIdx[isFill]
+        slot = rng.integers(0, obsIdx[~isFill] + 1)
+        isKept = slot < nRef
+        refData[slot[isKept]] = chunk[~isFill][isKept]
+        refObs[slot[isKept]] = obsIdx[~isFill][isKept]
+        nSeen += chunk.shape[0]
+        sizer.update(dfChunk, tChunk)
+
+    # For AMPs that receive no data, exit the script instance gracefully.
+    if nSeen == 0:
+        sys.exit()
+
+    # Refine the centroids on the reservoir sample, which is the whole
+    # partition if the partition is small. Then find the silhouette
+    # coefficients of the reservoir sample, and their average.
+    refData = refData[:min(nSeen, nRef)]
+    refObs = refObs[:min(nSeen, nRef)]
+    refOrder = np.argsort(refObs)
+    kmeans = KMeans(n_clusters = n, max_iter = 50, n_init = 1,
+                    init = mbkmeans.cluster_centers_).fit(refData)
+    refClus = kmeans.labels_
+    tdstoIO.memMark('fit')
+    refCoeff, silhScore = tdstoSilhouette.silhouetteScore(refData, refClus)
+    centers = kmeans.cluster_centers_
+    if nSeen > nRef:
+        silhBound = (1.96 * refCoeff.std(ddof=1) / np.sqrt(nRef)
+                     * np.sqrt((nSeen - nRef) / (nSeen - 1)))
+        sys.stderr.write("ex2p: Silhouette score %.6f +/- %.6f (95%%) from a "
+                         "sample of %d of %d observations\n"
+                         % (silhScore, silhBound, nRef, nSeen))
+
+    # Second pass: Assign the spilled observations to clusters and export the
+    # results chunk by chunk.
+    writer = tdstoIO.StoWriter(delimiter=DELIMITER)
+    spill.seek(0)
+    nDone = 0
+    while nDone < nSeen:
+        rows = np.fromfile(spill, dtype=np.float64,
+                           count=4 * sizer.nRows).reshape(-1, 4)
+        data = rows[:, 2:]
+        predClus = kmeans.predict(data)
+        if nSeen > nRef:
+            # The observations of the reservoir sample are part of the
+            # reference, so they get their exact coefficients within the
+            # sample, which leave the observation itself out.
+            lo, hi = np.searchsorted(refObs[refOrder],
+                                     [nDone, nDone + rows.shape[0]])
+            refRows = refOrder[lo:hi]
+            refPos = refObs[refRows] - nDone
+            predClus[refPos] = refClus[refRows]
+            silhCoeff = tdstoSilhouette.referenceSamples(data, predClus,
+                                                         refData, refClus)
+            silhCoeff[refPos] = refCoeff[refRows]
+        else:
+            silhCoeff = refCoeff[nDone:nDone + rows.shape[0]]
+        writer.writeColumns(rows[:, 0].astype(np.int64),
+                            rows[:, 1].astype(np.int64), predClus,
+                            centers[predClus, 0], centers[predClus, 1], n,
+                            silhCoeff, silhScore)
+        nDone += rows.shape[0]
+    sys.exit()
 
 ### Ingest the input data
 ###
-dfIn = pd.read_csv(sys.stdin, sep=DELIMITER, header=None, names=colNames,
-                   index_col=False, iterator=False, converters=converters)
+dfIn = tdstoIO.StoReader(schema, delimiter=DELIMITER).readAll()
 
 # For AMPs that receive no data, exit the script instance gracefully.
 if dfIn.empty:
@@ -95,26 +222,37 @@ if dfIn.empty:
 data = dfIn[['x_coord', 'y_coord']].to_numpy()
 
 # Define the K-means clustering object
-kmeans = KMeans(n_clusters = n, max_iter = 50)
+kmeans = KMeans(n_clusters = n, max_iter = 50, random_state = seed)
 
 # Perform clustering and find centroids
 #     predClus is the predicted cluster each observation is assigned to
 #     centers are the centroid coordinates for each of the n clusters
 predClus = kmeans.fit_predict(data)
+# Optionally record the memory of the script with the fitted clusters
+tdstoIO.memMark('fit')
 centers = kmeans.cluster_centers_
 
 # Assess the clustering quality
 #    silhCoeff is the silhouette coefficient for each observation
 #    silhScore is the average score for all observations
-silhCoeff = silhouette_samples(data, predClus, metric='euclidean')
-silhScore = silhouette_score(data, predClus, metric='euclidean')
+# The coefficients are computed in blocks of observations with a fixed memory
+# ceiling, and the score is their mean; see tdstoSilhouette.py.
+if nSample > 0:
+    rows, sampleCoeff, silhScore, silhBound = \
+        tdstoSilhouette.sampledSilhouette(data, predClus, nSample, seed)
+    silhCoeff = np.full(data.shape[0], np.nan)
+    silhCoeff[rows] = sampleCoeff
+    sys.stderr.write("ex2p: Silhouette score %.6f +/- %.6f (95%%) from %d of "
+                     "%d observations\n" % (silhScore, silhBound, rows.shape[0],
+                                            data.shape[0]))
+else:
+    silhCoeff, silhScore = tdstoSilhouette.silhouetteScore(data, predClus)
 
 # Print output: Current obsID, cluster it belongs to, coordinates of its cluster
 # center, silhouette coefficient
-# Export results to the SQL Engine database through standard output
-for i in range( 0, dfIn.shape[0] ):
-    print(dfIn.at[i, 'ObsID'], DELIMITER, dfIn.at[i, 'ObsGroup'], DELIMITER,
-          predClus[i], DELIMITER, \
-          centers[predClus[i], 0], DELIMITER, \
-          centers[predClus[i], 1], DELIMITER, n, DELIMITER, \
-          silhCoeff[i], DELIMITER, silhScore)
+# Export results to the SQL Engine database through standard output. The bulk
+# writer formats all result rows at once and writes them in one call.
+tdstoIO.StoWriter(delimiter=DELIMITER).writeColumns(
+    dfIn['ObsID'], dfIn['ObsGroup'], predClus,
+    centers[predClus, 0], centers[predClus, 1], n,
+    silhCoeff, silhScore)
@@ -21,10 +21,21 @@
 --
 -- Required input:
 -- - "ex2p.py" Python script to install in database
+-- - "tdstoIO.py" shared input/output Python module to install in database
+-- - "tdstoSilhouette.py" shared silhouette Python module to install in database
 -- - ex2tbl table data from file "ex2data.csv"
 --
--- In present example, the Python script has 1 optional input argument:
--- - n : The number of clusters we want to create (default: n=5)
+-- In present example, the Python script has 3 optional input arguments:
+-- - n       : The number of clusters we want to create (default: n=5)
+-- - nSample : Silhouette sample size for large partitions. For example, with
+--             SCRIPT_COMMAND('tdpython3 ./myDB/ex2p.py 7 20000') only 20000
+--             observations per partition get a silhouette coefficient, and
+--             the average coefficient is estimated (default: exact for all)
+-- - --stream: Streaming mode for partitions that do not fit in memory. For
+--             example, SCRIPT_COMMAND('tdpython3 ./myDB/ex2p.py 7 --stream')
+--             reads the input in chunks, updates the centroids with
+--             mini-batch K-means, and assigns the clusters in a second pass
+--             over a local temporary file. Same output columns.
 --
 -- Reminder: In case of errors, you can find the STO full standard error output
 --   for each node in the corresponding node file:
@@ -46,6 +57,13 @@ SET SESSION SEARCHUIFDBPATH = myDB;
 .set width 100
 
 -- Adjust names and path appropriately for your filesystem in the following.
+-- Install the shared input/output module that the Python scripts import.
+CALL SYSUIF.REMOVE_FILE('tdstoIO',1);
+CALL SYSUIF.INSTALL_FILE('tdstoIO','tdstoIO.py','cz!/root/stoTests/tdstoIO.py');
+-- Install the shared module that computes the silhouette coefficients.
+CALL SYSUIF.REMOVE_FILE('tdstoSilhouette',1);
+CALL SYSUIF.INSTALL_FILE('tdstoSilhouette','tdstoSilhouette.py','cz!/root/stoTests/tdstoSilhouette.py');
+
 CALL SYSUIF.REMOVE_FILE('ex2p',1);
 CALL SYSUIF.INSTALL_FILE('ex2p','ex2p.py','cz!/root/stoTests/ex2p.py');
 
@@ -0,0 +1,200 @@
+--------------------------------------------------------------------------------
+-- The contents of this file are Teradata Public Content
+-- and have been released to the Public Domain.
+-- Licensed under BSD; see "license.txt" file for more information.
+-- Copyright (c) 2023 by Teradata
+--------------------------------------------------------------------------------
+--
+-- R And Python Analytics with SCRIPT Table Operator
+-- Orange Book supplementary material
+-- Alexander Kolovos - October 2026 - v.2.6
+--
+-- Example 2: Distributed Clustering (Python version)
+-- File     : ex2pDist.sql
+--
+-- Use case:
+-- Identify a user-specified number of clusters in each group of observations of
+-- the ex2tbl table, like in "ex2p.sql", but without collecting all observations
+-- of a group on a single AMP. The observations stay on the AMPs, and the
+-- K-means clustering iterates over a "map" and a "reduce" step, similar to the
+-- system-wide example 4:
+-- - "ex2pLoc.py" assigns the local observations of every AMP to their nearest
+--   current centroid, and returns the cluster sizes and coordinate sums.
+-- - "ex2pGlb.py" merges the sums of all AMPs into the new centroids, and
+--   returns how far each centroid moved.
+-- A stored procedure repeats the 2 steps until no centroid moves more than a
+-- tolerance, or up to a maximum number of iterations. Finally, "ex2pLoc.py" in
+-- "assign" mode returns the cluster of every observation. The size of a group
+-- is then not limited by the memory of a single AMP.
+--
+-- Every AMP needs the current centroids of all groups. The query that feeds
+-- "ex2pLoc.py" repeats the centroid rows once for every AMP with a hash key
+-- value that maps to the AMP, namely the smallest ObsID value on the AMP. The
+-- observations are hashed by their ObsID, and LOCAL ORDER BY makes sure that
+-- the centroid rows arrive first on each AMP.
+--
+-- Required input:
+-- - "ex2pLoc.py" Python AMP Operations script to install in database
+-- - "ex2pGlb.py" Python Global Centroids script to install in database
+-- - "tdstoIO.py" shared input/output Python module to install in database
+-- - ex2tbl table data from file "ex2data.csv"
+--
+-- Differences from "ex2p.sql":
+-- - The initial centroids are random observations of each group, so results
+--   may differ from the ones of "ex2p.py" for the same data.
+-- - The final query returns the distance of every observation to its cluster
+--   centroid, in place of the silhouette coefficient that needs the distances
+--   between all observations of a group.
+--
+-- Reminder: In case of errors, you can find the STO full standard error output
+--   for each node in the corresponding node file:
+--   /var/opt/teradata/tdtemp/uiflib/scriptlog
+--   Administrative user privilege may be required to read the above file(s).
+--   Alternatively, query the file contents as a standard database user with:
+--   SELECT DISTINCT SUBSTR(scriptlog, 1, index(scriptlog, 'Vproc')-1) ||
+--       SUBSTR(scriptlog, 1+ regexp_instr(scriptlog, ':', 1,3)) AS script_log
+--   FROM SCRIPT (
+--            SCRIPT_COMMAND ('tail /var/opt/teradata/tdtemp/uiflib/scriptlog')
+--            RETURNS ('scriptlog VARCHAR(256)') );
+--
+--------------------------------------------------------------------------------
+
+DATABASE myDB;
+SET SESSION SEARCHUIFDBPATH = myDB;
+
+.set errorout stdout
+.set width 200
+
+-- Adjust names and path appropriately for your filesystem in the following.
+--
+-- Install the shared input/output module that the Python scripts import.
+CALL SYSUIF.REMOVE_FILE('tdstoIO',1);
+CALL SYSUIF.INSTALL_FILE('tdstoIO','tdstoIO.py','cz!/root/stoTests/tdstoIO.py');
+
+-- Register the script for the cluster partial sums on AMPs
+CALL SYSUIF.REMOVE_FILE('ex2pLoc',1);
+CALL SYSUIF.INSTALL_FILE('ex2pLoc','ex2pLoc.py','cz!/root/stoTests/ex2pLoc.py');
+
+-- Register the script for the global centroids across AMPs
+CALL SYSUIF.REMOVE_FILE('ex2pGlb',1);
+CALL SYSUIF.INSTALL_FILE('ex2pGlb','ex2pGlb.py','cz!/root/stoTests/ex2pGlb.py');
+
+-- One hash key value for every AMP that holds observations: The smallest
+-- ObsID value of the observations that hash to the AMP by their ObsID.
+DROP TABLE ex2pAmpKeys;
+CREATE TABLE ex2pAmpKeys AS (
+    SELECT MIN(ObsID) AS hashKey
+    FROM ex2tbl
+    GROUP BY HASHAMP(HASHBUCKET(HASHROW(ObsID)))
+) WITH DATA
+PRIMARY INDEX (hashKey);
+
+-- Current centroids. Initially, 7 random observations of every group.
+DROP TABLE ex2pCentroids;
+CREATE TABLE ex2pCentroids (
+    ObsGroup INTEGER,
+    ClustID INTEGER,
+    X_Centroid FLOAT,
+    Y_Centroid FLOAT)
+PRIMARY INDEX (ObsGroup);
+
+INSERT INTO ex2pCentroids
+SELECT ObsGroup,
+       ROW_NUMBER() OVER (PARTITION BY ObsGroup ORDER BY rnd, ObsID),
+       X_Coord,
+       Y_Coord
+FROM (SELECT ObsGroup, ObsID, X_Coord, Y_Coord,
+             RANDOM(1, 1000000000) AS rnd
+      FROM ex2tbl) AS R
+QUALIFY ROW_NUMBER() OVER (PARTITION BY ObsGroup ORDER BY rnd, ObsID) <= 7;
+
+-- New centroids of the latest iteration
+DROP TABLE ex2pNewCentroids;
+CREATE TABLE ex2pNewCentroids (
+    ObsGroup INTEGER,
+    ClustID INTEGER,
+    X_Centroid FLOAT,
+    Y_Centroid FLOAT,
+    N INTEGER,
+    SSE FLOAT,
+    Shift FLOAT)
+PRIMARY INDEX (ObsGroup);
+
+-- The following query is the input of "ex2pLoc.py": The centroid rows
+-- (rowType 0) repeated for every AMP, and the observation rows (rowType 1).
+REPLACE VIEW ex2pLocInput AS
+SELECT 0 AS rowType,
+       C.ObsGroup,
+       CAST(NULL AS INTEGER) AS ObsID,
+       C.ClustID,
+       C.X_Centroid AS X_Coord,
+       C.Y_Centroid AS Y_Coord,
+       K.hashKey
+FROM ex2pCentroids AS C CROSS JOIN ex2pAmpKeys AS K
+UNION ALL
+SELECT 1 AS rowType,
+       ObsGroup,
+       ObsID,
+       CAST(NULL AS INTEGER) AS ClustID,
+       X_Coord,
+       Y_Coord,
+       ObsID AS hashKey
+FROM ex2tbl;
+
+-- Iterations of the "map" and "reduce" steps. BTEQ cannot loop back, so the
+-- loop runs in a stored procedure. Each iteration is a nested call to the
+-- SCRIPT TO like in example 4, and replaces the current centroids with the
+-- new ones.
+REPLACE PROCEDURE ex2pKMeans (IN maxIter INTEGER, IN tol FLOAT,
+                              OUT nIter INTEGER, OUT maxShift FLOAT)
+BEGIN
+    SET nIter = 0;
+    SET maxShift = tol + 1;
+    WHILE nIter < maxIter AND maxShift > tol DO
+        DELETE FROM ex2pNewCentroids;
+        INSERT INTO ex2pNewCentroids
+        SELECT *
+        FROM SCRIPT(ON (SELECT *
+                        FROM SCRIPT(ON (SELECT * FROM ex2pLocInput)
+                                    HASH BY hashKey
+                                    LOCAL ORDER BY rowType
+                                    SCRIPT_COMMAND ('tdpython3 ./myDB/ex2pLoc.py partial')
+                                    RETURNS ('ObsGroup INTEGER, ClustID INTEGER, N INTEGER, SumX FLOAT, SumY FLOAT, SSE FLOAT, X_Old FLOAT, Y_Old FLOAT')
+                                   ) )
+                    HASH BY ObsGroup
+                    SCRIPT_COMMAND ('tdpython3 ./myDB/ex2pGlb.py')
+                    RETURNS ('ObsGroup INTEGER, ClustID INTEGER, X_Centroid FLOAT, Y_Centroid FLOAT, N INTEGER, SSE FLOAT, Shift FLOAT')
+                   ) AS D;
+        SELECT MAX(Shift) INTO maxShift FROM ex2pNewCentroids;
+        DELETE FROM ex2pCentroids;
+        INSERT INTO ex2pCentroids
+        SELECT ObsGroup, ClustID, X_Centroid, Y_Centroid
+        FROM ex2pNewCentroids;
+        SET nIter = nIter + 1;
+    END WHILE;
+END;
+
+-- Run up to 20 iterations, until no centroid moves more than 1e-6.
+CALL ex2pKMeans(20, 1e-6, nIter, maxShift);
+
+-- Size and sum of squared distances of every cluster, as of the centroids
+-- before the last iteration
+SELECT ObsGroup, ClustID, X_Centroid, Y_Centroid, N, SSE
+FROM ex2pNewCentroids
+ORDER BY ObsGroup, ClustID;
+
+-- Final assignment of the observations to the clusters
+SELECT ObsGrp,
+       ObsID,
+       ClustID,
+       X_Centroid,
+       Y_Centroid,
+       Dist
+FROM SCRIPT(ON (SELECT * FROM ex2pLocInput)
+            HASH BY hashKey
+            LOCAL ORDER BY rowType
+            SCRIPT_COMMAND ('tdpython3 ./myDB/ex2pLoc.py assign')
+            RETURNS ('ObsID INTEGER, ObsGrp INTEGER, ClustID INTEGER, X_Centroid FLOAT, Y_Centroid FLOAT, Dist FLOAT')
+           ) AS D
+ORDER BY ObsGrp, ClustID
+WITH AVG(D.Dist) (TITLE 'Avg Distance to Centroid') BY ObsGrp;
@@ -0,0 +1,88 @@
+################################################################################
+# The contents of this file are Teradata Public Content
+# and have been released to the Public Domain.
+# Licensed under BSD; see "license.txt" file for more information.
+# Copyright (c) 2023 by Teradata
+################################################################################
+#
+# R And Python Analytics with SCRIPT Table Operator
+# Orange Book supplementary material
+# Alexander Kolovos - October 2026 - v.2.6
+#
+# Example 2: Distributed Clustering - Global Centroids module (Python version)
+# File     : ex2pGlb.py
+#
+# Use case:
+# In the "reduce" step of the system-wide K-means clustering (see "ex2pLoc.py"
+# for the full description), merge the partial sums of the clusters from all
+# AMPs into the new cluster centroids. A cluster without observations keeps its
+# current centroid.
+#
+# Script accounts for the general scenario that an AMP might have no data.
+#
+# Requires numpy and pandas add-on packages.
+#
+# Required input:
+# - Partial results of "ex2pLoc.py" in "partial" mode
+# - shared input/output module "tdstoIO.py" installed next to the script
+#
+# Output:
+# - ObsGroup   : The group of the observations
+# - ClustID    : The cluster ID
+# - X_Centroid, Y_Centroid: The new cluster centroid coordinates
+# - N          : Number of observations in the cluster
+# - SSE        : Sum of squared distances of the cluster observations to the
+#                current centroid
+# - Shift      : Distance between the current and the new centroid
+#
+################################################################################
+
+# Load dependency packages
+import numpy as np
+import sys
+import tdstoIO
+
+DELIMITER = '\t'
+
+# Know your data: You must know in advance the number and data types of the
+# incoming columns from the SQL Engine database!
+# For this script, the input expected format is:
+# 0: ObsGroup, 1: ClustID, 2: N, 3: SumX, 4: SumY, 5: SSE, 6: X_Old, 7: Y_Old
+colNames = ['ObsGroup', 'ClustID', 'N', 'SumX', 'SumY', 'SSE',
+            'X_Old', 'Y_Old']
+# Of the above input columns, ObsGroup and ClustID are integers. The counts N
+# are integers, but it is convenient to add them up as float variables.
+colTypes = {'ObsGroup': tdstoIO.INT,
+            'ClustID': tdstoIO.INT}
+
+### Ingest the input data
+###
+schema = tdstoIO.StoSchema(colNames, colTypes)
+dfIn = tdstoIO.StoReader(schema, delimiter=DELIMITER).readAll()
+
+# For AMPs that receive no data, exit the script instance gracefully.
+if dfIn.empty:
+    sys.exit()
+
+# Add up the partial sums of every cluster from all AMPs. The current centroid
+# is the same in all partial results of a cluster.
+dfGlb = dfIn.groupby(['ObsGroup', 'ClustID'], sort=True).agg(
+    N=('N', 'sum'), SumX=('SumX', 'sum'), SumY=('SumY', 'sum'),
+    SSE=('SSE', 'sum'), X_Old=('X_Old', 'first'), Y_Old=('Y_Old', 'first'))
+
+# New centroids are the means of the cluster observations
+nObs = dfGlb['N'].to_numpy()
+hasObs = nObs > 0
+with np.errstate(invalid='ignore', divide='ignore'):
+    xNew = np.where(hasObs, dfGlb['SumX'].to_numpy() / nObs,
+                    dfGlb['X_Old'].to_numpy())
+    yNew = np.where(hasObs, dfGlb['SumY'].to_numpy() / nObs,
+                    dfGlb['Y_Old'].to_numpy())
+shift = np.hypot(xNew - dfGlb['X_Old'].to_numpy(),
+                 yNew - dfGlb['Y_Old'].to_numpy())
+
+# Export results to the SQL Engine database through standard output
+tdstoIO.StoWriter(delimiter=DELIMITER).writeColumns(
+    dfGlb.index.get_level_values('ObsGroup'),
+    dfGlb.index.get_level_values('ClustID'),
+    xNew, yNew, nObs.astype(np.int64), dfGlb['SSE'], shift)
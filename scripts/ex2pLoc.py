@@ -0,0 +1,151 @@
+################################################################################
+# The contents of this file are Teradata Public Content
+# and have been released to the Public Domain.
+# Licensed under BSD; see "license.txt" file for more information.
+# Copyright (c) 2023 by Teradata
+################################################################################
+#
+# R And Python Analytics with SCRIPT Table Operator
+# Orange Book supplementary material
+# Alexander Kolovos - October 2026 - v.2.6
+#
+# Example 2: Distributed Clustering - AMP Operations module (Python version)
+# File     : ex2pLoc.py
+#
+# Use case:
+# Identify a user-specified number of clusters in each group of observations of
+# the ex2tbl table, when the observations of a group are spread across all the
+# SQL Engine AMPs. This is a system-wide K-means clustering that iterates over
+# 2 steps, like the "map" and "reduce" steps of Example 4:
+# In the "map" step, the Python AMP Operations module "ex2pLoc.py" assigns the
+#   observations on the local AMP to their nearest current centroid, and sums
+#   up the coordinates of the observations of each cluster.
+# In the "reduce" step, the Python Global Centroids module "ex2pGlb.py" merges
+#   the partial sums from all AMPs into the new centroids.
+# The steps are repeated until the centroids no longer move. Then, a final
+# call of the present script in "assign" mode assigns every observation to its
+# cluster. See "ex2pDist.sql" for the queries and the iteration loop.
+#
+# The current centroids are streamed to every AMP together with the data, and
+# are sorted to arrive first (see "ex2pDist.sql"). The script reads its input
+# in chunks, so that the AMP data need not fit in memory.
+#
+# Script accounts for the general scenario that an AMP might have no data.
+#
+# Requires numpy and pandas add-on packages.
+#
+# Required input:
+# - Centroid rows and ex2tbl observation rows, see "ex2pDist.sql"
+# - shared input/output module "tdstoIO.py" installed next to the script
+#
+# Input Parameter:
+# - mode       : "partial" (default) for the "map" step, or "assign" for the
+#                final assignment of the observations to clusters
+#
+# Output in "partial" mode, for every cluster of every group:
+# - ObsGroup   : The group of the observations
+# - ClustID    : The cluster ID
+# - N          : Number of local observations in the cluster
+# - SumX, SumY : Sums of the coordinates of the local observations in cluster
+# - SSE        : Sum of squared distances of the local observations to the
+#                current centroid
+# - X_Old, Y_Old: The current centroid coordinates
+#
+# Output in "assign" mode, for every observation:
+# - ObsID      : The observation ID
+# - ObsGroup   : The group of the observation
+# - ClustID    : The cluster that the observation belongs to
+# - X_Centroid, Y_Centroid: The cluster centroid coordinates
+# - Dist       : Distance of the observation to the cluster centroid
+#
+################################################################################
+
+# Load dependency packages
+import numpy as np
+import sys
+import tdstoIO
+
+mode = sys.argv[1] if len(sys.argv) > 1 else 'partial'
+if mode not in ('partial', 'assign'):
+    sys.exit("ex2pLoc: Unknown mode " + mode)
+
+DELIMITER = '\t'
+
+# Know your data: You must know in advance the number and data types of the
+# incoming columns from the SQL Engine database!
+# For this script, the input expected format is:
+# 0: rowType (0 for centroid rows, 1 for observation rows), 1: ObsGroup,
+# 2: ObsID (NULL for centroids), 3: ClustID (NULL for observations),
+# 4: X coordinate, 5: Y coordinate, 6: hashKey (not used by the script)
+colNames = ['rowType', 'ObsGroup', 'ObsID', 'ClustID', 'x_coord', 'y_coord',
+            'hashKey']
+colTypes = {'rowType': tdstoIO.INT,
+            'ObsGroup': tdstoIO.INT,
+            'ObsID': tdstoIO.INT,
+            'ClustID': tdstoIO.INT,
+            'x_coord': tdstoIO.FLOAT,
+            'y_coord': tdstoIO.FLOAT,
+            'hashKey': tdstoIO.STR}
+
+schema = tdstoIO.StoSchema(colNames, colTypes, useCols=colNames[:6])
+reader = tdstoIO.StoReader(schema, delimiter=DELIMITER)
+writer = tdstoIO.StoWriter(delimiter=DELIMITER)
+sizer = tdstoIO.StoChunkSizer()
+
+# Current centroids of every group: cluster IDs and coordinates
+centroids = {}
+# Partial sums of every group: N, SumX, SumY, SSE per cluster
+partials = {}
+
+### Ingest and process the input data, one chunk at a time
+###
+while 1:
+    tChunk = sizer.start()
+    try:
+        dfChunk = reader.getChunk(sizer.nRows)
+    except (EOFError, StopIteration):
+        break
+    if dfChunk.empty:
+        break
+
+    # The centroid rows arrive first. Collect them per group.
+    isCentroid = dfChunk['rowType'] == 0
+    for group, dfC in dfChunk[isCentroid].groupby('ObsGroup'):
+        ids, coords = centroids.get(group, (np.empty(0, dtype=np.int64),
+                                            np.empty((0, 2))))
+        centroids[group] = (
+            np.concatenate([ids, dfC['ClustID'].to_numpy(dtype=np.int64)]),
+            np.vstack([coords, dfC[['x_coord', 'y_coord']].to_numpy()]))
+
+    for group, dfObs in dfChunk[~isCentroid].groupby('ObsGroup'):
+        if group not in centroids:
+            continue                 # Group without centroids: Not clustered
+        ids, coords = centroids[group]
+        data = dfObs[['x_coord', 'y_coord']].to_numpy()
+        # Squared distances of the observations to the centroids
+        sqDist = ((data[:, None, :] - coords[None, :, :]) ** 2).sum(axis=2)
+        nearest = sqDist.argmin(axis=1)
+        minSqDist = sqDist[np.arange(data.shape[0]), nearest]
+
+        if mode == 'assign':
+            writer.writeColumns(dfObs['ObsID'].to_numpy(dtype=np.int64), group,
+                                ids[nearest], coords[nearest, 0],
+                                coords[nearest, 1], np.sqrt(minSqDist))
+        else:
+            nClus = ids.shape[0]
+            sums = partials.setdefault(group, np.zeros((nClus, 4)))
+            sums[:, 0] += np.bincount(nearest, minlength=nClus)
+            sums[:, 1] += np.bincount(nearest, data[:, 0], minlength=nClus)
+            sums[:, 2] += np.bincount(nearest, data[:, 1], minlength=nClus)
+            sums[:, 3] += np.bincount(nearest, minSqDist, minlength=nClus)
+
+    sizer.update(dfChunk, tChunk)
+
+# Export the partial sums of every cluster, including the clusters without
+# local observations, so that the global step knows every current centroid.
+if mode == 'partial':
+    for group, (ids, coords) in centroids.items():
+        sums = partials.get(group, np.zeros((ids.shape[0], 4)))
+        writer.writeColumns(group, ids, sums[:, 0].astype(np.int64),
+                            sums[:, 1], sums[:, 2], sums[:, 3],
+                            coords[:, 0], coords[:, 1])
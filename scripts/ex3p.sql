@@ -19,6 +19,8 @@
 --   model information back to Vantage, and store it in a table.
 -- Model scoring step ("ex3pSco.py"): Score a set of records for each one
 --   of the product IDs.
+-- Alternatively, the single-pass script "ex3pFitSco.py" fits and scores each
+-- product ID in one SCRIPT call (see Segment 4), without the model table.
 --
 -- Required input:
 --   Model fitting step:
@@ -27,6 +29,25 @@
 -- Model scoring step:
 --   - "ex3pSco.py" scoring Python script to install in database
 --   - ex3tblSco table data from file "ex3dataSco.csv" to install in database
+--   - "tdstoWorker.py" shared scoring worker Python module to install in database
+-- Single-pass fitting and scoring:
+--   - "ex3pFitSco.py" fitting and scoring Python script to install in database
+--   - ex3tblFit and ex3tblSco tables as above
+-- All steps:
+--   - "tdstoIO.py" shared input/output Python module to install in database
+--   - "tdstoGLM.py" shared compact model Python module to install in database
+--
+-- By default, the fitting script returns each model as a pickled statsmodels
+-- object, which also holds the fitting data and grows with the partition size.
+-- With SCRIPT_COMMAND('tdpython3 ./myDB/ex3pFit.py --compact'), the script
+-- returns only the coefficients, link function and column order as a short
+-- line of text (add "--cov" to include the covariance matrix). The scoring
+-- scripts accept either format, and score compact models without importing
+-- statsmodels.
+-- For product IDs with more fitting rows than fit in the script memory, use
+-- SCRIPT_COMMAND('tdpython3 ./myDB/ex3pFit.py --stream'). The script then
+-- spools the rows to a local temporary file and fits the model in passes over
+-- the file with fixed memory, and returns the model in the compact format.
 --
 -- Reminder: In case of errors, you can find the STO full standard error output
 --   for each node in the corresponding node file:
@@ -47,6 +68,16 @@ SET SESSION SEARCHUIFDBPATH = myDB;
 .set errorout stdout
 .set width 200
 
+-- Install the shared input/output module that the Python scripts import.
+CALL SYSUIF.REMOVE_FILE('tdstoIO',1);
+CALL SYSUIF.INSTALL_FILE('tdstoIO','tdstoIO.py','cz!/root/stoTests/tdstoIO.py');
+-- Install the shared module that encodes and scores compact models.
+CALL SYSUIF.REMOVE_FILE('tdstoGLM',1);
+CALL SYSUIF.INSTALL_FILE('tdstoGLM','tdstoGLM.py','cz!/root/stoTests/tdstoGLM.py');
+-- Install the shared module that relays the rows to a node scoring worker.
+CALL SYSUIF.REMOVE_FILE('tdstoWorker',1);
+CALL SYSUIF.INSTALL_FILE('tdstoWorker','tdstoWorker.py','cz!/root/stoTests/tdstoWorker.py');
+
 -- Segment 1: Model fitting
 --
 -- Adjust names and path appropriately for your filesystem in the following.
@@ -135,3 +166,35 @@ CREATE MULTISET TABLE ex3pOutTbl AS (
                ) AS d
 ) WITH DATA
 PRIMARY INDEX (p_id);
+
+-- Segment 4: Single-pass model fitting and scoring
+--
+-- Adjust names and path appropriately for your filesystem in the following.
+CALL SYSUIF.REMOVE_FILE('ex3pFitSco',1);
+CALL SYSUIF.INSTALL_FILE('ex3pFitSco','ex3pFitSco.py','cz!/root/stoTests/ex3pFitSco.py');
+
+-- Run script and save results into a table. Drop the table, if already exists.
+DROP TABLE ex3pOutTbl;
+
+-- Use Python script to fit a model for each Product ID and score the series of
+-- records of the Product ID in the same SCRIPT call. The fitting rows have
+-- scoFlag=0 and the scoring rows scoFlag=1. The "ORDER BY scoFlag" clause is
+-- crucial in the following to provide all fitting rows before the scoring rows.
+CREATE MULTISET TABLE ex3pOutTbl AS (
+    SELECT oc1 AS p_id,
+           oc2 AS Prediction,
+           oc3 AS x1,
+           oc4 AS x2,
+           oc5 AS x3,
+           oc6 AS x4,
+           oc7 AS x5
+    FROM SCRIPT( ON(SELECT f.*, 0 AS scoFlag FROM ex3tblFit f
+                    UNION ALL
+                    SELECT s.*, 1 AS scoFlag FROM ex3tblSco s)
+                 PARTITION BY p_id
+                 ORDER BY scoFlag
+                 SCRIPT_COMMAND('tdpython3 ./myDB/ex3pFitSco.py')
+                 RETURNS ('oc1 INTEGER, oc2 FLOAT, oc3 FLOAT, oc4 FLOAT, oc5 FLOAT, oc6 FLOAT, oc7 FLOAT')
+               ) AS d
+) WITH DATA
+PRIMARY INDEX (p_id);
@@ -29,28 +29,56 @@
 # Script accounts for the general scenario that an AMP might have no data.
 #
 # Requires numpy, pandas, statsmodels, pickle, and base64 add-on packages.
+# The streaming mode does not use statsmodels.
 #
 # Required input:
 # - ex3tblFit table data from file "ex3dataFit.csv" for fitting step.
+# - shared input/output module "tdstoIO.py" installed next to the script
+# - shared compact model module "tdstoGLM.py" installed next to the script
+#
+# Optional input arguments:
+# - --compact : Return the model in the compact text format of "tdstoGLM.py"
+#               with the coefficients, link function and column order only.
+#               The model size no longer grows with the number of rows, and
+#               the scoring scripts need no statsmodels package to use it.
+# - --cov     : With --compact, also return the covariance matrix of the
+#               coefficients
+# - --stream  : Streaming mode for partitions that do not fit in memory. See
+#               below. Implies --compact.
+#
+# Streaming mode: The script reads its input in chunks, and spools the rows
+# to a local temporary file in binary format. Then, it fits the model with
+# the iteratively reweighted least squares (IRLS) iterations of statsmodels,
+# where each iteration is a pass over the temporary file in chunks (see
+# "tdstoGLM.py"). The coefficients match the statsmodels ones within the
+# convergence tolerance. The memory use depends on the chunk size and the
+# number of variables, and not on the partition size.
 #
 # Output:
 # - p_id        : Product ID
-# - modelSerB64 : Python model information in a pickled + serialized format
+# - modelSerB64 : Python model information in a pickled + serialized format,
+#                 or the compact model text with --compact
 #
 ################################################################################
 
 # Load dependency packages
-import pandas as pd
-import statsmodels.api as sm
 import numpy as np
 import sys
 import pickle
 import base64
+import tempfile
+import tdstoIO
+import tdstoGLM
 
-if len(sys.argv) < 2:
+options = [arg for arg in sys.argv[1:] if arg.startswith('--')]
+names = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+if not names:
     modelSaveName = 'ex3savedModel'
 else:
-    modelSaveName = str(sys.argv[1])
+    modelSaveName = str(names[0])
+stream = '--stream' in options
+compact = '--compact' in options or stream
+withCov = '--cov' in options
 
 DELIMITER='\t'
 
@@ -60,24 +88,74 @@ DELIMITER='\t'
 # 0: p_id, 1-5: indep vars, 6: dep var, 7: nRow, 8: model (if nRow==1), NULL o/w
 colNames = ['p_id','x1','x2','x3','x4','x5','y']
 
-# All input columns are float numbers.
-# If any numbers are streamed in scientific format that contains blanks i
-# (such as "1 E002" for 100), the following Lambda function removes blanks
-# from the input string so that Python interprets the number correctly.
-sciStrToFloat = lambda x: float("".join(x.split()))
-# Use the Lambda function in the following converters for each input column.
-converters = {0: sciStrToFloat,
-              1: sciStrToFloat,
-              2: sciStrToFloat,
-              3: sciStrToFloat,
-              4: sciStrToFloat,
-              5: sciStrToFloat,
-              6: sciStrToFloat}
+# All input columns are float numbers, which is the default type of the typed
+# reader in tdstoIO. The reader also takes care of any numbers that are
+# streamed in scientific format with blanks (such as "1 E002" for 100).
+schema = tdstoIO.StoSchema(colNames)
+
+### Streaming mode
+###
+if stream:
+    sizer = tdstoIO.StoChunkSizer()
+    reader = tdstoIO.StoReader(schema, delimiter=DELIMITER)
+    spool = tempfile.TemporaryFile()
+    nCols = 6                 # x1,...,x5 and y
+    nSeen = 0
+
+    # Spool the input rows to the temporary file, chunk by chunk
+    while 1:
+        tChunk = sizer.start()
+        try:
+            dfChunk = reader.getChunk(sizer.nRows)
+        except (EOFError, StopIteration):
+            break
+        if dfChunk.empty:
+            break
+        if nSeen == 0:
+            p_id = dfChunk['p_id'].iloc[0]
+        dfChunk.loc[:, 'x1':'y'].to_numpy(dtype=np.float64).tofile(spool)
+        nSeen += dfChunk.shape[0]
+        sizer.update(dfChunk, tChunk)
+
+    # For AMPs that receive no data, exit the script instance gracefully.
+    if nSeen == 0:
+        sys.exit()
+
+    # One pass over the spooled rows: Chunks of the design matrix with the
+    # intercept column, and of the dependent variable. The design matrix is
+    # allocated once for all chunks.
+    passRows = min(sizer.nRows, nSeen)
+    designMat = np.empty((passRows, nCols), order='F')
+    designMat[:, 0] = 1.0
+
+    def passData():
+        spool.seek(0)
+        while 1:
+            rows = np.fromfile(spool, dtype=np.float64,
+                               count=nCols * passRows).reshape(-1, nCols)
+            if rows.shape[0] == 0:
+                return
+            X = designMat[:rows.shape[0]]
+            X[:, 1:] = rows[:, :5]
+            yield X, rows[:, 5]
+
+    glmModel = tdstoGLM.fitLogitIRLS(
+        passData, ['Intercept', 'x1', 'x2', 'x3', 'x4', 'x5'])
+    if not withCov:
+        glmModel.cov = None
+    tdstoIO.memMark('fit')
+
+    # Export results to the SQL Engine database through standard output
+    print(p_id, DELIMITER, glmModel.encode())
+    sys.exit()
 
 ### Ingest and process the rest of the input data rows
 ###
-df = pd.read_csv(sys.stdin, sep=DELIMITER, header=None, names=colNames,
-                 index_col=False, iterator=False, converters=converters)
+# Import statsmodels only here, so that the streaming mode above does not pay
+# for its import time and memory.
+import statsmodels.api as sm
+
+df = tdstoIO.StoReader(schema, delimiter=DELIMITER).readAll()
 
 # For AMPs that receive no data, exit the script instance gracefully.
 if df.empty:
@@ -94,12 +172,20 @@ logit = sm.GLM(dfy, dfx, family = sm.families.Binomial())
 
 # Fit the model. Use disp=0 in the parenthesis to prevent sterr output.
 fitResult = logit.fit(disp=0)
+# Optionally record the memory of the script with the fitted model
+tdstoIO.memMark('fit')
 
-# Serialize the model and then encode the model to base64 from serialized
-# raw. Plain serialization creates newline characters ("\n"), and when
-# passed to Teradata they create multiples rows instead of a single-line CLOB.
-modelSer = pickle.dumps(fitResult)
-modelSerB64 = base64.b64encode(modelSer)
+# In compact mode, keep only the information needed for scoring in a single
+# line of text.
+if compact:
+    modelSerB64 = tdstoGLM.encodeModel(fitResult, withCov)
+else:
+    # Serialize the model and then encode the model to base64 from serialized
+    # raw. Plain serialization creates newline characters ("\n"), and when
+    # passed to Teradata they create multiples rows instead of a single-line
+    # CLOB.
+    modelSer = pickle.dumps(fitResult)
+    modelSerB64 = base64.b64encode(modelSer)
 
 # Export results to the SQL Engine database through standard output
 print(df.loc[0]['p_id'], DELIMITER, modelSerB64)
@@ -0,0 +1,165 @@
+################################################################################
+# The contents of this file are Teradata Public Content
+# and have been released to the Public Domain.
+# Licensed under BSD; see "license.txt" file for more information.
+# Copyright (c) 2023 by Teradata
+################################################################################
+#
+# R And Python Analytics with SCRIPT Table Operator
+# Orange Book supplementary material
+# Alexander Kolovos - October 2026 - v.2.6
+#
+# Example 3: Multiple Models Fitting and Scoring: Single-pass module (Python)
+# File     : ex3pFitSco.py
+#
+# Use case:
+# Using simulated data for a retail store:
+# Fit a model to each one of specified product IDs, each featuring 5 dependent
+# variables x1,...,x5, and score a set of records for the same product ID, in
+# a single SCRIPT call. The script performs the tasks of both "ex3pFit.py" and
+# "ex3pSco.py" for one individual product ID whose data reside on the
+# corresponding AMP:
+# - The fitting and the scoring rows of a product ID arrive in the same
+#   partition, distinguished by a flag column. The fitting rows are sorted to
+#   arrive first (see "ex3p.sql").
+# - Once all fitting rows are read, the script fits the model, and then
+#   scores the scoring rows in chunks as they arrive.
+# Compared to the two-step workflow, there is no model table, no encoding
+# and decoding of the model, and the data are redistributed only once.
+#
+# Script accounts for the general scenario that an AMP might have no data.
+# Product IDs without fitting rows are not scored, like in the two-step
+# workflow where the scoring rows are joined with the model table.
+#
+# Requires numpy, pandas, and statsmodels add-on packages.
+#
+# Required input:
+# - ex3tblFit table data from file "ex3dataFit.csv" for fitting, and ex3tblSco
+#   table data from file "ex3dataSco.csv" for scoring, with a flag column.
+# - shared input/output module "tdstoIO.py" installed next to the script
+# - shared compact model module "tdstoGLM.py" installed next to the script
+#
+# Output:
+# - p_id     : Product ID
+# - predicted: Score value for input row
+# - x1       : Model parameter x1
+# - x2       : Model parameter x2
+# - x3       : Model parameter x3
+# - x4       : Model parameter x4
+# - x5       : Model parameter x5
+#
+################################################################################
+
+# Load dependency packages
+import pandas as pd
+import statsmodels.api as sm
+import numpy as np
+import sys
+import tdstoIO
+import tdstoGLM
+
+DELIMITER = '\t'
+
+# Know your data: You must know in advance the number and data types of the
+# incoming columns from the SQL Engine database!
+# For this script, the input expected format is:
+# 0: p_id, 1-5: indep vars, 6: dep var, 7: scoFlag (0 for fitting rows,
+# 1 for scoring rows)
+colNames = ['p_id', 'x1', 'x2', 'x3', 'x4', 'x5', 'y', 'scoFlag']
+# Of the above input columns, p_id and scoFlag are integers; the rest are
+# floats. The reader also takes care of any numbers that are streamed in
+# scientific format with blanks (such as "1 E002" for 100).
+schema = tdstoIO.StoSchema(colNames, {'p_id': tdstoIO.INT,
+                                      'scoFlag': tdstoIO.INT})
+reader = tdstoIO.StoReader(schema, delimiter=DELIMITER)
+# The bulk writer formats each chunk of results at once and writes it to the
+# standard output in one call.
+writer = tdstoIO.StoWriter(delimiter=DELIMITER)
+
+xCols = ['x1', 'x2', 'x3', 'x4', 'x5']
+
+
+def fitModel(dfFit):
+    """Fit the binomial GLM like ex3pFit.py, and return the scoring model."""
+    dfx = dfFit.loc[:, 'x1':'x5']
+    dfx.insert(0, 'Intercept', 1.0)
+    logit = sm.GLM(dfFit.loc[:, 'y'], dfx, family=sm.families.Binomial())
+    return tdstoGLM.StoGLM.fromResults(logit.fit(disp=0))
+
+
+### Ingest and process the input data rows, nRowsIn at a pass
+###
+# The number of rows nRowsIn in each pass adapts to the data, see ex3pSco.py.
+sizer = tdstoIO.StoChunkSizer()
+
+fitChunks = []             # Fitting rows read so far
+glmModel = None            # Model, once all fitting rows are read
+designMat = np.empty((0, 1 + len(xCols)), order='F')
+
+# Use try...except to produce an error if something goes wrong in the try block
+try:
+
+    while 1:
+
+        tChunk = sizer.start()
+        nRowsIn = sizer.nRows
+
+        try:
+            dfIn = reader.getChunk(nRowsIn)
+        except (EOFError, StopIteration):
+            break
+
+        # Exit gracefully, if DataFrame is empty.
+        if dfIn.empty:
+            break
+
+        isScore = dfIn['scoFlag'].to_numpy() == 1
+        # All fitting rows must precede the scoring rows, across the chunks and
+        # within each chunk
+        if glmModel is not None:
+            isOrdered = isScore.all()
+        else:
+            isOrdered = not isScore.any() or isScore[isScore.argmax():].all()
+        if not isOrdered:
+            raise ValueError("ex3pFitSco: Fitting rows after scoring rows. "
+                             "Sort the input by the flag column with ORDER "
+                             "BY scoFlag.")
+        if glmModel is None:
+            fitChunks.append(dfIn[~isScore])
+            if not isScore.any():
+                sizer.update(dfIn, tChunk)
+                continue
+            # First scoring row: All fitting rows have been read
+            dfFit = pd.concat(fitChunks, ignore_index=True)
+            fitChunks = []
+            if dfFit.empty:
+                sys.exit()   # No model for the product ID: Nothing to score
+            glmModel = fitModel(dfFit)
+            tdstoIO.memMark('fit')
+            p_id = dfFit['p_id'].iloc[0]
+
+        # Score the rows with the design matrix of the chunk, like ex3pSco.py
+        dfToScore = dfIn.loc[isScore, xCols]
+        nRows = dfToScore.shape[0]
+        if nRows > designMat.shape[0]:
+            designMat = np.empty((nRows, 1 + len(xCols)), order='F')
+            designMat[:, 0] = 1.0            # Intercept
+        X = designMat[:nRows]
+        X[:, 1:] = dfToScore.to_numpy(dtype=np.float64)
+
+        predicted = glmModel.predict(X)
+
+        # Export results to the Databse through standard output.
+        writer.writeColumns(p_id, predicted,
+                            X[:, 1], X[:, 2], X[:, 3], X[:, 4], X[:, 5])
+
+        # Adapt the size of the next chunk
+        sizer.update(dfIn, tChunk)
+
+except (SystemExit):
+    # Skip exception if system exit requested in try block
+    pass
+except:    # Specify in standard error any other error encountered
+    print("Script Failure :", sys.exc_info()[0], file=sys.stderr)
+    raise
+    sys.exit()
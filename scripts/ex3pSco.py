@@ -29,10 +29,14 @@
 # Script performs identical task as ex3pScoNonIter.py. Reads in data in chunks.
 # Script accounts for the general scenario that an AMP might have no data.
 #
-# Requires numpy, pandas, statsmodels, pickle, and base64 add-on packages.
+# Requires numpy and pandas add-on packages; also statsmodels, pickle, and
+# base64 for models in the pickled format.
 #
 # Required input:
 # - ex3tblSco table data from file "ex3dataSco.csv" for scoring step.
+# - shared input/output module "tdstoIO.py" installed next to the script
+# - shared compact model module "tdstoGLM.py" installed next to the script
+# - shared scoring worker module "tdstoWorker.py" installed next to the script
 #
 # Output:
 # - p_id     : Product ID
@@ -46,12 +50,19 @@
 ################################################################################
 
 # Load dependency packages
-import pandas as pd
-import statsmodels.api as sm
-import numpy as np
 import sys
-import pickle
-import base64
+import tdstoWorker
+
+# Optional persistent worker mode: If a pre-warmed scoring worker is running
+# on the node (see tdstoWorker.py), then relay the input rows to the worker and
+# exit. This skips the package imports and the model loading that follow.
+# If no worker is running, then the script scores the rows in-process.
+if tdstoWorker.relay('ex3'):
+    sys.exit()
+
+import numpy as np
+import tdstoIO
+import tdstoGLM
 
 DELIMITER = '\t'
 
@@ -63,96 +74,105 @@ rowToScore = []
 # 0: p_id, 1-5: indep vars, 6: dep var, 7: nRow, 8: model (if nRow==1), NULL o/w
 colNames = ['p_id', 'x1', 'x2', 'x3', 'x4', 'x5', 'y']
 # Of the above input columns, the first is of integer type; the rest are floats.
-# If any numbers are streamed in scientific format that contains blanks i
-# (such as "1 E002" for 100), the following Lambda functions remove blanks
-# from the input string so that Python interprets the number correctly.
-sciStrToFloat = lambda x: float("".join(x.split()))
-sciStrToInt = lambda x: int(float("".join(x.split())))
-# Use these Lambda functions in the following converters for each input culumn.
-converters = {1: sciStrToFloat,
-              2: sciStrToFloat,
-              3: sciStrToFloat,
-              4: sciStrToFloat,
-              5: sciStrToFloat}
-# Specify which columns to use from the data read by the script.
-usecols = [1, 2, 3, 4, 5]
+# Only the x1,...,x5 columns are needed for scoring. Declare them once for the
+# typed reader in tdstoIO. The reader also takes care of any numbers that are
+# streamed in scientific format with blanks (such as "1 E002" for 100).
+schema = tdstoIO.StoSchema(colNames, {'p_id': tdstoIO.INT},
+                           useCols=['x1', 'x2', 'x3', 'x4', 'x5'])
+# The prefetch reader reads and parses the next chunk on a background thread
+# while the present chunk is scored and written (see tdstoIO.py).
+reader = tdstoIO.StoPrefetchReader(schema, delimiter=DELIMITER)
+# The bulk writer formats each chunk of results at once and writes it to the
+# standard output in one call.
+writer = tdstoIO.StoWriter(delimiter=DELIMITER)
 
 # Start by reading just the first streamed row of data. It is expected to be
 # longer than the others by 2 columns. The serialized model information is
-# the last input argument. Get this single row with input().
-try:
-    line = input()
-    # If the first row of data is blank, the AMP has no data. Exit gracefully.
-    if line == '':
-        sys.exit()
-    else:
-        allArgs = line.split(DELIMITER)
-        allNum = [float(x.replace(" ","")) for x in allArgs[0:7]]
-        rowToScore = allNum[1:6]
-        modelInSer64 = allArgs[8]
-        p_id = allArgs[0]
-except (EOFError):   # Exit gracefully if no input received at all
+# the last input argument. Get this single row with the reader readLine().
+line = reader.readLine()
+# Exit gracefully if no input received at all, or if the first row of data is
+# blank, in which case the AMP has no data.
+if line is None or line == '':
     sys.exit()
-
-# The input model is expected to be a string in encoded, serialized raw format.
-# Follow the inverse process to obtain the model. First, decode the CLOB from
-# base64 into serialized raw. Then, unserialize.
-modelInSer64 = modelInSer64.partition("'")[2]
-modelIn = base64.b64decode(modelInSer64)
-glmModel = pickle.loads(modelIn)
+else:
+    allArgs = line.split(DELIMITER)
+    allNum = [float(x.replace(" ","")) for x in allArgs[0:7]]
+    rowToScore = allNum[1:6]
+    modelInSer64 = allArgs[8]
+    p_id = allArgs[0]
+
+# The input model is expected to be a string either in the compact text format
+# of tdstoGLM, or in encoded, serialized raw format. A compact model is scored
+# with numpy alone, without importing statsmodels. Otherwise, follow the
+# inverse process to obtain the model: First, decode the CLOB from base64 into
+# serialized raw. Then, unserialize, which imports statsmodels.
+# Scoring needs only the coefficients and the link function of the model, so
+# get them in the compact form also from a pickled model.
+glmModel = tdstoGLM.loadScorer(modelInSer64)
+# Optionally record the memory of the script with the model loaded
+tdstoIO.memMark('model')
+
+# Design matrix of the chunks: The intercept column and the x1,...,x5 columns.
+# It is allocated once and only grows when a chunk has more rows than it fits,
+# so that each chunk is scored with a single matrix-vector product in place.
+# The first row of the first chunk is the row that came with the model. The
+# matrix is in column order like the design matrix of statsmodels, and its
+# columns are the ones written out.
+nCols = len(glmModel.columns)
+designMat = np.empty((0, nCols), order='F')
 
 ### Ingest and process the rest of the input data rows, nRowsIn at a pass
 ###
-nRowsIn = 500
-
-# To read input in chunks, the read_csv reader function must have the
-# iterator argument set to True. The following assigns the function to
-# an object that we name reader. The reader object will be used in the
-# following with the get_chunk() function to read the data in chunks.
-reader = pd.read_csv(sys.stdin, sep=DELIMITER, header=None, names=colNames,
-                     index_col=False, iterator=True,
-                     converters=converters, usecols=usecols)
+# The number of rows nRowsIn in each pass adapts to the data. The chunk sizer
+# starts from the memory budget of the script (ScriptMemLimit divided by the
+# expected concurrency, see tdstoIO.py), and then grows or shrinks the chunks
+# based on the measured time per chunk and resident memory of the script.
+sizer = tdstoIO.StoChunkSizer()
 
 # Use try...except to produce an error if something goes wrong in the try block
 try:
 
     while 1:
 
+        tChunk = sizer.start()
+        nRowsIn = sizer.nRows
+
         try:
-            # CAUTION: The following statement CONTINUES the row index count for
-            #          the DataFrame from where the previous iteration stopped!
-            dfToScore = reader.get_chunk(nRowsIn)
+            # The row index of each chunk starts at 0.
+            dfToScore = reader.getChunk(nRowsIn)
         except (EOFError, StopIteration):
-            # Exit gracefully if no input received at all or iteration complete
-            sys.exit()
+            # No input received at all or iteration complete
+            dfToScore = None
         except:              # Raise an exception if other error encountered
             raise
 
-        # Exit gracefully, if DataFrame is empty.
-        if dfToScore.empty:
-            sys.exit()
+        # Exit gracefully, if DataFrame is empty. The first row is scored
+        # alone before, if it is the only row of the partition.
+        if dfToScore is None or dfToScore.empty:
+            if not rowToScore:
+                sys.exit()
+            dfToScore = schema.empty()
 
         # The first pass must also include the rowToScore list of the first row
+        nFirst = 1 if rowToScore else 0
+        nRows = nFirst + dfToScore.shape[0]
+        if nRows > designMat.shape[0]:
+            designMat = np.empty((nRows, nCols), order='F')
+            designMat[:, 0] = 1.0            # Intercept
+        X = designMat[:nRows]
         if rowToScore:
-            dfToScore.loc[-1] = rowToScore
-            dfToScore.index = dfToScore.index+1
-            dfToScore = dfToScore.sort_index()
+            X[0, 1:] = rowToScore
             rowToScore = []
+        X[nFirst:, 1:] = dfToScore.to_numpy(dtype=np.float64)
 
-        # Add intercept or the object cannot be used for prediction
-        dfToScore.insert(0,'Intercept',1.0)
-
-        # CAUTION: The following statement CONTINUES the element index count
-        #          for "predicted" from where the previous iteration stopped!
-        #          To reference i, use predicted.iloc[i], not predicted[i]
-        predicted = glmModel.predict(dfToScore)
+        predicted = glmModel.predict(X)
 
         # Export results to the Databse through standard output.
-        for i in range( 0, len(predicted) ):
-            print(p_id, DELIMITER, predicted.iloc[i], DELIMITER, \
-          dfToScore.iat[i,1], DELIMITER, dfToScore.iat[i,2], DELIMITER, \
-          dfToScore.iat[i,3], DELIMITER, dfToScore.iat[i,4], DELIMITER, \
-          dfToScore.iat[i,5])
+        writer.writeColumns(p_id, predicted,
+                            X[:, 1], X[:, 2], X[:, 3], X[:, 4], X[:, 5])
+
+        # Adapt the size of the next chunk
+        sizer.update(dfToScore, tChunk)
 
 except (SystemExit):
     # Skip exception if system exit requested in try block
@@ -30,10 +30,13 @@
 # are not read in chunks (practice not recommended for In-Database execution).
 # Script accounts for the general scenario that an AMP might have no data.
 #
-# Requires numpy, pandas, statsmodels, pickle, and base64 add-on packages.
+# Requires numpy and pandas add-on packages; also statsmodels, pickle, and
+# base64 for models in the pickled format.
 #
 # Required input:
 # - ex3tblSco table data from file "ex3dataSco.csv" for scoring step.
+# - shared input/output module "tdstoIO.py" installed next to the script
+# - shared compact model module "tdstoGLM.py" installed next to the script
 #
 # Output:
 # - p_id     : Product ID
@@ -47,12 +50,10 @@
 ################################################################################
 
 # Load dependency packages
-import pandas as pd
-import statsmodels.api as sm
 import numpy as np
 import sys
-import pickle
-import base64
+import tdstoIO
+import tdstoGLM
 
 DELIMITER = '\t'
 
@@ -64,63 +65,54 @@ rowToScore = []
 # 0: p_id, 1-5: indep vars, 6: dep var, 7: nRow, 8: model (if nRow==1), NULL o/w
 colNames = ['p_id', 'x1', 'x2', 'x3', 'x4', 'x5', 'y']
 # Of the above input columns, the first is of integer type; the rest are floats.
-# If any numbers are streamed in scientific format that contains blanks i
-# (such as "1 E002" for 100), the following Lambda functions remove blanks
-# from the input string so that Python interprets the number correctly.
-sciStrToFloat = lambda x: float("".join(x.split()))
-sciStrToInt = lambda x: int(float("".join(x.split())))
-# Use these Lambda functions in the following converters for each input column.
-converters = {1: sciStrToFloat,
-              2: sciStrToFloat,
-              3: sciStrToFloat,
-              4: sciStrToFloat,
-              5: sciStrToFloat}
-# Specify which columns to use from the data read by the script.
-usecols = [1, 2, 3, 4, 5]
+# Only the x1,...,x5 columns are needed for scoring. Declare them once for the
+# typed reader in tdstoIO. The reader also takes care of any numbers that are
+# streamed in scientific format with blanks (such as "1 E002" for 100).
+schema = tdstoIO.StoSchema(colNames, {'p_id': tdstoIO.INT},
+                           useCols=['x1', 'x2', 'x3', 'x4', 'x5'])
+reader = tdstoIO.StoReader(schema, delimiter=DELIMITER)
 
 # Start by reading just the first streamed row of data. It is expected to be
 # longer than the others by 2 columns. The serialized model information is
-# the last input argument. Get this single row with input().
-try:
-    line = input()
-    # If the first row of data is blank, the AMP has no data. Exit gracefully.
-    if line == '':
-        sys.exit()
-    else:
-        allArgs = line.split(DELIMITER)
-        allNum = [float(x.replace(" ","")) for x in allArgs[0:7]]
-        rowToScore = allNum[1:6]
-        modelInSer64 = allArgs[8]
-        p_id = allArgs[0]
-except (EOFError):   # Exit gracefully if no input received at all
+# the last input argument. Get this single row with the reader readLine().
+line = reader.readLine()
+# Exit gracefully if no input received at all, or if the first row of data is
+# blank, in which case the AMP has no data.
+if line is None or line == '':
     sys.exit()
+else:
+    allArgs = line.split(DELIMITER)
+    allNum = [float(x.replace(" ","")) for x in allArgs[0:7]]
+    rowToScore = allNum[1:6]
+    modelInSer64 = allArgs[8]
+    p_id = allArgs[0]
 
-# The input model is expected to be a string in encoded, serialized raw format.
-# Follow the inverse process to obtain the model. First, decode the CLOB from
-# base64 into serialized raw. Then, unserialize.
-modelInSer64 = modelInSer64.partition("'")[2]
-modelIn = base64.b64decode(modelInSer64)
-glmModel = pickle.loads(modelIn)
+# The input model is expected to be a string either in the compact text format
+# of tdstoGLM, or in encoded, serialized raw format. A compact model is scored
+# with numpy alone, without importing statsmodels. Otherwise, follow the
+# inverse process to obtain the model: First, decode the CLOB from base64 into
+# serialized raw. Then, unserialize, which imports statsmodels.
+# Scoring needs only the coefficients and the link function of the model, so
+# get them in the compact form also from a pickled model.
+glmModel = tdstoGLM.loadScorer(modelInSer64)
+# Optionally record the memory of the script with the model loaded
+tdstoIO.memMark('model')
 
 ### Ingest and process the rest of the input data rows
 ###
-dfToScore = pd.read_csv(sys.stdin, sep=DELIMITER, header=None, names=colNames,
-                        index_col=False, iterator=False,
-                        converters=converters, usecols=usecols)
+dfToScore = reader.readAll()
 
-# Add to the top the extra row that was read first
-dfToScore.loc[-1] = rowToScore
-dfToScore.index = dfToScore.index+1
-dfToScore = dfToScore.sort_index()
+# Design matrix with the intercept column, the extra row that was read first,
+# and then the rest of the rows
+X = np.empty((dfToScore.shape[0] + 1, len(glmModel.columns)),
+             order='F')
+X[:, 0] = 1.0
+X[0, 1:] = rowToScore
+X[1:, 1:] = dfToScore.to_numpy(dtype=np.float64)
 
-# Add intercept or the object cannot be used for prediction
-dfToScore.insert(0,'Intercept',1.0)
+predicted = glmModel.predict(X)
 
-predicted = glmModel.predict(dfToScore)
-
-# Export results to to the Databse through standard output
-for i in range( 0, len(predicted) ):
-    print(p_id, DELIMITER, float(predicted[i]), DELIMITER, \
-          dfToScore.iat[i,1], DELIMITER, dfToScore.iat[i,2], DELIMITER, \
-          dfToScore.iat[i,3], DELIMITER, dfToScore.iat[i,4], DELIMITER, \
-          dfToScore.iat[i,5])
+# Export results to to the Databse through standard output. The bulk writer
+# formats all result rows at once and writes them in one call.
+tdstoIO.StoWriter(delimiter=DELIMITER).writeColumns(
+    p_id, predicted, X[:, 1], X[:, 2], X[:, 3], X[:, 4], X[:, 5])
@@ -23,6 +23,9 @@
 -- Required input:
 -- - "ex4pLoc.py" Python AMP Operations "mapping" script to install in database
 -- - "ex4pGlb.py" Python Global Average "reduce" script to install in database
+-- - "tdstoIO.py" shared input/output Python module to install in database
+-- - "tdstoSketch.py" shared sketch Python module to install in database, for
+--   the last query only
 -- - ex4tbl table data from file "ex4data.csv"
 --
 -- Reminder: In case of errors, you can find the STO full standard error output
@@ -46,6 +49,10 @@ SET SESSION SEARCHUIFDBPATH = myDB;
 
 -- Adjust names and path appropriately for your filesystem in the following.
 --
+-- Install the shared input/output module that the Python scripts import.
+CALL SYSUIF.REMOVE_FILE('tdstoIO',1);
+CALL SYSUIF.INSTALL_FILE('tdstoIO','tdstoIO.py','cz!/root/stoTests/tdstoIO.py');
+
 -- Register the script for partial results on AMPs
 CALL SYSUIF.REMOVE_FILE('ex4pLoc',1);
 CALL SYSUIF.INSTALL_FILE('ex4pLoc','ex4pLoc.py','cz!/root/stoTests/ex4pLoc.py');
@@ -56,11 +63,20 @@ CALL SYSUIF.REMOVE_FILE('ex4pGlb',1);
 CALL SYSUIF.INSTALL_FILE('ex4pGlb','ex4pGlb.py','cz!/root/stoTests/ex4pGlb.py');
 --'cz!/root/stoTests/ex4rGlb.r');
 
+-- Install the shared sketch module for the optional sketch mode.
+CALL SYSUIF.REMOVE_FILE('tdstoSketch',1);
+CALL SYSUIF.INSTALL_FILE('tdstoSketch','tdstoSketch.py','cz!/root/stoTests/tdstoSketch.py');
+
 -- The following query is a nested call to the SCRIPT TO. Call the STO twice:
 -- The inner call uses Python script to compute the avegage revenue for each
 --                Department across stores.
 -- The outer call uses Python script to compute the average revenue across
 --                all Departments and stores.
+-- The inner call hashes the rows by DepartmentID, the primary index of
+-- ex4tbl, so the rows stay on their AMP, and a single script instance per AMP
+-- computes the averages of all Departments on the AMP. With PARTITION BY
+-- Department, the results are the same, but each Department takes a separate
+-- script instance.
 SELECT CompanyID,
        AllDepts AS Tot_Depts,
        Avg_Dept_Revenue (FORMAT '$$$,$$$,$$$,$$9.99')
@@ -74,7 +90,7 @@ FROM SCRIPT(ON (SELECT CompanyID,
                                        Department,
                                        Revenue AS Rev_Dept
                                 FROM ex4tbl)
-                            PARTITION BY Department
+                            HASH BY DepartmentID
                             SCRIPT_COMMAND ('tdpython3 ./myDB/ex4pLoc.py')
                             RETURNS ('CompanyID INTEGER, DepartmentID INTEGER, Department VARCHAR(25), AvgRev_Dept FLOAT, N_Stores INTEGER')
                            ) )
@@ -96,7 +112,46 @@ FROM SCRIPT(ON (SELECT CompanyID,
                        Department,
                        Revenue AS Rev_Dept
                 FROM ex4tbl)
-            PARTITION BY Department
+            HASH BY DepartmentID
             SCRIPT_COMMAND ('tdpython3 ./myDB/ex4pLoc.py')
             RETURNS ('CompanyID INTEGER, DepartmentID INTEGER, Department VARCHAR(25), AvgRev_Dept FLOAT, N_Stores INTEGER')
            );
+
+-- The following query is the nested call of the first query in sketch mode.
+-- The inner call also returns a sketch of the revenue values of every
+--                Department, with the distinct count of the StoreID values.
+-- The outer call merges the sketches of all Departments, and returns the
+--                revenue statistics of the company: standard deviation,
+--                extremes, 50th, 90th, and 99th percentiles, and the number of
+--                distinct stores. Only one sketch text per Department is
+--                redistributed, regardless of the number of rows.
+SELECT CompanyID,
+       AllDepts AS Tot_Depts,
+       Avg_Dept_Revenue (FORMAT '$$$,$$$,$$$,$$9.99'),
+       Distinct_Stores,
+       Std_Revenue (FORMAT '$$$,$$$,$$$,$$9.99'),
+       Min_Revenue (FORMAT '$$$,$$$,$$$,$$9.99'),
+       Max_Revenue (FORMAT '$$$,$$$,$$$,$$9.99'),
+       P50_Revenue (FORMAT '$$$,$$$,$$$,$$9.99'),
+       P90_Revenue (FORMAT '$$$,$$$,$$$,$$9.99'),
+       P99_Revenue (FORMAT '$$$,$$$,$$$,$$9.99')
+FROM SCRIPT(ON (SELECT CompanyID,
+                       DepartmentID,
+                       Department,
+                       AvgRev_Dept,
+                       N_Stores,
+                       Sketch
+                FROM SCRIPT(ON (SELECT CompanyID,
+                                       DepartmentID,
+                                       Department,
+                                       Revenue AS Rev_Dept,
+                                       StoreID
+                                FROM ex4tbl)
+                            HASH BY DepartmentID
+                            SCRIPT_COMMAND ('tdpython3 ./myDB/ex4pLoc.py sketch')
+                            RETURNS ('CompanyID INTEGER, DepartmentID INTEGER, Department VARCHAR(25), AvgRev_Dept FLOAT, N_Stores INTEGER, Sketch VARCHAR(32000) CHARACTER SET LATIN')
+                           ) )
+            HASH BY CompanyID
+            SCRIPT_COMMAND ('tdpython3 ./myDB/ex4pGlb.py sketch 0.5 0.9 0.99')
+            RETURNS ('CompanyID INTEGER, AllDepts INTEGER, Avg_Dept_Revenue FLOAT, Distinct_Stores INTEGER, Std_Revenue FLOAT, Min_Revenue FLOAT, Max_Revenue FLOAT, P50_Revenue FLOAT, P90_Revenue FLOAT, P99_Revenue FLOAT')
+           );
@@ -22,6 +22,15 @@
 #   average revenue per department whose data are assigned on the local AMP.
 # In the "reduce" step, the Python Global Average module "ex4pGlb.py" combines
 #   the partial results from all AMPs to reduce them to the final answer.
+#   The script reduces the partial results of every company in its input, and
+#   accepts several partial results per department.
+#
+# In sketch mode, the input also holds the revenue sketch of every department
+# (see "ex4pLoc.py"). The script merges the sketches of all departments of the
+# company, and adds the standard deviation, the extremes, the specified
+# percentiles of the revenue, and the number of distinct stores to the output.
+# The merged sketches give the same results as one sketch of all rows, so the
+# department rows need not be collected on a single AMP.
 #
 # Script accounts for the general scenario that an AMP might have no data.
 #
@@ -29,21 +38,39 @@
 #
 # Required input:
 # - output from script "ex4pLoc.py"
+# - shared input/output module "tdstoIO.py" installed next to the script
+# - in sketch mode: shared sketch module "tdstoSketch.py" installed next to
+#   the script
+#
+# Input Parameters:
+# - Optional keyword "sketch", followed by the probabilities of the revenue
+#   percentiles to output (default: 0.5 0.9 0.99)
 #
-# Output:
+# Output, one row per company:
 # - compID   : The ID of the example company
 # - nStores  : Number of company stores over which averaging takes place
 # - avgGlobal: Global average revenue per department per store
+# In sketch mode, also:
+# - nDistinct: Estimated number of distinct stores of the company
+# - stdRev   : Standard deviation of the revenue per department per store
+# - minRev   : Smallest revenue per department per store
+# - maxRev   : Largest revenue per department per store
+# - One column per specified probability: Estimated percentile of the revenue
+#   per department per store
 #
 #o##############################################################################
 
 # Load dependency packages
-import pandas as pd
 import numpy as np
 import sys
+import tdstoIO
 
 DELIMITER = '\t'
 
+sketchMode = len(sys.argv) > 1 and sys.argv[1] == 'sketch'
+if sketchMode:
+    probs = [float(arg) for arg in sys.argv[2:]] or [0.5, 0.9, 0.99]
+
 # Know your data: You must know in advance the number and data types of the
 # incoming columns from the SQL Engine database!
 # For this script, the input expected format is:
@@ -53,36 +80,83 @@ colNames = ['CompanyID', 'DepartmentID', 'Department',
 # Of the above input columns, CompanyID and DepartmentID are integers, the
 # Department is a string, and the AvgRev_Dept is a float variable. The
 # number of stores N_Stores is an integer, but for the tasks that follow
-# it is convenient to interpret it as a float variable.
-# If any numbers are streamed in scientific format that contains blanks i
-# (such as "1 E002" for 100), the following Lambda functions remove blanks
-# from the input string so that Python interprets the number correctly.
-sciStrToFloat = lambda x: float("".join(x.split()))
-sciStrToInt = lambda x: int(float("".join(x.split())))
-# Use these Lambda functions in the following converters for each input column.
-converters = {0: sciStrToInt,
-              1: sciStrToInt,
-              3: sciStrToFloat,
-              4: sciStrToFloat}
+# it is convenient to interpret it as a float variable. Declare the types once
+# for the typed reader in tdstoIO. The reader also takes care of any numbers
+# streamed in scientific format with blanks (such as "1 E002" for 100).
+colTypes = {'CompanyID': tdstoIO.INT,
+            'DepartmentID': tdstoIO.INT,
+            'Department': tdstoIO.STR,
+            'AvgRev_Dept': tdstoIO.FLOAT,
+            'N_Stores': tdstoIO.FLOAT}
+if sketchMode:
+    colNames.append('Sketch')
+    colTypes['Sketch'] = tdstoIO.STR
 
-### Ingest the input data
+schema = tdstoIO.StoSchema(colNames, colTypes)
+if sketchMode:
+    import tdstoSketch
+
+### Ingest and aggregate the input data, one chunk at a time
 ###
-dfIn = pd.read_csv(sys.stdin, sep=DELIMITER, header=None, names=colNames,
-                   index_col=False, iterator=False, converters=converters)
+# The script computes one result row per company in its input, so that the
+# input can hold the partial results of any number of companies, such as with
+# HASH BY CompanyID. Every chunk is aggregated by company and added to the
+# running aggregates, so the memory use is of the order of the chunk size plus
+# the number of companies.
+reader = tdstoIO.StoReader(schema, delimiter=DELIMITER)
+sizer = tdstoIO.StoChunkSizer()
+
+dfAgg = None         # Number of stores and total revenue per company
+sketches = {}        # In sketch mode, the merged revenue sketch per company
+while 1:
+    tChunk = sizer.start()
+    try:
+        dfChunk = reader.getChunk(sizer.nRows)
+    except (EOFError, StopIteration):
+        break
+    if dfChunk.empty:
+        break
+
+    # Weigh each partial average on the basis of its number of stores
+    dfChunk['Rev_Total'] = dfChunk['AvgRev_Dept'] * dfChunk['N_Stores']
+    grouped = dfChunk.groupby('CompanyID', sort=False)
+    dfChunkAgg = grouped[['N_Stores', 'Rev_Total']].sum()
+    dfAgg = (dfChunkAgg if dfAgg is None
+             else dfAgg.add(dfChunkAgg, fill_value=0))
+
+    if sketchMode:
+        texts = dfChunk['Sketch'].to_numpy()
+        for key, idx in grouped.indices.items():
+            sketch = tdstoSketch.mergeTexts(texts[idx])
+            if key in sketches:
+                sketches[key].merge(sketch)
+            else:
+                sketches[key] = sketch
+
+    sizer.update(dfChunk, tChunk)
 
 # For AMPs that receive no data, exit the script instance gracefully.
-if dfIn.empty:
+if dfAgg is None:
+    sys.exit()
+
+dfAgg = dfAgg.sort_index()
+writer = tdstoIO.StoWriter(delimiter=DELIMITER)
+
+### Sketch mode
+###
+if sketchMode:
+    for compID in dfAgg.index:
+        sketch = sketches[compID]
+        moments = sketch.moments
+        writer.writeRow(compID, moments.n, moments.mean,
+                        int(round(sketch.distinct.count())),
+                        np.sqrt(moments.variance()), moments.min, moments.max,
+                        *sketch.quantiles.quantiles(probs))
     sys.exit()
 
-if dfIn.shape[0] == 1:
-    avgGlobal = dfIn.at[0, 'AvgRev_Dept']
-else:
-    # Total number of stores
-    nStores = dfIn['N_Stores'].sum()
-    # Weigh each partial average on the basis of nStores
-    dfIn['weights'] = dfIn['N_Stores'].div(nStores)
-    # Obtain global average
-    avgGlobal = dfIn['AvgRev_Dept'].dot(dfIn['weights'])
+# Total number of stores, and global average
+nStores = dfAgg['N_Stores']
+avgGlobal = dfAgg['Rev_Total'] / nStores
 
 # Export results to the SQL Engine database through standard output
-print(dfIn.at[0, 'CompanyID'], DELIMITER, nStores, DELIMITER, avgGlobal)
+writer.writeColumns(dfAgg.index, nStores.astype(np.int64), avgGlobal)
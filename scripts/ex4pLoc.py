@@ -20,67 +20,123 @@
 # The task takes place in 2 steps, namely a "map" and a "reduce" step:
 # In the "map" step, the Python AMP Operations module "ex4pLoc.py" computes the
 #   average revenue per department whose data are assigned on the local AMP.
+#   The script aggregates the rows of every department in its input, so it
+#   can run once per AMP over several departments.
 # In the "reduce" step, the Python Global Average module "ex4pGlb.py" combines
 #   the partial results from all AMPs to reduce them to the final answer.
 #
+# Optionally, the script also summarizes the revenue of each department in a
+# mergeable sketch (see "tdstoSketch.py"), so that "ex4pGlb.py" can report the
+# variance, percentiles, and number of distinct stores of all departments of a
+# company. The sketch is a text of fixed size, regardless of the number of rows.
+#
 # Script accounts for the general scenario that an AMP might have no data.
+# The memory use depends on the number of departments, not on the number of
+# rows.
 #
 # Requires pandas, numpy, and statsmodels add-on package.
 #
 # Required input:
 # - ex4tbl table data from the file "ex4data.csv"
+# - shared input/output module "tdstoIO.py" installed next to the script
+# - in sketch mode: shared sketch module "tdstoSketch.py" installed next to
+#   the script, and the StoreID column as an additional last input column
+#
+# Input Parameters:
+# - Optional keyword "sketch" to add the sketch of the revenue to the output
 #
-# Output:
+# Output, one row per department:
 # - CompanyID   : The ID of the example company
 # - DepartmentID: The ID of the present department
 # - dptname     : Name of the preseent department
 # - deptMeanRev : Average revenue of the present department
 # - nRows       : Number of records that determine the average revenue
+# - Sketch      : In sketch mode only, the text of the sketch of the revenue
+#                 values, with the distinct count of the StoreID values
 #
 ################################################################################
 
 # Load dependency packages
-import pandas as pd
+import numpy as np
 import sys
+import tdstoIO
 
 DELIMITER = '\t'
 
+sketchMode = len(sys.argv) > 1 and sys.argv[1] == 'sketch'
+
 # Know your data: You must know in advance the number and data types of the
 # incoming columns from the SQL Engine database!
 # For this script, the input expected format is:
 # 0: ObsID, 1: X coordinate, 2: Y coordinate, 3: ObsGroup
 colNames = ['CompanyID', 'DepartmentID', 'Department', 'Revenue']
 # Of the above input columns, CompanyID and DepartmentID are integers, the
-# Department is a string, and Revenue is a float variable.
-# If any numbers are streamed in scientific format that contains blanks i
-# (such as "1 E002" for 100), the following Lambda functions remove blanks
-# from the input string so that Python interprets the number correctly.
-sciStrToFloat = lambda x: float("".join(x.split()))
-sciStrToInt = lambda x: int(float("".join(x.split())))
-# Use these Lambda functions in the following converters for each input column.
-converters = {0: sciStrToInt,
-              1: sciStrToInt,
-              3: sciStrToFloat}
+# Department is a string, and Revenue is a float variable. Declare the types
+# once for the typed reader in tdstoIO. The reader also takes care of any
+# numbers streamed in scientific format with blanks (such as "1 E002" for 100).
+colTypes = {'CompanyID': tdstoIO.INT,
+            'DepartmentID': tdstoIO.INT,
+            'Department': tdstoIO.STR,
+            'Revenue': tdstoIO.FLOAT}
+if sketchMode:
+    colNames.append('StoreID')
+    colTypes['StoreID'] = tdstoIO.INT
+
+schema = tdstoIO.StoSchema(colNames, colTypes)
+
+if sketchMode:
+    import tdstoSketch
 
-### Ingest the input data
+### Ingest and aggregate the input data, one chunk at a time
 ###
-dfIn = pd.read_csv(sys.stdin, sep=DELIMITER, header=None, names=colNames,
-                   index_col=False, iterator=False, converters=converters)
+# The script computes one result row per department in its input. The input
+# can then hold any number of departments, such as all the rows of an AMP with
+# HASH BY DepartmentID, in place of one script instance per department with
+# PARTITION BY. Every chunk is aggregated by department, and added to the
+# running aggregates of the departments. Only the aggregates are kept, so the
+# memory use is of the order of the chunk size plus the number of departments.
+groupCols = ['CompanyID', 'DepartmentID', 'Department']
+reader = tdstoIO.StoReader(schema, delimiter=DELIMITER)
+sizer = tdstoIO.StoChunkSizer()
+
+dfAgg = None         # Sum and count of revenue values, and rows per group
+sketches = {}        # In sketch mode, the revenue sketch per group
+while 1:
+    tChunk = sizer.start()
+    try:
+        dfChunk = reader.getChunk(sizer.nRows)
+    except (EOFError, StopIteration):
+        break
+    if dfChunk.empty:
+        break
+
+    grouped = dfChunk.groupby(groupCols, sort=False)
+    dfChunkAgg = grouped['Revenue'].agg(['sum', 'count', 'size'])
+    dfAgg = (dfChunkAgg if dfAgg is None
+             else dfAgg.add(dfChunkAgg, fill_value=0))
+
+    if sketchMode:
+        revenue = dfChunk['Revenue'].to_numpy(dtype=np.float64)
+        storeIDs = dfChunk['StoreID'].to_numpy()
+        for key, idx in grouped.indices.items():
+            if key not in sketches:
+                sketches[key] = tdstoSketch.Sketch()
+            sketches[key].update(revenue[idx], keys=storeIDs[idx])
+
+    sizer.update(dfChunk, tChunk)
 
 # For AMPs that receive no data, exit the script instance gracefully.
-if dfIn.empty:
+if dfAgg is None:
     sys.exit()
 
-# We need average revenue for present department. Round value to 2 decimals.
-nRows = dfIn.shape[0]
-# Note: Older Python versions might throw an error if attempting to use
-#       dfIn.Revenue.mean().round(2)
-#       Circumventing issue by doing explicitly:
-deptMeanRev = dfIn.Revenue.mean()
-deptMeanRev = round(deptMeanRev, 2)
+# We need average revenue per department. Round values to 2 decimals.
+dfAgg = dfAgg.sort_index()
+deptMeanRev = (dfAgg['sum'] / dfAgg['count']).round(2)
+nRows = dfAgg['size'].astype(np.int64)
+outCols = [dfAgg.index.get_level_values(name) for name in groupCols]
+if sketchMode:
+    outCols.append([sketches[key].encode() for key in dfAgg.index])
 
 # Export results to the SQL Engine database through standard output
-print(dfIn.at[0, 'CompanyID'], DELIMITER,
-      dfIn.at[0, 'DepartmentID'], DELIMITER,
-      dfIn.at[0, 'Department'], DELIMITER,
-      deptMeanRev, DELIMITER, nRows)
+tdstoIO.StoWriter(delimiter=DELIMITER).writeColumns(
+    *outCols[:3], deptMeanRev, nRows, *outCols[3:])
@@ -109,4 +109,4 @@ varName.extend(xCols[1:])      # Skip column name of sums
 
 # Export results to the SQL Engine database through standard output
 for i in range( 0, len(varName) ):
-    print(varName[i], DELIMITER, float(B[i]))
+    print(varName[i], DELIMITER, float(B[i, 0]))
@@ -23,9 +23,17 @@
 -- matrix of the data. The example illustrates how to use the CALCMATRIX table
 -- operator for this task. The script returns the estimates of the regression
 -- coefficients.
+-- The second query computes the same matrix with Python scripts in place of
+-- CALCMATRIX: "ex5pLoc.py" adds up the data of every AMP in one pass, and
+-- "ex5pGlb.py" adds up the partial results of all AMPs. This makes the whole
+-- regression a fully parallel computation in the SCRIPT table operator.
 --
 -- Required input:
 -- - "ex5p.py" Python script to install in database
+-- - "ex5pLoc.py" Python AMP Sufficient Statistics script to install in database
+-- - "ex5pGlb.py" Python Global Sufficient Statistics script to install in
+--   database
+-- - "tdstoIO.py" shared input/output Python module to install in database
 -- - ex5tbl table data from file "ex5dataTblDef.sql"
 --
 -- Reminder: In case of errors, you can find the STO full standard error output
@@ -51,6 +59,18 @@ SET SESSION SEARCHUIFDBPATH = myDB;
 CALL SYSUIF.REMOVE_FILE('ex5p',1);
 CALL SYSUIF.INSTALL_FILE('ex5p','ex5p.py','cz!/root/stoTests/ex5p.py');
 
+-- Install the shared input/output module that the Python scripts import.
+CALL SYSUIF.REMOVE_FILE('tdstoIO',1);
+CALL SYSUIF.INSTALL_FILE('tdstoIO','tdstoIO.py','cz!/root/stoTests/tdstoIO.py');
+
+-- Register the script for the sums of squares and cross-products on AMPs
+CALL SYSUIF.REMOVE_FILE('ex5pLoc',1);
+CALL SYSUIF.INSTALL_FILE('ex5pLoc','ex5pLoc.py','cz!/root/stoTests/ex5pLoc.py');
+
+-- Register the script for the global sums across AMPs
+CALL SYSUIF.REMOVE_FILE('ex5pGlb',1);
+CALL SYSUIF.INSTALL_FILE('ex5pGlb','ex5pGlb.py','cz!/root/stoTests/ex5pGlb.py');
+
 -- Use a Python script to perform linear regression on the data provided
 -- in table ex5tbl. The needed sum of squares and cross products is computed
 -- by intermediately calling the CALCMATRIX table operator and asking for the
@@ -67,3 +87,26 @@ FROM SCRIPT( ON( SELECT *
              SCRIPT_COMMAND('tdpython3 ./myDB/ex5p.py')
              RETURNS ('oc1 VARCHAR(20), oc2 FLOAT')
            ) AS D;
+
+-- Same regression, with the sums of squares and cross products computed by
+-- Python scripts in place of CALCMATRIX. "ex5pLoc.py" runs on every AMP over
+-- the local rows of ex5tbl. The SESSION value hashes the partial results of
+-- all AMPs to a single AMP, where "ex5pGlb.py" adds them up. The arguments of
+-- "ex5pLoc.py" and "ex5pGlb.py" are the names of the columns of ex5tbl, with
+-- the dependent variable last.
+SELECT oc1 AS Coefficient,
+       oc2 AS cValue
+FROM SCRIPT( ON( SELECT *
+                 FROM SCRIPT
+                      (ON (SELECT SESSION AS ampkey, D1.*
+                           FROM SCRIPT (ON (SELECT x1, x2, y FROM ex5tbl)
+                                        SCRIPT_COMMAND('tdpython3 ./myDB/ex5pLoc.py x1 x2 y')
+                                        RETURNS ('rownum INTEGER, rowname VARCHAR(128), c BIGINT, s FLOAT, x1 FLOAT, x2 FLOAT, y FLOAT')
+                                       ) AS D1 )
+                       HASH BY ampkey
+                       SCRIPT_COMMAND('tdpython3 ./myDB/ex5pGlb.py x1 x2 y')
+                       RETURNS ('rownum INTEGER, rowname VARCHAR(128), c BIGINT, s FLOAT, x1 FLOAT, x2 FLOAT, y FLOAT')
+                      ) AS D2 )
+             SCRIPT_COMMAND('tdpython3 ./myDB/ex5p.py')
+             RETURNS ('oc1 VARCHAR(20), oc2 FLOAT')
+           ) AS D;
@@ -0,0 +1,74 @@
+################################################################################
+# The contents of this file are Teradata Public Content
+# and have been released to the Public Domain.
+# Licensed under BSD; see "license.txt" file for more information.
+# Copyright (c) 2023 by Teradata
+################################################################################
+#
+# R And Python Analytics with SCRIPT Table Operator
+# Orange Book supplementary material
+# Alexander Kolovos - October 2026 - v.2.6
+#
+# Example 5: Linear Regression - Global Sufficient Statistics module (Python)
+# File     : ex5pGlb.py
+#
+# Use case:
+# In the "reduce" step of the fully parallel linear regression (see
+# "ex5pLoc.py" for the full description), add up the counts, sums, and
+# cross-products of all AMPs. The output has the layout of the CALCMATRIX
+# output with the 'ESSCP' calculation type, and is the input of "ex5p.py".
+#
+# Script accounts for the general scenario that an AMP might have no data.
+#
+# Requires the numpy and pandas add-on packages.
+#
+# Required input:
+# - Partial results of "ex5pLoc.py" of all AMPs, hashed to a single AMP by a
+#   leading key column (see "ex5p.sql")
+# - shared input/output module "tdstoIO.py" installed next to the script
+#
+# Input Parameters:
+# - The names of the input columns of "ex5pLoc.py" (default: x1 x2 y)
+#
+# Output, one row per input column of "ex5pLoc.py":
+# - rownum, rowname, c, s, and one cross-products column per input column, as
+#   in the output of "ex5pLoc.py"
+#
+################################################################################
+
+# Load dependency packages
+import sys
+import tdstoIO
+
+DELIMITER = '\t'
+
+# Know your data: You must know in advance the number and data types of the
+# incoming columns from the SQL Engine database!
+# For this script, the input expected format is:
+# 0: ampkey (not used by the script), 1: rownum, 2: rowname, 3: c, 4: s,
+# 5...: cross-products with each input column of "ex5pLoc.py"
+xCols = sys.argv[1:] if len(sys.argv) > 1 else ['x1', 'x2', 'y']
+colNames = ['ampkey', 'rownum', 'rowname', 'c', 's'] + xCols
+colTypes = {'ampkey': tdstoIO.STR,
+            'rownum': tdstoIO.INT,
+            'rowname': tdstoIO.STR,
+            'c': tdstoIO.INT}
+
+### Ingest the input data
+###
+schema = tdstoIO.StoSchema(colNames, colTypes, useCols=colNames[1:])
+dfIn = tdstoIO.StoReader(schema, delimiter=DELIMITER).readAll()
+
+# For AMPs that receive no data, exit the script instance gracefully.
+if dfIn.empty:
+    sys.exit()
+
+# Add up the partial results of all AMPs, row by row
+dfIn['rowname'] = dfIn['rowname'].str.strip()
+dfGlb = dfIn.groupby(['rownum', 'rowname'], sort=True).sum()
+
+# Export results to the SQL Engine database through standard output
+tdstoIO.StoWriter(delimiter=DELIMITER).writeColumns(
+    dfGlb.index.get_level_values('rownum'),
+    dfGlb.index.get_level_values('rowname'),
+    dfGlb['c'], dfGlb['s'], *[dfGlb[name] for name in xCols])
@@ -0,0 +1,102 @@
+################################################################################
+# The contents of this file are Teradata Public Content
+# and have been released to the Public Domain.
+# Licensed under BSD; see "license.txt" file for more information.
+# Copyright (c) 2023 by Teradata
+################################################################################
+#
+# R And Python Analytics with SCRIPT Table Operator
+# Orange Book supplementary material
+# Alexander Kolovos - October 2026 - v.2.6
+#
+# Example 5: Linear Regression - AMP Sufficient Statistics module (Python vers.)
+# File     : ex5pLoc.py
+#
+# Use case:
+# Compute the sums of squares and cross-products matrix of the ex5tbl data on
+# every AMP, in place of the LOCAL and COMBINE phases of the CALCMATRIX table
+# operator. This is the "map" step of a fully parallel linear regression:
+# - The present script reads the data rows of the AMP in chunks, and adds up
+#   the count, the sums, and the cross-products of the columns for each chunk
+#   with a single matrix product. The cost per AMP is linear in the number of
+#   rows and quadratic in the number of columns.
+# - The "ex5pGlb.py" script adds up the partial results of all AMPs.
+# - The "ex5p.py" script computes the regression coefficients from the sums.
+# The output of the present script and of "ex5pGlb.py" has the same layout as
+# the CALCMATRIX output with the 'ESSCP' calculation type that "ex5p.py" reads.
+# Rows with NULL values are skipped, like CALCMATRIX does by default.
+#
+# Script accounts for the general scenario that an AMP might have no data.
+#
+# Requires the numpy and pandas add-on packages.
+#
+# Required input:
+# - ex5tbl table data from file "ex5dataTblDef.sql"
+# - shared input/output module "tdstoIO.py" installed next to the script
+#
+# Input Parameters:
+# - The names of the input columns, in the order of the input, with the
+#   dependent variable last (default: x1 x2 y)
+#
+# Output, one row per input column:
+# - rownum : Position of the column, starting at 1
+# - rowname: Name of the column
+# - c      : Number of rows
+# - s      : Sum of the column values
+# - One column per input column: Sum of the products of the column values
+#   with the values of that column
+#
+################################################################################
+
+# Load dependency packages
+import numpy as np
+import sys
+import tdstoIO
+
+DELIMITER = '\t'
+
+# Know your data: You must know in advance the number and data types of the
+# incoming columns from the SQL Engine database! In the present script, the
+# column names are the input arguments. All columns are numeric.
+colNames = sys.argv[1:] if len(sys.argv) > 1 else ['x1', 'x2', 'y']
+nCols = len(colNames)
+
+schema = tdstoIO.StoSchema(colNames,
+                           {name: tdstoIO.FLOAT for name in colNames})
+reader = tdstoIO.StoReader(schema, delimiter=DELIMITER)
+sizer = tdstoIO.StoChunkSizer()
+
+nObs = 0
+sums = np.zeros(nCols)
+sscp = np.zeros((nCols, nCols))
+
+### Ingest and process the input data, one chunk at a time
+###
+while 1:
+    tChunk = sizer.start()
+    try:
+        dfChunk = reader.getChunk(sizer.nRows)
+    except (EOFError, StopIteration):
+        break
+    if dfChunk.empty:
+        break
+
+    data = dfChunk.to_numpy(dtype=np.float64)
+    # Skip rows with NULL values
+    isComplete = ~np.isnan(data).any(axis=1)
+    if not isComplete.all():
+        data = data[isComplete]
+    nObs += data.shape[0]
+    sums += data.sum(axis=0)
+    sscp += np.dot(data.T, data)
+
+    sizer.update(dfChunk, tChunk)
+
+# For AMPs that receive no data, exit the script instance gracefully.
+if nObs == 0:
+    sys.exit()
+
+# Export results to the SQL Engine database through standard output
+tdstoIO.StoWriter(delimiter=DELIMITER).writeColumns(
+    np.arange(1, nCols + 1), colNames, nObs, sums,
+    *[sscp[:, j] for j in range(nCols)])
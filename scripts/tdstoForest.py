@@ -0,0 +1,187 @@
+################################################################################
+# The contents of this file are Teradata Public Content
+# and have been released to the Public Domain.
+# Licensed under BSD; see "license.txt" file for more information.
+# Copyright (c) 2023 by Teradata
+################################################################################
+#
+# R And Python Analytics with SCRIPT Table Operator
+# Orange Book supplementary material
+# Alexander Kolovos - October 2026 - v.2.6
+#
+# Shared module: Tree-ensemble scoring engine in pure numpy
+# File     : tdstoForest.py
+#
+# Helper module imported by the Python scripts of the examples. It is not a
+# stand-alone script. Install it in the database next to the scripts that
+# use it, for example:
+#   CALL SYSUIF.INSTALL_FILE('tdstoForest','tdstoForest.py','cz!/root/stoTests/tdstoForest.py');
+#
+# Scores a Random Forests classifier that has been flattened into contiguous
+# numpy arrays by StoForest.fromClassifier(), such as in the client script
+# "ex1pExport.py" (see data/ex1dataprep/).
+# The nodes of all trees are stored in one set of arrays:
+# - feature    : Index of the feature that a node splits on (0 at leaves)
+# - threshold  : Split threshold; a row goes left if its value is <= threshold
+# - left, right: Global indices of the node children. Leaves point to
+#                themselves, so that extra descent steps leave rows in place.
+# - value      : Class probabilities of each node, shape (nNodes, nClasses)
+# - roots      : Index of the root node of each tree
+# - maxDepth   : Depth of the deepest tree
+# - classes    : Class labels, featureNames: Predictor column names
+#
+# All trees are evaluated for a whole batch of rows at once: every descent
+# step moves all (row, tree) pairs one level down with numpy gather
+# operations. The result matches the scikit-learn predict_proba() values,
+# because rows are compared in float32 precision with the float64 thresholds
+# just like in scikit-learn. The scoring nodes need no scikit-learn package.
+#
+# Missing values: A NaN value is never <= a threshold, so rows with NaN values
+# go right at every split. scikit-learn forests (version 1.4 and later) that
+# were fitted on data with missing values route them left or right per node
+# instead, and fromClassifier() does not keep that direction. The scores of
+# rows with NaN values can then differ from scikit-learn; impute the missing
+# values before scoring, or score such rows with scikit-learn.
+#
+# Requires the numpy add-on package.
+#
+################################################################################
+
+import io
+import numpy as np
+
+_ARRAYS = ('feature', 'threshold', 'left', 'right', 'value', 'roots',
+           'classes', 'featureNames')
+
+
+class StoForest:
+    """Flattened tree ensemble classifier.
+
+    The scoring method is named predict_proba() like in scikit-learn, so a
+    StoForest can be used in place of a RandomForestClassifier in a script.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, roots,
+                 maxDepth, classes, featureNames):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.maxDepth = int(maxDepth)
+        self.classes_ = classes
+        self.featureNames = featureNames
+
+    @classmethod
+    def fromClassifier(cls, classifier, featureNames):
+        """Return the flattened forest of a fitted scikit-learn single-output
+        tree ensemble classifier, such as a RandomForestClassifier.
+
+        Node indices of each tree are shifted by the number of nodes of the
+        trees before it. Leaves get themselves as children, and their class
+        counts become class probabilities.
+        """
+        feature, threshold, left, right, value, roots = [], [], [], [], [], []
+        maxDepth = 0
+        nNodes = 0
+        for estimator in classifier.estimators_:
+            tree = estimator.tree_
+            isLeaf = tree.children_left == -1
+            nodeIds = np.arange(tree.node_count)
+            feature.append(np.where(isLeaf, 0, tree.feature))
+            threshold.append(np.where(isLeaf, 0.0, tree.threshold))
+            left.append(np.where(isLeaf, nodeIds, tree.children_left)
+                        + nNodes)
+            right.append(np.where(isLeaf, nodeIds, tree.children_right)
+                         + nNodes)
+            counts = tree.value[:, 0, :]
+            value.append(counts / counts.sum(axis=1, keepdims=True))
+            roots.append(nNodes)
+            maxDepth = max(maxDepth, tree.max_depth)
+            nNodes += tree.node_count
+        return cls(feature=np.concatenate(feature).astype(np.intp),
+                   threshold=np.concatenate(threshold).astype(np.float64),
+                   left=np.concatenate(left).astype(np.intp),
+                   right=np.concatenate(right).astype(np.intp),
+                   value=np.concatenate(value).astype(np.float64),
+                   roots=np.asarray(roots, dtype=np.intp),
+                   maxDepth=maxDepth,
+                   classes=np.asarray(classifier.classes_),
+                   featureNames=np.asarray(featureNames))
+
+    @classmethod
+    def load(cls, fileIn):
+        """Load a flattened forest from an .npz file name or file object."""
+        with np.load(fileIn, allow_pickle=False) as npz:
+            arrays = {name: npz[name] for name in _ARRAYS}
+            maxDepth = int(npz['maxDepth'])
+        return cls(maxDepth=maxDepth, **arrays)
+
+    def save(self, fileOut):
+        """Save the flattened forest into an .npz file name or file object."""
+        np.savez(fileOut, maxDepth=np.int64(self.maxDepth),
+                 feature=self.feature, threshold=self.threshold,
+                 left=self.left, right=self.right, value=self.value,
+                 roots=self.roots, classes=self.classes_,
+                 featureNames=self.featureNames)
+
+    @property
+    def nTrees(self):
+        return self.roots.shape[0]
+
+    @property
+    def nNodes(self):
+        return self.left.shape[0]
+
+    @property
+    def nbytes(self):
+        """Memory of the forest arrays in bytes."""
+        return sum(getattr(self, name).nbytes for name in
+                   ('feature', 'threshold', 'left', 'right', 'value',
+                    'roots', 'classes_', 'featureNames'))
+
+    def apply(self, X):
+        """Return the leaf index of every row in every tree.
+
+        X is a 2D array or DataFrame with the predictor columns in the order
+        of featureNames. NaN values go right at every split. The result has
+        shape (nRows, nTrees).
+        """
+        # Compare in float32 precision like scikit-learn does
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        nRows = X.shape[0]
+        node = np.broadcast_to(self.roots, (nRows, self.nTrees)).copy()
+        # Offset of each row in the flattened X, to gather X[row, feature]
+        rowOffset = (np.arange(nRows, dtype=np.intp) * X.shape[1])[:, None]
+        Xflat = X.ravel()
+        for _ in range(self.maxDepth):
+            nextLeft = self.left[node]
+            if (nextLeft == node).all():     # All rows reached their leaves
+                break
+            goLeft = Xflat[rowOffset + self.feature[node]] \
+                <= self.threshold[node]
+            node = np.where(goLeft, nextLeft, self.right[node])
+        return node
+
+    def predict_proba(self, X):
+        """Return the class probabilities, shape (nRows, nClasses)."""
+        leaves = self.apply(X)
+        proba = np.zeros((leaves.shape[0], self.value.shape[1]))
+        for t in range(self.nTrees):
+            proba += self.value[leaves[:, t]]
+        proba /= self.nTrees
+        return proba
+
+    def predict(self, X):
+        """Return the predicted class label of every row."""
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def decodeForest(raw):
+    """Decode the raw contents of an .npz forest file.
+
+    Use with tdstoModelCache.loadModel() to share the forest arrays among the
+    script instances on a node.
+    """
+    return StoForest.load(io.BytesIO(raw))
@@ -0,0 +1,226 @@
+################################################################################
+# The contents of this file are Teradata Public Content
+# and have been released to the Public Domain.
+# Licensed under BSD; see "license.txt" file for more information.
+# Copyright (c) 2023 by Teradata
+################################################################################
+#
+# R And Python Analytics with SCRIPT Table Operator
+# Orange Book supplementary material
+# Alexander Kolovos - October 2026 - v.2.6
+#
+# Shared module: Compact generalized linear models
+# File     : tdstoGLM.py
+#
+# Helper module imported by the Python scripts of the examples. It is not a
+# stand-alone script. Install it in the database next to the scripts that
+# use it, for example:
+#   CALL SYSUIF.INSTALL_FILE('tdstoGLM','tdstoGLM.py','cz!/root/stoTests/tdstoGLM.py');
+#
+# A pickled statsmodels GLM results object also holds the training data, the
+# design matrix and the residuals, so its size grows with the number of rows
+# of the fit. Scoring needs only the coefficients and the link function. The
+# compact model format is a single line of text with fields separated by "|":
+#   tdstoGLM1|family|link|column,column,...|coef,coef,...|cov,cov,...
+# - family : Name of the statsmodels family, such as "binomial"
+# - link   : Name of the link function, such as "logit"
+# - columns: Names of the design matrix columns, in order of the coefficients
+# - coef   : Coefficients, with 17 significant digits
+# - cov    : Optional covariance matrix of the coefficients, row by row
+# The text has no tab or newline characters, and its size depends on the
+# number of columns only. A model with 6 coefficients takes about 150 bytes,
+# or about 800 bytes with the covariance matrix.
+#
+# The StoGLM class scores compact models with numpy alone. Its predict()
+# computes the linear predictor with one matrix-vector product, and applies
+# the inverse link function like statsmodels does, so the scores match the
+# predict() values of the fitted statsmodels results.
+#
+# fitLogitIRLS() fits a logistic regression without holding the data in
+# memory. It runs the iteratively reweighted least squares (IRLS) iterations
+# of statsmodels, with one pass over the data per iteration: every chunk of
+# rows adds to the weighted cross-products X'WX and X'Wz, and the coefficients
+# are the solution of X'WX b = X'Wz. The memory use is of the order of the
+# chunk size times the number of columns.
+#
+# Requires the numpy add-on package. Pickled models of the earlier format are
+# also read by loadModel(), which then requires statsmodels.
+#
+################################################################################
+
+import numpy as np
+
+MAGIC = 'tdstoGLM1'
+
+# Clipping of probabilities like in statsmodels
+_FLOAT_EPS = np.finfo(float).eps
+
+# Inverse link functions: mean of the response from the linear predictor
+_INVERSE_LINKS = {
+    'identity': lambda z: z,
+    'log': np.exp,
+    'logit': lambda z: 1. / (1. + np.exp(-z)),
+    'cloglog': lambda z: 1. - np.exp(-np.exp(z)),
+    'inverse_power': lambda z: 1. / z,
+}
+
+# statsmodels link class names as link names of the compact format
+_LINK_NAMES = {'Identity': 'identity', 'Log': 'log', 'Logit': 'logit',
+               'CLogLog': 'cloglog', 'InversePower': 'inverse_power'}
+
+
+class StoGLM:
+    """Generalized linear model for scoring: coefficients and link function.
+
+    The scoring method is named predict() like in statsmodels, so a StoGLM can
+    be used in place of GLM results in a script.
+    """
+
+    def __init__(self, family, link, columns, params, cov=None):
+        if link not in _INVERSE_LINKS:
+            raise ValueError("tdstoGLM: Unsupported link function " + link)
+        self.family = family
+        self.link = link
+        self.columns = list(columns)
+        self.params = np.asarray(params, dtype=np.float64)
+        self.cov = (None if cov is None else
+                    np.asarray(cov, dtype=np.float64).reshape(
+                        len(self.columns), len(self.columns)))
+        self._inverse = _INVERSE_LINKS[link]
+
+    @classmethod
+    def fromResults(cls, fitResult, withCov=False):
+        """Return the compact model of fitted statsmodels GLM results."""
+        family = fitResult.model.family
+        linkClass = type(family.link).__name__
+        if linkClass not in _LINK_NAMES:
+            raise ValueError("tdstoGLM: Unsupported link function "
+                             + linkClass)
+        columns = list(fitResult.model.exog_names)
+        cov = np.asarray(fitResult.cov_params()) if withCov else None
+        return cls(type(family).__name__.lower(), _LINK_NAMES[linkClass],
+                   columns, np.asarray(fitResult.params), cov)
+
+    @classmethod
+    def decode(cls, text):
+        """Return the model of a compact model text."""
+        fields = text.strip().split('|')
+        if len(fields) != 6 or fields[0] != MAGIC:
+            raise ValueError("tdstoGLM: Not a compact model text")
+        _, family, link, columns, params, cov = fields
+        return cls(family, link, columns.split(','),
+                   [float(v) for v in params.split(',')],
+                   [float(v) for v in cov.split(',')] if cov else None)
+
+    def encode(self):
+        """Return the compact model text."""
+        cov = '' if self.cov is None else ','.join(
+            repr(float(v)) for v in self.cov.ravel())
+        return '|'.join([MAGIC, self.family, self.link,
+                         ','.join(self.columns),
+                         ','.join(repr(float(v)) for v in self.params), cov])
+
+    def cov_params(self):
+        """Covariance matrix of the coefficients, if saved with the model."""
+        if self.cov is None:
+            raise ValueError("tdstoGLM: The model has no covariance matrix")
+        return self.cov
+
+    def predict(self, exog):
+        """Return the predicted means for a design matrix.
+
+        exog: Array with the columns in the order of the coefficients, or a
+              DataFrame with columns named like the model columns
+        """
+        if hasattr(exog, 'columns'):
+            exog = exog[self.columns].to_numpy(dtype=np.float64)
+        return self._inverse(np.dot(exog, self.params))
+
+
+def _binomialDeviance(y, mu):
+    """Deviance of binary responses y with means mu, like statsmodels."""
+    ratio1 = np.clip(y / (mu + 1e-20), _FLOAT_EPS, np.inf)
+    ratio0 = np.clip((1. - y) / (1. - mu + 1e-20), _FLOAT_EPS, np.inf)
+    return 2. * np.sum(y * np.log(ratio1) + (1. - y) * np.log(ratio0))
+
+
+def fitLogitIRLS(passData, columns, maxIter=100, tol=1e-8):
+    """Fit a binomial GLM with the logit link by IRLS in passes over data.
+
+    passData: Function that returns an iterator over the data in chunks of
+              (X, y), where X is the design matrix of the chunk with the
+              intercept column, and y holds the binary responses. It is
+              called once per iteration.
+    columns : Names of the design matrix columns
+    The iterations start and stop like the statsmodels GLM.fit() ones: they
+    stop when the deviance changes by no more than tol. Returns a StoGLM with
+    the covariance matrix of the coefficients.
+    """
+    nCols = len(columns)
+    params = None
+    devPrev = None
+    XtWX = None
+    for iteration in range(maxIter + 1):
+        newXtWX = np.zeros((nCols, nCols))
+        XtWz = np.zeros(nCols)
+        dev = 0.
+        nRows = 0
+        for X, y in passData():
+            if params is None:
+                mu = (y + 0.5) / 2.           # Starting means
+                eta = np.log(mu / (1. - mu))
+            else:
+                eta = np.dot(X, params)
+                mu = 1. / (1. + np.exp(-eta))
+            dev += _binomialDeviance(y, mu)
+            p = np.clip(mu, _FLOAT_EPS, 1. - _FLOAT_EPS)
+            w = p * (1. - p)
+            z = eta + (y - mu) / w
+            newXtWX += np.dot(X.T * w, X)
+            XtWz += np.dot(X.T, w * z)
+            nRows += X.shape[0]
+        if nRows == 0:
+            raise ValueError("tdstoGLM: No data to fit")
+        if params is not None and abs(dev - devPrev) <= tol:
+            break                             # Converged
+        if iteration == maxIter:
+            break
+        devPrev = dev
+        XtWX = newXtWX
+        params = np.linalg.solve(XtWX, XtWz)
+    # The covariance matrix of the last weighted least squares fit
+    return StoGLM('binomial', 'logit', columns, params, np.linalg.inv(XtWX))
+
+
+def isCompact(text):
+    """Tell if a model text is in the compact format."""
+    return text.lstrip().startswith(MAGIC)
+
+
+def encodeModel(fitResult, withCov=False):
+    """Return the compact model text of fitted statsmodels GLM results."""
+    return StoGLM.fromResults(fitResult, withCov).encode()
+
+
+def loadModel(text):
+    """Return the model of a model text of the ex3 model table.
+
+    Compact models are decoded into a StoGLM. Otherwise, the text is a
+    pickled statsmodels object encoded in base64, possibly in the b'...'
+    form that ex3pFit.py prints.
+    """
+    if isCompact(text):
+        return StoGLM.decode(text)
+    import base64
+    import pickle
+    modelInSer64 = text.strip()
+    if modelInSer64.startswith("b'"):
+        modelInSer64 = modelInSer64.partition("'")[2]
+    return pickle.loads(base64.b64decode(modelInSer64))
+
+
+def loadScorer(text):
+    """Return the model of a model text of the ex3 model table as a StoGLM,
+    also when the text is a pickled statsmodels object."""
+    model = loadModel(text)
+    return model if isinstance(model, StoGLM) else StoGLM.fromResults(model)
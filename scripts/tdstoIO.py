@@ -0,0 +1,852 @@
+################################################################################
+# The contents of this file are Teradata Public Content
+# and have been released to the Public Domain.
+# Licensed under BSD; see "license.txt" file for more information.
+# Copyright (c) 2023 by Teradata
+################################################################################
+#
+# R And Python Analytics with SCRIPT Table Operator
+# Orange Book supplementary material
+# Alexander Kolovos - October 2026 - v.2.6
+#
+# Shared module: Input/output helpers for the Python example scripts
+# File     : tdstoIO.py
+#
+# Helper module imported by the Python scripts of the examples. It is not a
+# stand-alone script. Install it in the database next to the scripts that
+# use it, for example:
+#   CALL SYSUIF.INSTALL_FILE('tdstoIO','tdstoIO.py','cz!/root/stoTests/tdstoIO.py');
+# When the SCRIPT Table Operator runs "tdpython3 ./myDB/<script>.py", the
+# script directory is first in the Python path, so "import tdstoIO" finds it.
+#
+# Provides:
+# - StoSchema : Declaration of the incoming columns (names, types, used cols)
+# - StoReader : Typed reader of the tab-delimited rows that the STO streams
+#               into the script through standard input
+# - StoPrefetchReader: StoReader that reads and parses the next chunks on a
+#               background thread while the script processes the current one
+# - StoWriter : Bulk writer of the result rows that the script streams back
+#               to the database through standard output
+# - StoChunkSizer: Adaptive number of rows per input chunk for scripts that
+#               read their input iteratively
+# - StoScorePool: Optional pool that scores several chunks of a script
+#               instance at a time, and returns the results in input order
+# - StoMemTrace: Optional record of the resident memory of the script at its
+#               main stages, reported to standard error at exit
+#
+# The reader parses the input with the pandas C engine and typed columns. No
+# per-cell Python converter functions are used. Numbers streamed in scientific
+# format with blanks (such as "1 E002" for 100) are normalized in bulk on the
+# raw input bytes, and only if such a pattern is present in the input block.
+# When the schema has text columns, only the numeric fields are normalized, so
+# that text values such as "Store 5 E 2" are kept as they are. Integer columns
+# with NULL values cannot be held as integers; such a column of a chunk is
+# returned as float64 with NaN for the NULL values.
+#
+# The prefetch reader overlaps the input with the processing of the chunks. A
+# background thread reads the raw input bytes from the standard input file
+# descriptor and parses the next chunk while the script scores and writes the
+# current one. The pandas C parser, numpy, and scikit-learn release the GIL in
+# their inner loops, so reading, parsing, and scoring run in parallel on
+# separate cores. The thread reads ahead no more than a fixed number of
+# chunks, so the memory use is bounded, and the chunks are returned in the
+# order of the input. A script that holds several chunks at a time, such as
+# with the score pool, declares how many it holds and marks every chunk as done
+# once it is written, so that the chunks being scored count against the bound.
+#
+# The writer formats a whole chunk of result columns at once and writes it to
+# the binary standard output in a single call, instead of calling print() for
+# every row. Float values are written in their shortest exact representation,
+# or rounded to a fixed number of decimals when a precision is specified.
+# Missing float values (NaN) are written as empty fields, which the database
+# reads as NULL values.
+#
+# The chunk sizer starts from a memory budget per script instance, which is
+# the ScriptMemLimit value divided by the expected number of concurrent STO
+# queries. Both values can be given as arguments or through the environment
+# variables TDSTO_SCRIPT_MEM_LIMIT (in bytes, as in the cufconfig utility) and
+# TDSTO_CONCURRENCY. After every chunk the sizer measures the time spent on it
+# and the resident memory of the script, and doubles or halves the chunk size
+# so that chunks are processed fast enough while the script stays well below
+# its memory budget. The memory budget never takes the chunks below 500 rows,
+# the fixed chunk size of the scripts before the sizer; if the script exceeds
+# its budget regardless, a warning is written once to standard error. Every
+# chunk carries the number of rows that was asked for it, so that a chunk read
+# ahead at an earlier size is not mistaken for the short last chunk.
+#
+# The score pool lets a script instance use idle cores of the node, such as
+# when a query runs on fewer AMPs than the node has cores. The pool is off by
+# default. The TDSTO_SCORE_WORKERS environment variable sets the number of
+# chunks to score at a time, or "auto" for the cores of the node divided by
+# the number of AMPs per node (TDSTO_AMPS_PER_NODE) and by the expected
+# concurrency (TDSTO_CONCURRENCY). The number is capped at the cores per AMP,
+# so that all AMPs of the node can use the pool at the same time. The chunks
+# are scored by threads, which suits models whose scoring code releases the
+# GIL (numpy, scikit-learn trees), or by forked processes with
+# TDSTO_SCORE_POOL=process. The script reads and writes the chunks in the
+# main thread, and the results are written in the order of the input.
+#
+# The memory trace is off by default. With the TDSTO_MEM_TRACE environment
+# variable set to 1, tdstoIO records the resident memory of the script when
+# it is imported (after the package imports of the script), after readAll(),
+# after every chunk that the chunk sizer measures, at any stage that the
+# script marks with memMark(), such as after the model is loaded, and at
+# exit. At exit, a single line with the summary in JSON format is written to
+# standard error, which the STO appends to the scriptlog file of the node:
+#   tdstoMem {"script": ..., "stagesMB": {...}, "peakMB": ..., ...}
+# The bytesPerRow value of the summary is the growth of the memory from the
+# last stage before the input to the peak, divided by the largest number of
+# rows held at a time. The bin/tdstoMemCollect.py client script aggregates
+# the summaries of many instances, such as from a scriptlog file or from the
+# instances of a tdstoEmulate.py run.
+#
+# Requires numpy and pandas add-on packages.
+#
+################################################################################
+
+import atexit
+import collections
+import io
+import itertools
+import json
+import os
+import queue
+import re
+import sys
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+DELIMITER = '\t'
+
+# Default number of decimals for float output values. None writes floats in
+# their shortest exact representation. Can be set without editing the scripts
+# through the TDSTO_FLOAT_PRECISION environment variable.
+FLOAT_PRECISION = (int(os.environ['TDSTO_FLOAT_PRECISION'])
+                   if os.environ.get('TDSTO_FLOAT_PRECISION') else None)
+
+# Number of chunks that the prefetch reader reads ahead of the script. 0 reads
+# every chunk only when the script asks for it, like the plain reader. Can be
+# set through the TDSTO_PREFETCH environment variable.
+PREFETCH_CHUNKS = int(os.environ.get('TDSTO_PREFETCH', 1))
+
+# Record the memory of the script at its stages, see StoMemTrace
+MEM_TRACE = os.environ.get('TDSTO_MEM_TRACE', '') not in ('', '0')
+
+# Size of the raw reads of the prefetch reader from the input file descriptor
+_READ_BYTES = 1 << 20
+
+# Column type names accepted in a StoSchema
+INT = 'int'
+FLOAT = 'float'
+STR = 'str'
+
+# Blanks inside a number in scientific format, such as "1 E002" or "1.5E 02".
+# The quick test looks for blanks next to an exponent sign with plain substring
+# searches; the regular expression runs only if the quick test succeeds.
+_sciBlankQuick = (b' E', b'E ', b' e', b'e ')
+_sciBlankRegex = re.compile(rb'([0-9.]) *([Ee]) *([-+]?[0-9])')
+
+
+def _hasSciBlanks(data):
+    return any(pattern in data for pattern in _sciBlankQuick)
+
+
+def normalizeSciBlanks(block, numericFields=None, delimiter=DELIMITER):
+    """Remove blanks inside numbers in scientific format from a bytes block.
+
+    numericFields: Positions of the numeric fields in every line. Only these
+                   fields are normalized, which keeps the text fields intact.
+                   Default: the whole block, for input without text fields.
+    Returns the block unchanged (same object) if no such blanks are present.
+    """
+    if not _hasSciBlanks(block):
+        return block
+    if numericFields is None:
+        return _sciBlankRegex.sub(rb'\1\2\3', block)
+    sep = delimiter.encode('utf-8')
+    lines = block.split(b'\n')
+    for i, line in enumerate(lines):
+        if not _hasSciBlanks(line):
+            continue
+        fields = line.split(sep)
+        for pos in numericFields:
+            if pos < len(fields):
+                fields[pos] = _sciBlankRegex.sub(rb'\1\2\3', fields[pos])
+        lines[i] = sep.join(fields)
+    return b'\n'.join(lines)
+
+
+class StoSchema:
+    """Declaration of the columns that a script receives from the database.
+
+    colNames: List of all incoming column names, in the order of the input.
+    colTypes: Dict of column name to one of 'int', 'float', or 'str'.
+              Columns not listed are read as 'float'. An 'int' column with
+              NULL values in a chunk is returned as float64 with NaN.
+    useCols : Optional list of the column names that the script needs. Other
+              columns are skipped by the parser. Default: all columns.
+    """
+
+    def __init__(self, colNames, colTypes=None, useCols=None):
+        self.colNames = list(colNames)
+        self.colTypes = {name: FLOAT for name in self.colNames}
+        if colTypes:
+            for name, colType in colTypes.items():
+                if name not in self.colTypes:
+                    raise ValueError("Unknown column in schema: " + str(name))
+                if colType not in (INT, FLOAT, STR):
+                    raise ValueError("Unknown type for column " + str(name) +
+                                     ": " + str(colType))
+                self.colTypes[name] = colType
+        if useCols is None:
+            self.useCols = list(self.colNames)
+        else:
+            self.useCols = [name for name in self.colNames if name in useCols]
+        # Integer columns are parsed as float64 by the C engine and cast in
+        # bulk afterwards. This mirrors int(float(x)) of the former converters
+        # and accepts integers that arrive in scientific format.
+        self.parseTypes = {name: (object if self.colTypes[name] == STR
+                                  else np.float64) for name in self.useCols}
+        self.intCols = [name for name in self.useCols
+                        if self.colTypes[name] == INT]
+        # Blanks in scientific format are removed from the whole block, unless
+        # a used text column could hold blanks next to an "E"
+        if any(self.colTypes[name] == STR for name in self.useCols):
+            self.numericFields = [pos for pos, name
+                                  in enumerate(self.colNames)
+                                  if name in self.useCols
+                                  and self.colTypes[name] != STR]
+        else:
+            self.numericFields = None
+
+    def parse(self, block, delimiter=DELIMITER):
+        """Parse a bytes block of complete input lines into a DataFrame."""
+        if not block:
+            return self.empty()
+        block = normalizeSciBlanks(block, self.numericFields, delimiter)
+        df = pd.read_csv(io.BytesIO(block), sep=delimiter, header=None,
+                         names=self.colNames, usecols=self.useCols,
+                         dtype=self.parseTypes, index_col=False,
+                         engine='c', na_filter=True)
+        for name in self.intCols:
+            col = df[name].to_numpy()
+            # NULL values cannot be held in an integer column; keep the
+            # column as float64 with NaN in that case.
+            if not np.isnan(col).any():
+                df[name] = col.astype(np.int64)
+        return df
+
+    def empty(self):
+        """Return an empty DataFrame with the used columns of the schema."""
+        return pd.DataFrame({name: pd.Series(dtype=(object if
+                             self.colTypes[name] == STR else
+                             np.int64 if self.colTypes[name] == INT else
+                             np.float64)) for name in self.useCols})
+
+
+class StoReader:
+    """Typed reader of the STO standard input.
+
+    The reader consumes the input as raw bytes, so avoid mixing it with
+    input() or sys.stdin reads in the same script. Use readLine() for any rows
+    that must be handled individually, such as a leading row with a model.
+
+    schema   : StoSchema of the incoming rows
+    stream   : Binary input stream. Default: sys.stdin.buffer
+    delimiter: Column delimiter of the input. Default: tab
+    """
+
+    def __init__(self, schema, stream=None, delimiter=DELIMITER):
+        self.schema = schema
+        self.stream = sys.stdin.buffer if stream is None else stream
+        self.delimiter = delimiter
+        self.nRowsRead = 0
+
+    def readLine(self):
+        """Return the next raw input line as a string without the line end.
+
+        Returns None at the end of the input.
+        """
+        line = self.stream.readline()
+        if not line:
+            return None
+        return line.decode('utf-8').rstrip('\r\n')
+
+    def readBlock(self, nRows):
+        """Return up to nRows complete raw input lines as one bytes block."""
+        block = b''.join(itertools.islice(self.stream, nRows))
+        if block and not block.endswith(b'\n'):
+            block += b'\n'
+        return block
+
+    def getChunk(self, nRows):
+        """Return a DataFrame with up to nRows input rows.
+
+        Like the pandas reader get_chunk(), raises StopIteration at the end
+        of the input. The row index of every chunk starts at 0.
+        """
+        block = self.readBlock(nRows)
+        if not block:
+            raise StopIteration
+        df = self.schema.parse(block, self.delimiter)
+        # Requested size of the chunk, for the chunk sizer
+        df.attrs['nRowsAsked'] = nRows
+        self.nRowsRead += df.shape[0]
+        return df
+
+    def readAll(self):
+        """Return a DataFrame with all remaining input rows.
+
+        Returns an empty DataFrame if there is no input.
+        """
+        block = self.stream.read()
+        if block and not block.endswith(b'\n'):
+            block += b'\n'
+        df = self.schema.parse(block, self.delimiter)
+        self.nRowsRead += df.shape[0]
+        memTrace.chunk(df.shape[0], currentRSS(), stage='input')
+        return df
+
+
+class StoPrefetchReader(StoReader):
+    """Typed reader that reads the next chunks ahead on a background thread.
+
+    Used like StoReader in a chunk loop. The first getChunk() call starts the
+    background thread. From then on, the input belongs to the thread: use
+    readLine() only before the first getChunk() call, and do not use
+    readBlock() or readAll().
+
+    The thread reads the file descriptor of the stream directly, so it never
+    holds a lock of the Python stream objects. A script can then exit at any
+    point, even while the thread waits for input.
+
+    prefetch: Number of chunks to read ahead. Default: the TDSTO_PREFETCH
+              environment variable, or 1 (double buffering: the script
+              processes one chunk while the thread reads the next one).
+              With 0, chunks are read on demand like with StoReader.
+    held    : Number of chunks that the script holds at a time, such as the
+              workers of a StoScorePool. The script then calls done() once
+              for every chunk it has finished, in any order, and must not
+              hold more chunks than that. Default: None, for a script that
+              finishes each chunk before it asks for the next one; the
+              previous chunk is then done at every getChunk() call.
+    The size of the chunks read ahead is the nRows of the latest getChunk()
+    call, so a change of the chunk size takes effect after the chunks that
+    have already been read ahead.
+    """
+
+    def __init__(self, schema, stream=None, delimiter=DELIMITER,
+                 prefetch=None, held=None):
+        super().__init__(schema, stream, delimiter)
+        self.prefetch = PREFETCH_CHUNKS if prefetch is None else prefetch
+        self.held = held
+        self._nRowsAhead = None
+        self._chunks = None
+        self._slots = None
+        self._nHeld = 0
+        self._done = False
+
+    def _rawReader(self):
+        """Return the function that reads raw bytes, and the bytes that the
+        stream has already buffered, such as after readLine()."""
+        try:
+            fd = self.stream.fileno()
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            return self.stream.read1, b''
+        # Take over the buffered bytes without another read from the input
+        nBuffered = len(self.stream.peek(1)) if hasattr(self.stream,
+                                                        'peek') else 0
+        return ((lambda nBytes: os.read(fd, nBytes)),
+                self.stream.read(nBuffered) if nBuffered else b'')
+
+    def _readAhead(self, read, pending):
+        """Thread body: Read and parse chunks until the end of the input."""
+        try:
+            pieces = [pending] if pending else []
+            nLines = pending.count(b'\n')
+            eof = False
+            while 1:
+                self._slots.acquire()
+                nRows = self._nRowsAhead
+                while nLines < nRows and not eof:
+                    data = read(_READ_BYTES)
+                    if data:
+                        pieces.append(data)
+                        nLines += data.count(b'\n')
+                    else:
+                        eof = True
+                buf = b''.join(pieces)
+                if nLines >= nRows:
+                    # Split after the line end of the last row of the chunk
+                    ends = np.flatnonzero(np.frombuffer(buf, dtype=np.uint8)
+                                          == ord('\n'))
+                    cut = int(ends[nRows - 1]) + 1
+                    block, buf = buf[:cut], buf[cut:]
+                    nLines -= nRows
+                else:
+                    block, buf = buf, b''
+                    nLines = 0
+                pieces = [buf] if buf else []
+                if not block:
+                    break
+                if not block.endswith(b'\n'):
+                    block += b'\n'
+                df = self.schema.parse(block, self.delimiter)
+                df.attrs['nRowsAsked'] = nRows
+                self._chunks.put(df)
+            self._chunks.put(None)
+        except BaseException as exc:
+            self._chunks.put(exc)
+
+    def getChunk(self, nRows):
+        """Return a DataFrame with up to nRows input rows, read ahead.
+
+        Like StoReader.getChunk(), raises StopIteration at the end of the
+        input. Errors of the background thread are raised here.
+        """
+        if self.prefetch <= 0:
+            return super().getChunk(nRows)
+        if self._done:
+            raise StopIteration
+        self._nRowsAhead = nRows
+        # Without explicit done() calls, the script is done with the previous
+        # chunk: The thread may read the next chunk into its slot.
+        if self.held is None:
+            self.done()
+        if self._chunks is None:
+            self._chunks = queue.Queue()
+            # One slot per chunk held by the script, and one per chunk read
+            # ahead
+            self._slots = threading.Semaphore((self.held or 1)
+                                              + self.prefetch)
+            read, pending = self._rawReader()
+            threading.Thread(target=self._readAhead, args=(read, pending),
+                             name='tdstoIO-prefetch', daemon=True).start()
+        item = self._chunks.get()
+        if item is None or isinstance(item, BaseException):
+            self._done = True
+            if item is None:
+                raise StopIteration
+            raise item
+        self._nHeld += 1
+        self.nRowsRead += item.shape[0]
+        return item
+
+    def done(self):
+        """Mark a chunk of getChunk() as finished, so that the thread may
+        read another chunk ahead in its place."""
+        if self._nHeld:
+            self._nHeld -= 1
+            self._slots.release()
+
+
+def _formatScalar(value, precision):
+    """Return the output string of a single value."""
+    if isinstance(value, (float, np.floating)):
+        value = float(value)
+        if value != value:                  # NaN: NULL value
+            return ''
+        if precision is not None:
+            value = round(value, precision)
+        return repr(value)
+    if isinstance(value, np.integer):
+        return str(int(value))
+    return str(value)
+
+
+def _formatColumn(col, precision):
+    """Return the output strings of a column as a list, or an iterator that
+    repeats the output string of a scalar value for every row."""
+    if np.ndim(col) == 0:
+        return itertools.repeat(_formatScalar(col, precision))
+    col = np.asarray(col)
+    if col.dtype.kind == 'f':
+        if precision is not None:
+            col = np.round(col, precision)
+        strCol = list(map(repr, col.tolist()))
+        isNaN = np.isnan(col)
+        if isNaN.any():                     # NaN: NULL values
+            for i in np.flatnonzero(isNaN).tolist():
+                strCol[i] = ''
+        return strCol
+    return list(map(str, col.tolist()))
+
+
+class StoWriter:
+    """Bulk writer of the script results to the STO standard output.
+
+    The writer writes to the binary standard output, so avoid mixing it with
+    print() to standard output in the same script.
+
+    stream   : Binary output stream. Default: sys.stdout.buffer
+    delimiter: Column delimiter of the output. Default: tab
+    precision: Number of decimals of float output values. Default: the
+               TDSTO_FLOAT_PRECISION environment variable, if set, or else
+               the shortest exact representation of each value.
+    """
+
+    def __init__(self, stream=None, delimiter=DELIMITER,
+                 precision=FLOAT_PRECISION):
+        self.stream = sys.stdout.buffer if stream is None else stream
+        self.delimiter = delimiter
+        self.precision = precision
+        self.nRowsWritten = 0
+
+    def writeColumns(self, *cols):
+        """Write one output row per element of the given columns.
+
+        Each column can be a numpy array, a pandas Series, a list, or a single
+        value that is repeated on every row. All columns are formatted first,
+        and the whole chunk is written to the stream in a single call.
+        Returns the number of rows written.
+        """
+        nRows = max((len(col) for col in cols if np.ndim(col) > 0),
+                    default=1)
+        if nRows == 0:
+            return 0
+        strCols = [_formatColumn(col, self.precision) for col in cols]
+        rows = map(self.delimiter.join, zip(*strCols))
+        text = '\n'.join(itertools.islice(rows, nRows)) + '\n'
+        self.stream.write(text.encode('utf-8'))
+        self.nRowsWritten += nRows
+        return nRows
+
+    def writeRow(self, *values):
+        """Write a single output row with the given values."""
+        return self.writeColumns(*values)
+
+    def flush(self):
+        self.stream.flush()
+
+
+def currentRSS():
+    """Return the current resident memory of the present process in bytes."""
+    try:
+        with open('/proc/self/statm', 'rb') as fIn:
+            return int(fIn.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        # Not on Linux: Fall back to the peak resident memory so far
+        import resource
+        maxRSS = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxRSS if sys.platform == 'darwin' else maxRSS * 1024
+
+
+class StoChunkSizer:
+    """Adaptive number of input rows per chunk.
+
+    memLimit   : Memory limit of the script in bytes, like ScriptMemLimit.
+                 Default: TDSTO_SCRIPT_MEM_LIMIT environment variable, or 1 GB
+    concurrency: Expected number of concurrent STO queries. The memory budget
+                 of the script is memLimit / concurrency.
+                 Default: TDSTO_CONCURRENCY environment variable, or 1
+    minRows    : Smallest chunk size in rows
+    memMinRows : Smallest chunk size in rows that the memory budget can
+                 impose, the fixed chunk size of the scripts before the sizer.
+                 When the resident memory exceeds the budget, a warning is
+                 written once to standard error, and the chunks keep this size
+    maxRows    : Largest chunk size in rows
+    targetSecs : Time per chunk below which the chunk size may grow
+    memFraction: Fraction of the memory budget that the script may occupy
+    workFactor : Working memory of a chunk, as a multiple of the memory of its
+                 input DataFrame (parsing, model intermediates, output)
+    heldChunks : Number of chunks in memory at a time, such as the chunks
+                 scored by a StoScorePool plus the chunks read ahead by a
+                 StoPrefetchReader. Each one counts with its working memory.
+
+    Usage in a chunk loop:
+        sizer = tdstoIO.StoChunkSizer()
+        while 1:
+            tChunk = sizer.start()
+            df = reader.getChunk(sizer.nRows)
+            ... score and write df ...
+            sizer.update(df, tChunk)
+    When several chunks are in progress at a time, measure the time spent on
+    every chunk and pass it as secs instead.
+    """
+
+    def __init__(self, memLimit=None, concurrency=None, minRows=100,
+                 maxRows=1000000, initRows=1000, targetSecs=0.5,
+                 memFraction=0.75, workFactor=4.0, heldChunks=1,
+                 memMinRows=500):
+        if memLimit is None:
+            memLimit = int(os.environ.get('TDSTO_SCRIPT_MEM_LIMIT', 1 << 30))
+        if concurrency is None:
+            concurrency = int(os.environ.get('TDSTO_CONCURRENCY', 1))
+        self.memBudget = memLimit / max(1, concurrency)
+        self.minRows = minRows
+        self.memMinRows = memMinRows
+        self.maxRows = maxRows
+        self.targetSecs = targetSecs
+        self.memFraction = memFraction
+        self.workFactor = workFactor
+        self.heldChunks = max(1, heldChunks)
+        self.bytesPerRow = None
+        self.tStart = None
+        self.warned = False
+        self.nRows = self._clamp(initRows, self._memRows(currentRSS()))
+
+    def _memRows(self, rss):
+        """Return the most rows per chunk that fit in the remaining memory
+        budget, with heldChunks chunks in memory, but at least memMinRows."""
+        freeBytes = self.memBudget * self.memFraction - rss
+        if self.bytesPerRow is None:
+            # No chunk measured yet: Assume about 1 KB of work per row
+            bytesPerRow = 1024 * self.workFactor
+        else:
+            bytesPerRow = self.bytesPerRow * self.workFactor
+        memRows = int(freeBytes // (bytesPerRow * self.heldChunks))
+        if memRows < self.memMinRows:
+            self._warnBudget(rss)
+            memRows = self.memMinRows
+        return memRows
+
+    def _warnBudget(self, rss):
+        """Warn once that the memory budget is spent."""
+        if self.warned:
+            return
+        self.warned = True
+        print("tdstoIO: Memory budget of %.0f MB (memory limit / concurrency)"
+              " is spent at %.0f MB resident; reading chunks of %d rows"
+              % (self.memBudget * self.memFraction / 1048576.0,
+                 rss / 1048576.0, self.memMinRows), file=sys.stderr)
+
+    def _clamp(self, nRows, memRows):
+        return max(self.minRows, min(self.maxRows, nRows, memRows))
+
+    def start(self):
+        """Mark the start of the processing of a chunk, and return the start
+        time to pass to update() with the chunk."""
+        self.tStart = time.perf_counter()
+        return self.tStart
+
+    def update(self, df, tStart=None, secs=None):
+        """Adjust the chunk size after a chunk has been processed.
+
+        df    : Input DataFrame of the chunk
+        tStart: Start time of the chunk from start(). Default: the time of
+                the latest start() call
+        secs  : Time spent on the chunk, instead of the time since tStart
+        Returns the new chunk size.
+        """
+        nRowsDone = df.shape[0]
+        if secs is None:
+            tStart = self.tStart if tStart is None else tStart
+            if tStart is None:
+                return self.nRows
+            secs = time.perf_counter() - tStart
+        self.tStart = None
+        if nRowsDone == 0:
+            return self.nRows
+        self.bytesPerRow = max(1.0, df.memory_usage(index=True).sum()
+                                    / nRowsDone)
+        rss = currentRSS()
+        memTrace.chunk(nRowsDone, rss)
+        memRows = self._memRows(rss)
+        nRows = self.nRows
+        if rss > self.memBudget * self.memFraction:
+            # Above the memory ceiling: shrink
+            nRows = max(nRows // 2, min(nRows, self.memMinRows))
+        elif nRowsDone < df.attrs.get('nRowsAsked', self.nRows):
+            pass                         # Partial last chunk: no information
+        elif secs < self.targetSecs:
+            nRows *= 2                   # Fast chunk with memory room: grow
+        elif secs > 4 * self.targetSecs:
+            nRows //= 2                  # Slow chunk: shrink
+        self.nRows = self._clamp(nRows, memRows)
+        return self.nRows
+
+
+def _nodeCores():
+    """Return the number of cores that the present process may use."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def scoreWorkers(setting=None, ampsPerNode=None, concurrency=None):
+    """Return the number of chunks that a script instance scores at a time.
+
+    setting    : Number of chunks, or "auto". Default: TDSTO_SCORE_WORKERS
+                 environment variable, or 1 (no pool)
+    ampsPerNode: Number of AMPs on the node. Default: TDSTO_AMPS_PER_NODE
+                 environment variable, or 1
+    concurrency: Expected number of concurrent STO queries, for "auto".
+                 Default: TDSTO_CONCURRENCY environment variable, or 1
+    """
+    if setting is None:
+        setting = os.environ.get('TDSTO_SCORE_WORKERS') or '1'
+    if ampsPerNode is None:
+        ampsPerNode = int(os.environ.get('TDSTO_AMPS_PER_NODE', 1))
+    if concurrency is None:
+        concurrency = int(os.environ.get('TDSTO_CONCURRENCY', 1))
+    coresPerAmp = max(1, _nodeCores() // max(1, ampsPerNode))
+    if str(setting).lower() == 'auto':
+        return max(1, coresPerAmp // max(1, concurrency))
+    return max(1, min(int(setting), coresPerAmp))
+
+
+class StoScorePool:
+    """Pool that scores chunks concurrently, with results in input order.
+
+    score  : Function of a chunk that returns its scores. With processes, a
+             function defined at the top level of the script or of a module,
+             that uses the model loaded before the pool is created.
+    workers: Number of chunks to score at a time. Default: scoreWorkers()
+    kind   : "thread" or "process". Default: TDSTO_SCORE_POOL environment
+             variable, or "thread"
+
+    Create the pool after the model is loaded, and before the first chunk is
+    read. Processes are then forked with the model, and before any reader
+    thread starts. With 1 worker, the chunks are scored in the calling thread.
+
+    Usage in a chunk loop, with a generator of the input chunks:
+        pool = tdstoIO.StoScorePool(scoreChunk)
+        reader = tdstoIO.StoPrefetchReader(schema, held=pool.workers)
+        try:
+            for df, scores in pool.map(chunks()):
+                ... write the scores of df ...
+                reader.done()
+        finally:
+            pool.close()
+    """
+
+    def __init__(self, score, workers=None, kind=None):
+        self.score = score
+        self.workers = scoreWorkers() if workers is None else workers
+        self.kind = kind or os.environ.get('TDSTO_SCORE_POOL', 'thread')
+        if self.kind not in ('thread', 'process'):
+            raise ValueError("Unknown score pool kind: " + str(self.kind))
+        self._executor = None
+        if self.workers > 1:
+            import concurrent.futures
+            if self.kind == 'process':
+                import multiprocessing
+                self._executor = concurrent.futures.ProcessPoolExecutor(
+                    self.workers, mp_context=multiprocessing.get_context(
+                        'fork'))
+                # Fork all processes now, while the script has a single thread
+                self._executor.submit(int).result()
+            else:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    self.workers, thread_name_prefix='tdstoIO-score')
+
+    def map(self, chunks):
+        """Yield (chunk, scores) for every chunk of the iterable chunks, in
+        order. Up to workers chunks are scored while the caller processes the
+        scores of an earlier chunk and the next chunk is read."""
+        if self._executor is None:
+            for chunk in chunks:
+                yield chunk, self.score(chunk)
+            return
+        pending = collections.deque()
+        try:
+            for chunk in chunks:
+                pending.append((chunk, self._executor.submit(self.score,
+                                                             chunk)))
+                if len(pending) >= self.workers:
+                    chunk, future = pending.popleft()
+                    yield chunk, future.result()
+            while pending:
+                chunk, future = pending.popleft()
+                yield chunk, future.result()
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    def close(self):
+        """Stop the workers. Chunks not started yet are not scored, and the
+        chunks being scored are finished first."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+def peakRSS():
+    """Return the peak resident memory of the present process in bytes."""
+    import resource
+    maxRSS = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxRSS if sys.platform == 'darwin' else maxRSS * 1024
+
+
+class StoMemTrace:
+    """Record of the resident memory of the script at its stages.
+
+    enabled: Record and report. Default: TDSTO_MEM_TRACE environment variable
+    When not enabled, the methods return at once.
+    """
+
+    def __init__(self, enabled=MEM_TRACE):
+        self.enabled = enabled
+        self.stages = {}          # Resident memory in bytes by stage name
+        self.baseRSS = None       # Memory before the first input rows
+        self.nChunks = 0
+        self.nRows = 0
+        self.maxChunkRows = 0
+        self.reported = False
+
+    def mark(self, stage):
+        """Record the resident memory at a named stage of the script."""
+        if self.enabled:
+            self.stages[stage] = currentRSS()
+
+    def chunk(self, nRows, rss, stage='chunks'):
+        """Record a chunk of nRows input rows after its processing, and the
+        resident memory rss at that point."""
+        if not self.enabled:
+            return
+        if self.baseRSS is None:
+            self.baseRSS = max(self.stages.values(), default=rss)
+        self.nChunks += 1
+        self.nRows += nRows
+        self.maxChunkRows = max(self.maxChunkRows, nRows)
+        self.stages[stage] = max(self.stages.get(stage, 0), rss)
+
+    def summary(self):
+        """Return the summary of the record as a dict."""
+        def mb(nBytes):
+            return round(nBytes / 1048576.0, 1)
+        peak = max([peakRSS()] + list(self.stages.values()))
+        base = self.baseRSS if self.baseRSS is not None else peak
+        summary = {'script': os.path.basename(sys.argv[0]),
+                   'args': sys.argv[1:], 'pid': os.getpid(),
+                   'stagesMB': {stage: mb(rss)
+                                for stage, rss in self.stages.items()},
+                   'peakMB': mb(peak), 'baseMB': mb(base),
+                   'chunks': self.nChunks, 'rows': self.nRows,
+                   'maxChunkRows': self.maxChunkRows,
+                   'bytesPerRow': (round((peak - base) / self.maxChunkRows)
+                                   if self.maxChunkRows else None)}
+        if 'model' in self.stages and 'imports' in self.stages:
+            summary['modelMB'] = mb(self.stages['model']
+                                    - self.stages['imports'])
+        return summary
+
+    def report(self, stream=None):
+        """Write the summary line to standard error, once."""
+        if not self.enabled or self.reported:
+            return
+        self.reported = True
+        self.mark('exit')
+        stream = sys.stderr if stream is None else stream
+        try:
+            stream.write('tdstoMem ' + json.dumps(self.summary()) + '\n')
+            stream.flush()
+        except (OSError, ValueError):
+            pass                         # Standard error already closed
+
+
+# Memory trace of the present script
+memTrace = StoMemTrace()
+memTrace.mark('imports')
+if memTrace.enabled:
+    atexit.register(memTrace.report)
+
+
+def memMark(stage):
+    """Record the resident memory at a named stage of the script, such as
+    "model" after the model is loaded. No effect unless TDSTO_MEM_TRACE is
+    set."""
+    memTrace.mark(stage)
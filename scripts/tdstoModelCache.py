@@ -0,0 +1,239 @@
+################################################################################
+# The contents of this file are Teradata Public Content
+# and have been released to the Public Domain.
+# Licensed under BSD; see "license.txt" file for more information.
+# Copyright (c) 2023 by Teradata
+################################################################################
+#
+# R And Python Analytics with SCRIPT Table Operator
+# Orange Book supplementary material
+# Alexander Kolovos - October 2026 - v.2.6
+#
+# Shared module: Node-level cache of decoded model objects
+# File     : tdstoModelCache.py
+#
+# Helper module imported by the Python scripts of the examples. It is not a
+# stand-alone script. Install it in the database next to the scripts that
+# use it, for example:
+#   CALL SYSUIF.INSTALL_FILE('tdstoModelCache','tdstoModelCache.py','cz!/root/stoTests/tdstoModelCache.py');
+#
+# Every SCRIPT instance (one per AMP and per query) that loads an installed
+# model file would otherwise read it, base64-decode it and unpickle it from
+# scratch. With the present module, the first instance on a node decodes the
+# model once and stores the decoded object in a local cache directory. The
+# following instances on the node attach to the cached copy instead:
+# - Cache entries are keyed by a hash of the installed model file contents.
+#   When the installed file changes, its key changes too, and the entries of
+#   the earlier file versions are removed.
+# - Entries are saved with joblib so that the numpy arrays in the model are
+#   memory-mapped read-only when loaded. Concurrent instances then share the
+#   same pages of the node file system cache instead of holding one private
+#   copy each. Objects that copy their arrays while being unpickled (such as
+#   the scikit-learn tree structures) still save the base64/pickle decoding.
+# - The least recently used entries are evicted when the cache holds more
+#   than a maximum number of models or bytes.
+# - Entries are written to a temporary file and then renamed, so concurrent
+#   instances never see a partial entry. An instance that misses the cache
+#   holds a lock on a per-model lock file while it decodes and saves the
+#   model, so that the instances that start at the same time wait for the
+#   entry instead of decoding the model as well.
+# - Cached entries are unpickled, so the cache directory must be private: It
+#   is created with mode 0700, and it is used only if it is owned by the
+#   present user and has mode 0700. If the cache directory cannot be used,
+#   the model is decoded in-process as before.
+#
+# Settings (environment variables):
+# - TDSTO_MODEL_CACHE         : Cache directory. Specify "off" to disable the
+#                               cache. Default: <tmpdir>/tdstoModelCache-<uid>
+# - TDSTO_MODEL_CACHE_ENTRIES : Maximum number of cached models (default: 8)
+# - TDSTO_MODEL_CACHE_MB      : Maximum total size of the cache in MB
+#                               (default: 2048)
+#
+# Requires the pickle, base64, hashlib, and fcntl packages. Uses the joblib
+# package, if present, to memory-map the cached models.
+#
+################################################################################
+
+import base64
+import fcntl
+import hashlib
+import os
+import pickle
+import stat
+import tempfile
+
+try:
+    import joblib
+except ImportError:     # Cache still works, but without memory-mapping
+    joblib = None
+
+CACHE_DIR = os.environ.get('TDSTO_MODEL_CACHE',
+                           os.path.join(tempfile.gettempdir(),
+                                        'tdstoModelCache-%d' % os.geteuid()))
+MAX_ENTRIES = int(os.environ.get('TDSTO_MODEL_CACHE_ENTRIES', 8))
+MAX_BYTES = int(os.environ.get('TDSTO_MODEL_CACHE_MB', 2048)) << 20
+
+_ENTRY_EXT = '.model'
+_SOURCE_EXT = '.src'
+_LOCK_EXT = '.lock'
+
+
+def decodeB64Pickle(raw):
+    """Decode a model file in the pickled + base64-encoded format."""
+    return pickle.loads(base64.b64decode(raw))
+
+
+def _dumpEntry(model, fileName):
+    if joblib is not None:
+        joblib.dump(model, fileName)
+    else:
+        with open(fileName, 'wb') as fOut:
+            pickle.dump(model, fOut, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _loadEntry(fileName):
+    if joblib is not None:
+        return joblib.load(fileName, mmap_mode='r')
+    with open(fileName, 'rb') as fIn:
+        return pickle.load(fIn)
+
+
+def _privateDir(cacheDir):
+    """Create the cache directory if missing, and return True if it is owned
+    by the present user with mode 0700."""
+    try:
+        os.makedirs(cacheDir, 0o700, exist_ok=True)
+        st = os.stat(cacheDir)
+    except OSError:
+        return False
+    return (stat.S_ISDIR(st.st_mode) and st.st_uid == os.geteuid()
+            and stat.S_IMODE(st.st_mode) == 0o700)
+
+
+def _writeAtomic(fileName, write, obj):
+    """Write obj with write(obj, tmpFile) into a new temporary file next to
+    fileName, and rename the result to fileName."""
+    fd, tmpFile = tempfile.mkstemp(dir=os.path.dirname(fileName),
+                                   suffix='.tmp')
+    os.close(fd)
+    try:
+        write(obj, tmpFile)
+        os.replace(tmpFile, fileName)
+    except BaseException:
+        _removeQuietly(tmpFile)
+        raise
+
+
+def _writeText(text, fileName):
+    with open(fileName, 'w') as fOut:
+        fOut.write(text)
+
+
+def _tryLoadEntry(entryFile):
+    """Return the cached model and mark it as recently used, or None."""
+    try:
+        model = _loadEntry(entryFile)
+    except Exception:    # Missing, partially removed, or unreadable entry
+        return None
+    try:
+        os.utime(entryFile)
+    except OSError:
+        pass
+    return model
+
+
+def _removeQuietly(fileName):
+    try:
+        os.remove(fileName)
+    except OSError:
+        pass
+
+
+def _dropStaleVersions(cacheDir, sourcePath, key):
+    """Remove the entries of earlier versions of the same source file."""
+    for name in os.listdir(cacheDir):
+        if not name.endswith(_SOURCE_EXT) or name.startswith(key):
+            continue
+        srcFile = os.path.join(cacheDir, name)
+        try:
+            with open(srcFile) as fIn:
+                isSame = fIn.read() == sourcePath
+        except OSError:
+            continue
+        if isSame:
+            _removeQuietly(srcFile[:-len(_SOURCE_EXT)] + _ENTRY_EXT)
+            _removeQuietly(srcFile[:-len(_SOURCE_EXT)] + _LOCK_EXT)
+            _removeQuietly(srcFile)
+
+
+def evict(cacheDir=None, maxEntries=None, maxBytes=None):
+    """Remove the least recently used entries beyond the cache limits."""
+    cacheDir = CACHE_DIR if cacheDir is None else cacheDir
+    maxEntries = MAX_ENTRIES if maxEntries is None else maxEntries
+    maxBytes = MAX_BYTES if maxBytes is None else maxBytes
+    entries = []
+    for name in os.listdir(cacheDir):
+        if name.endswith(_ENTRY_EXT):
+            fileName = os.path.join(cacheDir, name)
+            try:
+                st = os.stat(fileName)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, fileName))
+    entries.sort(reverse=True)              # Most recently used first
+    totBytes = 0
+    for i, (mtime, size, fileName) in enumerate(entries):
+        totBytes += size
+        if i >= maxEntries or totBytes > maxBytes:
+            _removeQuietly(fileName)
+            _removeQuietly(fileName[:-len(_ENTRY_EXT)] + _SOURCE_EXT)
+            _removeQuietly(fileName[:-len(_ENTRY_EXT)] + _LOCK_EXT)
+
+
+def loadModel(path, decode=decodeB64Pickle, cacheDir=None):
+    """Return the decoded model of an installed model file.
+
+    path  : Path of the installed model file, such as 'myDB/ex1pMod.out'
+    decode: Function that turns the raw file contents into the model object.
+            Default: base64-decode and unpickle.
+    """
+    cacheDir = CACHE_DIR if cacheDir is None else cacheDir
+    with open(path, 'rb') as fIn:
+        raw = fIn.read()
+    if cacheDir == 'off' or not _privateDir(cacheDir):
+        return decode(raw)   # Cache disabled, or not safe to unpickle from
+
+    key = hashlib.sha256(raw).hexdigest()[:32]
+    entryFile = os.path.join(cacheDir, key + _ENTRY_EXT)
+
+    # Cache hit: Attach to the cached entry
+    model = _tryLoadEntry(entryFile)
+    if model is not None:
+        return model
+
+    # Cache miss: Decode the model and add it to the cache. The lock makes
+    # concurrent instances wait for the first one, and then attach to its
+    # entry.
+    try:
+        lockFd = os.open(os.path.join(cacheDir, key + _LOCK_EXT),
+                         os.O_RDWR | os.O_CREAT, 0o600)
+    except OSError:
+        return decode(raw)
+    try:
+        fcntl.flock(lockFd, fcntl.LOCK_EX)
+        model = _tryLoadEntry(entryFile)
+        if model is not None:
+            return model
+        model = decode(raw)
+        try:
+            _writeAtomic(entryFile, _dumpEntry, model)
+            sourcePath = os.path.realpath(path)
+            _writeAtomic(entryFile[:-len(_ENTRY_EXT)] + _SOURCE_EXT,
+                         _writeText, sourcePath)
+            _dropStaleVersions(cacheDir, sourcePath, key)
+            evict(cacheDir)
+        except Exception:
+            pass         # Cache not usable: Use the in-process copy
+        return model
+    finally:
+        os.close(lockFd)    # Also releases the lock
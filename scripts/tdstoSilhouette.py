@@ -0,0 +1,183 @@
+################################################################################
+# The contents of this file are Teradata Public Content
+# and have been released to the Public Domain.
+# Licensed under BSD; see "license.txt" file for more information.
+# Copyright (c) 2023 by Teradata
+################################################################################
+#
+# R And Python Analytics with SCRIPT Table Operator
+# Orange Book supplementary material
+# Alexander Kolovos - October 2026 - v.2.6
+#
+# Shared module: Bounded-memory silhouette coefficients
+# File     : tdstoSilhouette.py
+#
+# Helper module imported by the Python scripts of the examples. It is not a
+# stand-alone script. Install it in the database next to the scripts that
+# use it, for example:
+#   CALL SYSUIF.INSTALL_FILE('tdstoSilhouette','tdstoSilhouette.py','cz!/root/stoTests/tdstoSilhouette.py');
+#
+# The silhouette coefficient of an observation i is s(i) = (b - a) / max(a, b),
+# where a is the mean distance of i to the other members of its cluster, and
+# b is the smallest mean distance of i to the members of another cluster.
+# Observations in single-member clusters get s(i) = 0. The silhouette score of
+# a clustering is the mean of s(i) over all observations.
+#
+# The coefficients are computed exactly, but for a block of observations at a
+# time. The distances of a block to all observations fill a buffer of at most
+# a fixed number of bytes, and are summed per cluster right away. The memory
+# use is then the buffer plus a few arrays of the size of the data set, in
+# place of the full matrix of pairwise distances. The score is the mean of
+# the coefficients, so the distances are computed only once.
+#
+# In the optional sampled mode, the coefficients are computed only for a
+# random sample of observations, each one against all observations. The score
+# is estimated by the sample mean, and its error bound is the half-width of
+# the 95% confidence interval of the estimate. The time drops from order n^2
+# to order (sample size * n).
+#
+# For data that do not fit in memory, referenceSamples() estimates the
+# coefficients of any observations against a reference sample of the data,
+# such as a reservoir sample kept while streaming the data.
+#
+# Settings (environment variables):
+# - TDSTO_SILHOUETTE_MB : Size of the distances buffer in MB (default: 64)
+#
+# Requires the numpy add-on package.
+#
+################################################################################
+
+import os
+import numpy as np
+
+BUFFER_MB = int(os.environ.get('TDSTO_SILHOUETTE_MB', 64))
+
+
+class _Reference:
+    """Reference observations ordered by cluster, so that the distances to
+    the members of each cluster are contiguous and can be summed with
+    reduceat()."""
+
+    def __init__(self, X, labels):
+        self.clusters, clusterOf, self.counts = np.unique(
+            labels, return_inverse=True, return_counts=True)
+        self.clusterOf = clusterOf.ravel()
+        order = np.argsort(self.clusterOf, kind='stable')
+        self.position = np.empty(X.shape[0], dtype=np.intp)
+        self.position[order] = np.arange(X.shape[0])
+        self.starts = np.concatenate(([0], np.cumsum(self.counts)[:-1]))
+        self.X = X[order]
+        self.sqNorms = np.einsum('ij,ij->i', self.X, self.X)
+
+
+def _coefficients(ref, Xq, own, selfPos, bufferMB):
+    """Silhouette coefficients of the query observations Xq with cluster
+    indices own against the reference. selfPos is the sorted position of
+    each query observation in the reference, or None if they are not part of
+    the reference."""
+    nRef = ref.X.shape[0]
+    blockRows = max(1, (bufferMB << 20) // (8 * nRef))
+    sqNormsQ = np.einsum('ij,ij->i', Xq, Xq)
+    coeffs = np.empty(Xq.shape[0])
+    for start in range(0, Xq.shape[0], blockRows):
+        stop = min(start + blockRows, Xq.shape[0])
+        nBlock = stop - start
+        # Squared distances |x|^2 - 2 x.y + |y|^2, then distances, in place
+        dist = np.dot(Xq[start:stop], ref.X.T)
+        dist *= -2
+        dist += sqNormsQ[start:stop, None]
+        dist += ref.sqNorms[None, :]
+        np.maximum(dist, 0, out=dist)
+        if selfPos is not None:
+            dist[np.arange(nBlock), selfPos[start:stop]] = 0
+        np.sqrt(dist, out=dist)
+        sums = np.add.reduceat(dist, ref.starts, axis=1)
+        del dist
+
+        blockOwn = own[start:stop]
+        ownCount = ref.counts[blockOwn]
+        # Without self in the reference, all own members are other members
+        nOthers = ownCount - 1 if selfPos is not None else ownCount
+        a = sums[np.arange(nBlock), blockOwn] / np.maximum(nOthers, 1)
+        means = sums / ref.counts
+        means[np.arange(nBlock), blockOwn] = np.inf
+        b = means.min(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            s = (b - a) / np.maximum(a, b)
+        s[nOthers < 1] = 0.0
+        coeffs[start:stop] = np.nan_to_num(s)
+    return coeffs
+
+
+def _checkLabels(nClusters, nObs):
+    if not 2 <= nClusters <= nObs - 1:
+        raise ValueError("Number of labels is %d. Valid values are 2 to "
+                         "n_samples - 1 (inclusive)" % nClusters)
+
+
+def silhouetteSamples(X, labels, rows=None, bufferMB=None):
+    """Return the silhouette coefficients of the observations in rows.
+
+    X     : Array of observations, shape (nObs, nFeatures)
+    labels: Cluster label of every observation
+    rows  : Indices of the observations to compute the coefficients of.
+            Default: all observations
+    The distances are Euclidean and are computed like in scikit-learn.
+    """
+    bufferMB = BUFFER_MB if bufferMB is None else bufferMB
+    X = np.asarray(X, dtype=np.float64)
+    ref = _Reference(X, np.asarray(labels))
+    _checkLabels(ref.clusters.shape[0], X.shape[0])
+    rows = np.arange(X.shape[0]) if rows is None else np.asarray(rows)
+    return _coefficients(ref, X[rows], ref.clusterOf[rows],
+                         ref.position[rows], bufferMB)
+
+
+def referenceSamples(X, labels, refX, refLabels, bufferMB=None):
+    """Return estimated silhouette coefficients of observations against a
+    reference sample of observations, such as a random sample of the data.
+
+    The mean distances of each observation to the clusters are estimated by
+    its mean distances to the reference observations of the clusters. The
+    observations should not be part of the reference sample. Observations of
+    clusters without reference observations get the coefficient 0.
+    """
+    bufferMB = BUFFER_MB if bufferMB is None else bufferMB
+    ref = _Reference(np.asarray(refX, dtype=np.float64),
+                     np.asarray(refLabels))
+    labels = np.asarray(labels)
+    own = np.searchsorted(ref.clusters, labels)
+    own = np.minimum(own, ref.clusters.shape[0] - 1)
+    coeffs = _coefficients(ref, np.asarray(X, dtype=np.float64), own, None,
+                           bufferMB)
+    coeffs[ref.clusters[own] != labels] = 0.0
+    return coeffs
+
+
+def silhouetteScore(X, labels, bufferMB=None):
+    """Return the exact silhouette coefficients and their mean."""
+    coeffs = silhouetteSamples(X, labels, bufferMB=bufferMB)
+    return coeffs, coeffs.mean()
+
+
+def sampledSilhouette(X, labels, sampleSize, seed=None, bufferMB=None):
+    """Estimate the silhouette score from a random sample of observations.
+
+    Returns the sampled rows, their exact coefficients, the estimated score,
+    and the half-width of the 95% confidence interval of the estimate. If
+    sampleSize is not smaller than the number of observations, then all
+    coefficients are computed and the error bound is 0.
+    """
+    nObs = np.shape(X)[0]
+    if sampleSize < 2:
+        raise ValueError("The silhouette sample size must be at least 2")
+    if sampleSize >= nObs:
+        coeffs, score = silhouetteScore(X, labels, bufferMB)
+        return np.arange(nObs), coeffs, score, 0.0
+    rng = np.random.default_rng(seed)
+    rows = np.sort(rng.choice(nObs, size=sampleSize, replace=False))
+    coeffs = silhouetteSamples(X, labels, rows, bufferMB)
+    # Standard error of the mean with the finite population correction
+    stdErr = (coeffs.std(ddof=1) / np.sqrt(sampleSize)
+              * np.sqrt((nObs - sampleSize) / (nObs - 1)))
+    return rows, coeffs, coeffs.mean(), 1.96 * stdErr
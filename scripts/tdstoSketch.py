@@ -0,0 +1,319 @@
+################################################################################
+# The contents of this file are Teradata Public Content
+# and have been released to the Public Domain.
+# Licensed under BSD; see "license.txt" file for more information.
+# Copyright (c) 2023 by Teradata
+################################################################################
+#
+# R And Python Analytics with SCRIPT Table Operator
+# Orange Book supplementary material
+# Alexander Kolovos - October 2026 - v.2.6
+#
+# Shared module: Mergeable summary sketches
+# File     : tdstoSketch.py
+#
+# Helper module imported by the Python scripts of the examples. It is not a
+# stand-alone script. Install it in the database next to the scripts that
+# use it, for example:
+#   CALL SYSUIF.INSTALL_FILE('tdstoSketch','tdstoSketch.py','cz!/root/stoTests/tdstoSketch.py');
+#
+# In a two-stage query, the "map" step summarizes the rows of every AMP, and
+# the "reduce" step combines the summaries. A mean and a count combine into a
+# global mean, but a median, percentiles, or a number of distinct values do
+# not. The sketches of the present module are summaries of fixed size that
+# combine exactly like the data they summarize would:
+# - Moments      : Count, mean, sum of squared deviations (M2), min, and max,
+#                  updated in chunks and merged with the formulas of Welford
+#                  and Chan et al. The variance is M2 / (count - 1).
+# - QuantileSketch: KLL quantile sketch. The values are kept in levels of
+#                  compactors, where a value on level h stands for 2^h input
+#                  values. A full level is sorted, and every other value moves
+#                  up one level. With the default k = 200, the rank of a
+#                  quantile is off by about 1.7% of the count at most, for
+#                  99% of the queries. Up to k values are kept exactly.
+# - HyperLogLog  : Estimate of the number of distinct values, from the longest
+#                  runs of leading zero bits of their 64-bit hashes in 2^p
+#                  registers. With the default p = 12, the standard error is
+#                  about 1.6%. Small counts are estimated by linear counting.
+# Merging 2 sketches gives the same accuracy as a single sketch of all values.
+#
+# Sketch combines the 3 sketches for one column of values, and encodes them in
+# a single line of text with fields separated by "|":
+#   tdstoSketch1|n|mean|m2|min|max|k|levelSizes|levelValues|p|registers
+# where levelValues and registers are base64-encoded bytes. The text has no
+# tab or newline characters, and its size does not depend on the number of
+# rows: it takes at most about 11 KB with the defaults.
+#
+# The quantile sketch picks the values to keep at random. To reproduce the same
+# sketches in repeated runs, specify a seed with the environment variable
+# TDSTO_RANDOM_SEED.
+#
+# Requires the numpy add-on package.
+#
+################################################################################
+
+import base64
+import os
+import zlib
+import numpy as np
+
+MAGIC = 'tdstoSketch1'
+
+_seed = os.environ.get('TDSTO_RANDOM_SEED')
+_rng = np.random.default_rng(None if _seed is None else int(_seed))
+
+
+class Moments:
+    """Count, mean, sum of squared deviations, min, and max of values."""
+
+    def __init__(self, n=0, mean=0., m2=0., vmin=np.inf, vmax=-np.inf):
+        self.n = int(n)
+        self.mean = float(mean)
+        self.m2 = float(m2)
+        self.min = float(vmin)
+        self.max = float(vmax)
+
+    def update(self, values):
+        """Add an array of values."""
+        values = np.asarray(values, dtype=np.float64)
+        if values.size:
+            mean = values.mean()
+            self.merge(Moments(values.size, mean,
+                               np.sum((values - mean) ** 2),
+                               values.min(), values.max()))
+
+    def merge(self, other):
+        """Add the values summarized by another Moments."""
+        n = self.n + other.n
+        if other.n == 0:
+            return
+        delta = other.mean - self.mean
+        self.mean += delta * other.n / n
+        self.m2 += other.m2 + delta * delta * self.n * other.n / n
+        self.n = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def variance(self):
+        """Sample variance of the values, or NaN for fewer than 2 values."""
+        return self.m2 / (self.n - 1) if self.n > 1 else np.nan
+
+
+class QuantileSketch:
+    """KLL sketch of the distribution of values."""
+
+    def __init__(self, k=200):
+        self.k = int(k)
+        self.n = 0
+        self.levels = [np.empty(0)]
+
+    def _capacity(self, level):
+        depth = len(self.levels) - 1 - level
+        return max(2, int(np.ceil(self.k * (2. / 3.) ** depth)))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if items.size <= self._capacity(level):
+                level += 1
+                continue
+            if level == len(self.levels) - 1:
+                self.levels.append(np.empty(0))
+            items = np.sort(items)
+            # Compact an even number of values, and keep one if odd
+            keep = items[:items.size % 2]
+            pairs = items[items.size % 2:]
+            offset = int(_rng.integers(2))
+            self.levels[level + 1] = np.concatenate(
+                (self.levels[level + 1], pairs[offset::2]))
+            self.levels[level] = keep
+            # Lower levels may exceed their capacity in a deeper sketch
+            level = 0
+
+    def update(self, values):
+        """Add an array of values."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        self.levels[0] = np.concatenate((self.levels[0], values))
+        self.n += values.size
+        self._compress()
+
+    def merge(self, other):
+        """Add the values summarized by another QuantileSketch."""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate((self.levels[level], items))
+        self.n += other.n
+        self._compress()
+
+    def quantiles(self, probs):
+        """Return the estimated quantiles of the values for probabilities.
+
+        The quantile for probability q is the smallest kept value whose
+        estimated rank is at least q times the count, like the 'inverted_cdf'
+        method of numpy.quantile(). Returns NaN values if there are none.
+        """
+        probs = np.asarray(probs, dtype=np.float64)
+        if self.n == 0:
+            return np.full(probs.shape, np.nan)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(levelItems.size, 2. ** level)
+                                  for level, levelItems
+                                  in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        cumWeights = np.cumsum(weights[order])
+        idx = np.searchsorted(cumWeights, probs * cumWeights[-1], side='left')
+        return items[order][np.minimum(idx, items.size - 1)]
+
+
+def _hash64(values):
+    """64-bit hashes of integer or float values (splitmix64 finalizer). The
+    hashes are the same in every process, unlike the Python hash() of str."""
+    values = np.asarray(values)
+    if values.dtype.kind in 'iub':
+        bits = values.astype(np.int64).view(np.uint64)
+    else:
+        values = values.astype(np.float64) + 0.    # Hash -0.0 like 0.0
+        bits = values.view(np.uint64)
+    with np.errstate(over='ignore'):
+        z = bits + np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def _bitLength(x):
+    """Number of significant bits of each unsigned value below 2^53. Such
+    values convert to float exactly, and the float exponent is the count."""
+    return np.frexp(x.astype(np.float64))[1].astype(np.uint8)
+
+
+class HyperLogLog:
+    """HyperLogLog estimate of the number of distinct values."""
+
+    def __init__(self, p=12):
+        if not 11 <= p <= 16:
+            raise ValueError("tdstoSketch: HyperLogLog p must be 11 to 16")
+        self.p = int(p)
+        self.registers = np.zeros(1 << self.p, dtype=np.uint8)
+
+    def update(self, values):
+        """Add an array of integer or float values. NaN values are ignored."""
+        values = np.asarray(values).ravel()
+        if values.dtype.kind == 'f':
+            values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+        hashes = _hash64(values)
+        p = np.uint64(self.p)
+        index = (hashes >> (np.uint64(64) - p)).astype(np.intp)
+        rest = hashes & ((np.uint64(1) << (np.uint64(64) - p)) - np.uint64(1))
+        # Position of the first 1 bit in the remaining 64 - p bits
+        rank = (64 - self.p + 1) - _bitLength(rest)
+        # Assign in order of rank, so that the largest rank of every register
+        # is assigned last
+        order = np.argsort(rank, kind='stable')
+        newRegisters = np.zeros_like(self.registers)
+        newRegisters[index[order]] = rank[order]
+        np.maximum(self.registers, newRegisters, out=self.registers)
+
+    def merge(self, other):
+        """Add the values summarized by another HyperLogLog."""
+        if other.p != self.p:
+            raise ValueError("tdstoSketch: Cannot merge HyperLogLog "
+                             "sketches of different p")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def count(self):
+        """Return the estimated number of distinct values."""
+        m = self.registers.size
+        alpha = 0.7213 / (1. + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1., -self.registers.astype(
+            np.int64)))
+        nZeros = np.count_nonzero(self.registers == 0)
+        if estimate <= 2.5 * m and nZeros > 0:
+            estimate = m * np.log(m / nZeros)     # Linear counting
+        return estimate
+
+
+def _encodeBytes(data):
+    return base64.b64encode(zlib.compress(data)).decode('ascii')
+
+
+def _decodeBytes(text):
+    return zlib.decompress(base64.b64decode(text))
+
+
+class Sketch:
+    """Moments, quantile, and distinct count sketches of a column of values.
+
+    The distinct count sketch can summarize other values than the moments and
+    quantiles, such as the IDs of the rows; see update().
+    """
+
+    def __init__(self, k=200, p=12):
+        self.moments = Moments()
+        self.quantiles = QuantileSketch(k)
+        self.distinct = HyperLogLog(p)
+
+    def update(self, values, keys=None):
+        """Add an array of values. NaN values are ignored.
+
+        keys: Values to count distinct values of, if other than the values
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        self.moments.update(values)
+        self.quantiles.update(values)
+        self.distinct.update(values if keys is None else keys)
+
+    def merge(self, other):
+        """Add the values summarized by another Sketch."""
+        self.moments.merge(other.moments)
+        self.quantiles.merge(other.quantiles)
+        self.distinct.merge(other.distinct)
+
+    def encode(self):
+        """Return the sketch text."""
+        mom = self.moments
+        levels = self.quantiles.levels
+        return '|'.join([MAGIC, str(mom.n)]
+                        + [repr(v) for v in (mom.mean, mom.m2, mom.min,
+                                             mom.max)]
+                        + [str(self.quantiles.k),
+                           ','.join(str(items.size) for items in levels),
+                           _encodeBytes(np.concatenate(levels).astype(
+                               '<f8').tobytes()),
+                           str(self.distinct.p),
+                           _encodeBytes(self.distinct.registers.tobytes())])
+
+    @classmethod
+    def decode(cls, text):
+        """Return the sketch of a sketch text."""
+        fields = text.strip().split('|')
+        if len(fields) != 11 or fields[0] != MAGIC:
+            raise ValueError("tdstoSketch: Not a sketch text")
+        sketch = cls(int(fields[6]), int(fields[9]))
+        sketch.moments = Moments(*fields[1:6])
+        items = np.frombuffer(_decodeBytes(fields[8]), dtype='<f8')
+        sizes = [int(size) for size in fields[7].split(',')]
+        bounds = np.cumsum([0] + sizes)
+        sketch.quantiles.levels = [items[bounds[i]:bounds[i + 1]].astype(
+            np.float64) for i in range(len(sizes))]
+        sketch.quantiles.n = sketch.moments.n
+        sketch.distinct.registers = np.frombuffer(
+            _decodeBytes(fields[10]), dtype=np.uint8).copy()
+        return sketch
+
+
+def mergeTexts(texts):
+    """Return the Sketch that merges the sketches of an iterable of texts."""
+    merged = None
+    for text in texts:
+        sketch = Sketch.decode(text)
+        if merged is None:
+            merged = sketch
+        else:
+            merged.merge(sketch)
+    return merged
@@ -0,0 +1,462 @@
+################################################################################
+# The contents of this file are Teradata Public Content
+# and have been released to the Public Domain.
+# Licensed under BSD; see "license.txt" file for more information.
+# Copyright (c) 2023 by Teradata
+################################################################################
+#
+# R And Python Analytics with SCRIPT Table Operator
+# Orange Book supplementary material
+# Alexander Kolovos - October 2026 - v.2.6
+#
+# Shared module: Persistent pre-warmed scoring worker for a node
+# File     : tdstoWorker.py
+#
+# Every SCRIPT instance starts a new Python interpreter that imports numpy,
+# pandas, scikit-learn or statsmodels, and loads its model before it reads a
+# single row. For small partitions, this startup dominates the query time.
+# The present module offers an optional mode where a long-lived worker
+# process on each node holds the imports and loaded models, and serves the
+# scoring requests of the script instances over a Unix domain socket:
+# - The worker is a fork server. It imports the packages and preloads the
+#   models once, and then forks a child process for every connecting script
+#   instance. Children share the loaded models with the worker through the
+#   copy-on-write memory of the fork.
+# - The scoring scripts import this module before any heavy package. If the
+#   worker socket accepts a connection, then the script is a thin client that
+#   streams its standard input to the worker in blocks of complete rows, and
+#   relays the results to its standard output. If the worker is absent, then
+#   the script scores the rows in-process as usual.
+#
+# Supported scoring tasks: "ex1" (ex1pSco.py) and "ex3" (ex3pSco.py).
+#
+# Usage on a node, as the user that executes the SCRIPT Table Operator:
+#   tdpython3 tdstoWorker.py serve [--socket PATH] [--preload-ex1 MODELDIR]
+# where MODELDIR is the directory with the installed ex1 model files, and
+# PATH defaults to the TDSTO_WORKER_SOCKET environment variable value, or to
+# <tmpdir>/tdstoWorker-<uid>/worker.sock. Set TDSTO_WORKER_SOCKET to "off" in
+# the script environment to disable the worker mode.
+# The socket must reside in a private directory: The worker creates the
+# directory with mode 0700 and the socket with mode 0600. A script relays its
+# rows only if both the directory and the socket belong to its own user and
+# grant no access to other users; otherwise, it scores in-process.
+#
+# Local test with simulated AMPs: Run the script for N copies of an input
+# partition concurrently, first in-process and then through a worker, and
+# compare the results:
+#   python tdstoWorker.py simulate --script myDB/ex1pSco.py --input FILE
+#          [--amps N]
+#
+# Wire protocol: Each message is a 4-byte big-endian length and a payload.
+# The client sends a JSON header, then blocks of complete input rows, and an
+# empty block at the end. The worker answers every message with a status
+# byte ("+" for success, "-" for failure with an error text) and a payload
+# with the output rows.
+#
+# The client side uses only standard library modules. The worker requires
+# numpy, pandas, and the modules tdstoIO.py, tdstoModelCache.py,
+# tdstoForest.py, and tdstoGLM.py; scikit-learn for pickled ex1 models;
+# statsmodels for pickled ex3 models.
+#
+################################################################################
+
+import json
+import os
+import socket
+import stat
+import struct
+import sys
+import tempfile
+
+SOCKET_PATH = os.environ.get('TDSTO_WORKER_SOCKET',
+                             os.path.join(tempfile.gettempdir(),
+                                          'tdstoWorker-%d' % os.geteuid(),
+                                          'worker.sock'))
+BLOCK_BYTES = 1 << 20
+
+_lenFmt = struct.Struct('!I')
+
+
+def _sendMsg(sock, payload):
+    sock.sendall(_lenFmt.pack(len(payload)) + payload)
+
+
+def _recvExact(sock, nBytes):
+    buf = bytearray()
+    while len(buf) < nBytes:
+        part = sock.recv(nBytes - len(buf))
+        if not part:
+            raise EOFError("tdstoWorker: Connection closed")
+        buf += part
+    return bytes(buf)
+
+
+def _recvMsg(sock):
+    nBytes = _lenFmt.unpack(_recvExact(sock, _lenFmt.size))[0]
+    return _recvExact(sock, nBytes) if nBytes else b''
+
+
+def _recvReply(sock):
+    reply = _recvMsg(sock)
+    if reply[:1] != b'+':
+        raise RuntimeError("tdstoWorker: " +
+                           reply[1:].decode('utf-8', 'replace'))
+    return reply[1:]
+
+
+def _isPrivate(path, isType):
+    """True if path is of the type that isType() tests on its st_mode, is
+    owned by the effective user, and grants no access to group or others."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return False
+    return (isType(st.st_mode) and st.st_uid == os.geteuid()
+            and not st.st_mode & (stat.S_IRWXG | stat.S_IRWXO))
+
+
+def isPrivateSocket(socketPath):
+    """True if the socket and its directory belong to the effective user
+    only, so that no other user can have planted or replaced the socket."""
+    return (_isPrivate(os.path.dirname(os.path.abspath(socketPath)),
+                       stat.S_ISDIR)
+            and _isPrivate(socketPath, stat.S_ISSOCK))
+
+
+################################################################################
+# Client side (thin STO script)
+################################################################################
+
+def relay(task, header=None, stdin=None, stdout=None, socketPath=None,
+          blockBytes=BLOCK_BYTES):
+    """Score the script input through the node worker, if one is running.
+
+    task  : Name of the scoring task, such as 'ex1'
+    header: Dict of task arguments, sent to the worker with the request
+    Returns False, without reading any input, if no worker accepts the task.
+    In that case the script must score in-process. Returns True after all
+    input rows have been scored by the worker and the results written.
+    """
+    socketPath = SOCKET_PATH if socketPath is None else socketPath
+    if socketPath == 'off' or not isPrivateSocket(socketPath):
+        return False             # No worker, or not a trusted one
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socketPath)
+        request = dict(header or {}, task=task)
+        _sendMsg(sock, json.dumps(request).encode('utf-8'))
+        _recvReply(sock)
+    except (OSError, EOFError, RuntimeError):
+        sock.close()
+        return False             # Stale socket or task refused: in-process
+
+    stdin = sys.stdin.buffer if stdin is None else stdin
+    stdout = sys.stdout.buffer if stdout is None else stdout
+    with sock:
+        carry = b''
+        while True:
+            block = stdin.read(blockBytes)
+            if not block:
+                break
+            block = carry + block
+            cut = block.rfind(b'\n') + 1
+            carry = block[cut:]
+            if cut:
+                _sendMsg(sock, block[:cut])
+                stdout.write(_recvReply(sock))
+        if carry:                # Last row without a line end
+            _sendMsg(sock, carry + b'\n')
+            stdout.write(_recvReply(sock))
+        _sendMsg(sock, b'')      # End of input
+        stdout.write(_recvReply(sock))
+    stdout.flush()
+    return True
+
+
+################################################################################
+# Worker side: Scoring tasks
+################################################################################
+
+class _Ex1Task:
+    """Scoring of ex1pSco.py. Same model choice and output as the script."""
+
+    colNames = ['cust_id', 'tot_income', 'tot_age', 'tot_cust_years',
+                'tot_children', 'female_ind',
+                'single_ind', 'married_ind', 'separated_ind',
+                'ca_resident_ind', 'ny_resident_ind', 'tx_resident_ind',
+                'il_resident_ind', 'az_resident_ind', 'oh_resident_ind',
+                'ck_acct_ind', 'sv_acct_ind', 'cc_acct_ind',
+                'ck_avg_bal', 'sv_avg_bal', 'cc_avg_bal', 'ck_avg_tran_amt',
+                'sv_avg_tran_amt', 'cc_avg_tran_amt', 'q1_trans_cnt',
+                'q2_trans_cnt', 'q3_trans_cnt', 'q4_trans_cnt']
+    floatCols = ['tot_income', 'ck_avg_bal', 'sv_avg_bal', 'cc_avg_bal',
+                 'ck_avg_tran_amt', 'sv_avg_tran_amt', 'cc_avg_tran_amt']
+    predictor_columns = ["tot_income", "tot_age", "tot_cust_years",
+                         "tot_children", "female_ind", "single_ind",
+                         "married_ind", "separated_ind", "ck_acct_ind",
+                         "sv_acct_ind", "ck_avg_bal", "sv_avg_bal",
+                         "ck_avg_tran_amt", "sv_avg_tran_amt", "q1_trans_cnt",
+                         "q2_trans_cnt", "q3_trans_cnt", "q4_trans_cnt"]
+
+    def __init__(self):
+        import tdstoIO
+        self.schema = tdstoIO.StoSchema(
+            self.colNames,
+            {name: (tdstoIO.FLOAT if name in self.floatCols else tdstoIO.INT)
+             for name in self.colNames},
+            useCols=['cust_id', 'cc_acct_ind'] + self.predictor_columns)
+        self.models = {}
+
+    def loadModel(self, modelDir):
+        """Return the model of a model directory, loading it if needed."""
+        import tdstoModelCache
+        import tdstoForest
+        forestFile = os.path.join(modelDir, 'ex1pForest.npz')
+        if os.path.exists(forestFile):
+            path, decode = forestFile, tdstoForest.decodeForest
+        else:
+            path = os.path.join(modelDir, 'ex1pMod.out')
+            decode = tdstoModelCache.decodeB64Pickle
+        st = os.stat(path)
+        key = (path, st.st_size, st.st_mtime_ns)
+        if key not in self.models:
+            self.models[key] = tdstoModelCache.loadModel(path, decode)
+        return self.models[key]
+
+    def start(self, header):
+        return {'model': self.loadModel(header['modelDir'])}
+
+    def score(self, state, block, writer):
+        if not block:
+            return
+        dfToScore = self.schema.parse(block)
+        if dfToScore.empty:
+            return
+        PredictionProba = state['model'].predict_proba(
+            dfToScore[self.predictor_columns])
+        writer.writeColumns(dfToScore['cust_id'],
+                            PredictionProba[:, 0], PredictionProba[:, 1],
+                            dfToScore['cc_acct_ind'])
+
+
+class _Ex3Task:
+    """Scoring of ex3pSco.py. The model arrives with the first input row."""
+
+    colNames = ['p_id', 'x1', 'x2', 'x3', 'x4', 'x5', 'y']
+
+    def __init__(self):
+        import tdstoIO
+        self.schema = tdstoIO.StoSchema(
+            self.colNames, {'p_id': tdstoIO.INT},
+            useCols=['x1', 'x2', 'x3', 'x4', 'x5'])
+
+    def start(self, header):
+        return {'model': None, 'noData': False}
+
+    def readFirstRow(self, state, line):
+        """Get the model and the values of the first input row."""
+        import tdstoGLM
+        allArgs = line.split('\t')
+        allNum = [float(x.replace(" ", "")) for x in allArgs[0:7]]
+        state['p_id'] = allArgs[0]
+        state['rowToScore'] = allNum[1:6]
+        state['model'] = tdstoGLM.loadScorer(allArgs[8])
+
+    def score(self, state, block, writer):
+        import numpy as np
+        if state['noData']:
+            return
+        if state['model'] is None:
+            if not block:
+                return
+            line, _, block = block.partition(b'\n')
+            line = line.decode('utf-8').rstrip('\r')
+            # If the first row of data is blank, the AMP has no data.
+            if line == '':
+                state['noData'] = True
+                return
+            self.readFirstRow(state, line)
+        dfToScore = self.schema.parse(block)
+        # The first scored block also includes the first row with the model.
+        # At the end of the input, score that row alone if no block came,
+        # like ex3pSco.py does for a partition with the first row only.
+        nFirst = 0 if state['rowToScore'] is None else 1
+        nRows = nFirst + dfToScore.shape[0]
+        if nRows == 0:
+            return
+        X = np.empty((nRows, len(state['model'].columns)),
+                     order='F')
+        X[:, 0] = 1.0
+        if nFirst:
+            X[0, 1:] = state['rowToScore']
+            state['rowToScore'] = None
+        X[nFirst:, 1:] = dfToScore.to_numpy(dtype=np.float64)
+        predicted = state['model'].predict(X)
+        writer.writeColumns(state['p_id'], predicted,
+                            X[:, 1], X[:, 2], X[:, 3], X[:, 4], X[:, 5])
+
+
+def _makeTasks():
+    import tdstoGLM                # Compact ex3 models need numpy only
+    tasks = {'ex1': _Ex1Task(), 'ex3': _Ex3Task()}
+    try:
+        import statsmodels.api     # Pre-warm the pickled ex3 model package
+    except ImportError:
+        pass
+    return tasks
+
+
+################################################################################
+# Worker side: Fork server
+################################################################################
+
+def _handle(conn, tasks):
+    """Serve one script instance on a connection. Runs in a forked child."""
+    import io
+    import tdstoIO
+    try:
+        header = json.loads(_recvMsg(conn).decode('utf-8'))
+        task = tasks[header['task']]
+        state = task.start(header)
+    except Exception as err:
+        _sendMsg(conn, b'-' + repr(err).encode('utf-8'))
+        return
+    _sendMsg(conn, b'+')
+    while True:
+        block = _recvMsg(conn)
+        out = io.BytesIO()
+        try:
+            task.score(state, block, tdstoIO.StoWriter(out))
+        except Exception as err:
+            _sendMsg(conn, b'-' + repr(err).encode('utf-8'))
+            return
+        _sendMsg(conn, b'+' + out.getvalue())
+        if not block:
+            return
+
+
+def serve(socketPath=None, preloadEx1=None):
+    """Run the fork server on a Unix domain socket until interrupted."""
+    import signal
+    import warnings
+    warnings.filterwarnings("ignore")
+    socketPath = SOCKET_PATH if socketPath is None else socketPath
+    tasks = _makeTasks()
+    for modelDir in preloadEx1 or []:
+        tasks['ex1'].loadModel(os.path.realpath(modelDir))
+
+    # Only the STO user may reach the socket: Create it with mode 0600 in a
+    # directory with mode 0700, both without a window of wider permissions
+    socketDir = os.path.dirname(os.path.abspath(socketPath))
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    oldMask = os.umask(0o077)
+    try:
+        os.makedirs(socketDir, 0o700, exist_ok=True)
+        if not _isPrivate(socketDir, stat.S_ISDIR):
+            sys.exit("tdstoWorker: Socket directory %s must be owned by the "
+                     "present user with mode 0700" % socketDir)
+        if os.path.lexists(socketPath):
+            os.remove(socketPath)
+        server.bind(socketPath)
+    finally:
+        os.umask(oldMask)
+    server.listen(128)
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)     # Reap children
+    print("tdstoWorker: Serving tasks", sorted(tasks), "on", socketPath,
+          file=sys.stderr, flush=True)
+    try:
+        while True:
+            try:
+                conn, _ = server.accept()
+            except InterruptedError:
+                continue
+            pid = os.fork()
+            if pid == 0:                                  # Child
+                server.close()
+                try:
+                    _handle(conn, tasks)
+                finally:
+                    conn.close()
+                    os._exit(0)
+            conn.close()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        if os.path.exists(socketPath):
+            os.remove(socketPath)
+
+
+################################################################################
+# Local simulation with several AMP clients
+################################################################################
+
+def simulate(script, inputFile, nAmps=4, socketPath=None):
+    """Run a script for nAmps copies of an input partition concurrently, once
+    in-process and once through a worker, and compare the results."""
+    import subprocess
+    import time
+    socketPath = (os.path.join(tempfile.mkdtemp(), 'tdstoWorker.sock')
+                  if socketPath is None else socketPath)
+    # Every simulated AMP receives the whole input file as its partition
+    with open(inputFile, 'rb') as fIn:
+        parts = [fIn.read()] * nAmps
+
+    def runAll(env):
+        t0 = time.perf_counter()
+        procs = [subprocess.Popen([sys.executable, script],
+                                  stdin=subprocess.PIPE,
+                                  stdout=subprocess.PIPE, env=env)
+                 for _ in parts]
+        outs = [proc.communicate(part)[0] for proc, part in zip(procs, parts)]
+        return time.perf_counter() - t0, outs
+
+    envOff = dict(os.environ, TDSTO_WORKER_SOCKET='off')
+    envOn = dict(os.environ, TDSTO_WORKER_SOCKET=socketPath)
+    secsOff, outsOff = runAll(envOff)
+    worker = subprocess.Popen([sys.executable, os.path.abspath(__file__),
+                               'serve', '--socket', socketPath,
+                               '--preload-ex1',
+                               os.path.dirname(os.path.abspath(script))],
+                              env=envOff)
+    while not os.path.exists(socketPath):
+        if worker.poll() is not None:
+            sys.exit("tdstoWorker: Worker failed to start")
+        time.sleep(0.05)
+    try:
+        secsOn, outsOn = runAll(envOn)
+    finally:
+        worker.terminate()
+        worker.wait()
+    same = all(sorted(a.splitlines()) == sorted(b.splitlines())
+               for a, b in zip(outsOff, outsOn))
+    nRows = sum(len(out.splitlines()) for out in outsOff)
+    print("AMPs:", nAmps, " Output rows:", nRows)
+    print("In-process: %.3f s   Worker: %.3f s   Same results: %s"
+          % (secsOff, secsOn, same))
+    return same
+
+
+if __name__ == '__main__':
+    import argparse
+    # The worker finds the other shared modules next to the present file
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description="Persistent STO scoring "
+                                     "worker for a node.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    pServe = sub.add_parser('serve', help="Run the worker")
+    pServe.add_argument('--socket', default=SOCKET_PATH)
+    pServe.add_argument('--preload-ex1', action='append', default=[],
+                        metavar='MODELDIR',
+                        help="Directory with the ex1 model files to preload")
+    pSim = sub.add_parser('simulate', help="Compare in-process and worker "
+                          "scoring for simulated AMP clients")
+    pSim.add_argument('--script', required=True)
+    pSim.add_argument('--input', required=True,
+                      help="Tab-delimited input partition of the script")
+    pSim.add_argument('--amps', type=int, default=4)
+    args = parser.parse_args()
+    if args.command == 'serve':
+        serve(args.socket, args.preload_ex1)
+    else:
+        sys.exit(0 if simulate(args.script, args.input, args.amps) else 1)
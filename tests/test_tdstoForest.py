@@ -0,0 +1,95 @@
+################################################################################
+# The contents of this file are Teradata Public Content
+# and have been released to the Public Domain.
+# Licensed under BSD; see "license.txt" file for more information.
+# Copyright (c) 2023 by Teradata
+################################################################################
+#
+# R And Python Analytics with SCRIPT Table Operator
+# Orange Book supplementary material
+# Alexander Kolovos - October 2026 - v.2.6
+#
+# Tests of the numpy forest scoring of the shared module tdstoForest.py
+# against scikit-learn
+# File     : test_tdstoForest.py
+#
+# Usage: python -m pytest tests
+#
+# Requires pytest, numpy, and scikit-learn add-on packages.
+#
+################################################################################
+
+import io
+import os
+import sys
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'scripts'))
+import tdstoForest
+
+ensemble = pytest.importorskip('sklearn.ensemble')
+
+
+def _forest():
+    rng = np.random.default_rng(6)
+    X = rng.normal(0, 1, (2000, 5)) * [1., 10., 100., 1e3, 1e-3]
+    y = (X[:, 0] + X[:, 1] / 10. + rng.normal(0, 1, 2000) > 0).astype(int)
+    classifier = ensemble.RandomForestClassifier(n_estimators=10,
+                                                 random_state=0).fit(X, y)
+    return X, classifier
+
+
+def _thresholdRows(X, classifier):
+    """Return rows with a split feature set at the threshold of the split,
+    at the float32 value of the threshold, and at the float64 neighbor of
+    the threshold whose float32 value is on the other side of it. Also
+    return the number of such crossing rows."""
+    rng = np.random.default_rng(7)
+    rows = []
+    nCrossing = 0
+    for estimator in classifier.estimators_:
+        tree = estimator.tree_
+        for node in np.flatnonzero(tree.children_left != -1)[:40]:
+            f = tree.feature[node]
+            t = tree.threshold[node]
+            t32 = float(np.float32(t))
+            values = [t, t32]
+            # The float64 neighbor of t on the side away from its float32
+            # value compares differently in float64 and in float32
+            side = np.inf if t32 < t else -np.inf
+            neighbor = np.nextafter(t, side)
+            if (neighbor <= t) != (np.float32(neighbor) <= t):
+                values.append(neighbor)
+                nCrossing += 1
+            for value in values:
+                row = X[rng.integers(X.shape[0])].copy()
+                row[f] = value
+                rows.append(row)
+    return np.array(rows), nCrossing
+
+
+def test_predict_proba_matches_scikit_learn():
+    X, classifier = _forest()
+    forest = tdstoForest.StoForest.fromClassifier(
+        classifier, ['x%d' % i for i in range(X.shape[1])])
+    rows, nCrossing = _thresholdRows(X, classifier)
+    assert nCrossing > 0
+    X = np.vstack([X, rows])
+    np.testing.assert_array_equal(forest.apply(X) - forest.roots,
+                                  classifier.apply(X))
+    np.testing.assert_array_equal(forest.predict_proba(X),
+                                  classifier.predict_proba(X))
+    np.testing.assert_array_equal(forest.predict(X), classifier.predict(X))
+
+
+def test_save_load_round_trip():
+    X, classifier = _forest()
+    forest = tdstoForest.StoForest.fromClassifier(
+        classifier, ['x%d' % i for i in range(X.shape[1])])
+    fileOut = io.BytesIO()
+    forest.save(fileOut)
+    loaded = tdstoForest.decodeForest(fileOut.getvalue())
+    np.testing.assert_array_equal(loaded.predict_proba(X),
+                                  forest.predict_proba(X))
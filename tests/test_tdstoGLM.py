@@ -0,0 +1,94 @@
+################################################################################
+# The contents of this file are Teradata Public Content
+# and have been released to the Public Domain.
+# Licensed under BSD; see "license.txt" file for more information.
+# Copyright (c) 2023 by Teradata
+################################################################################
+#
+# R And Python Analytics with SCRIPT Table Operator
+# Orange Book supplementary material
+# Alexander Kolovos - October 2026 - v.2.6
+#
+# Tests of the streaming IRLS fit of the shared module tdstoGLM.py against
+# the statsmodels GLM fit, on the data of "ex3dataMiniFit.csv"
+# File     : test_tdstoGLM.py
+#
+# Usage: python -m pytest tests
+#
+# Requires pytest, numpy, pandas, and statsmodels add-on packages.
+#
+################################################################################
+
+import os
+import subprocess
+import sys
+import numpy as np
+import pytest
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           '..', 'scripts')
+DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         '..', 'data', 'ex3dataMiniFit.csv')
+sys.path.insert(0, SCRIPTS_DIR)
+import tdstoGLM
+
+sm = pytest.importorskip('statsmodels.api')
+
+COLUMNS = ['Intercept', 'x1', 'x2', 'x3', 'x4', 'x5']
+# Both fits stop at the same deviance change, so the results agree to about
+# the rounding of the weighted least squares solutions
+RTOL = 1e-9
+
+
+def _products():
+    """Yield the product ID, design matrix, and responses of every product
+    of the ex3dataMiniFit table."""
+    data = np.loadtxt(DATA_FILE, delimiter=',')
+    for pid in np.unique(data[:, 0]):
+        rows = data[data[:, 0] == pid]
+        X = np.column_stack([np.ones(rows.shape[0]), rows[:, 1:6]])
+        yield int(pid), X, rows[:, 6]
+
+
+def _statsmodelsFit(X, y):
+    return sm.GLM(y, X, family=sm.families.Binomial()).fit()
+
+
+@pytest.mark.parametrize('chunkRows', [None, 137])
+def test_irls_matches_statsmodels_in_memory(chunkRows):
+    for pid, X, y in _products():
+        nRows = X.shape[0] if chunkRows is None else chunkRows
+
+        def passData():
+            for start in range(0, X.shape[0], nRows):
+                yield X[start:start + nRows], y[start:start + nRows]
+
+        model = tdstoGLM.fitLogitIRLS(passData, COLUMNS)
+        result = _statsmodelsFit(X, y)
+        np.testing.assert_allclose(model.params, result.params, rtol=RTOL)
+        np.testing.assert_allclose(model.cov_params(), result.cov_params(),
+                                   rtol=RTOL)
+
+
+def test_irls_matches_statsmodels_through_ex3pFit_stream():
+    # A memory limit of 1 byte keeps the chunks at the smallest size, so that
+    # the spool is read in several chunks per pass.
+    env = dict(os.environ, TDSTO_SCRIPT_MEM_LIMIT='1',
+               TDSTO_WORKER_SOCKET='off')
+    for pid, X, y in _products():
+        lines = ''.join('%d\t%s\t%r\n'
+                        % (pid, '\t'.join(repr(v) for v in row[1:]), yi)
+                        for row, yi in zip(X.tolist(), y.tolist()))
+        out = subprocess.run(
+            [sys.executable, os.path.join(SCRIPTS_DIR, 'ex3pFit.py'),
+             '--stream', '--cov'], input=lines.encode('utf-8'),
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env,
+            check=True).stdout.decode('utf-8')
+        fields = out.split('\t')
+        assert float(fields[0]) == pid
+        model = tdstoGLM.loadModel(fields[1])
+        result = _statsmodelsFit(X, y)
+        assert model.columns == COLUMNS
+        np.testing.assert_allclose(model.params, result.params, rtol=RTOL)
+        np.testing.assert_allclose(model.cov_params(), result.cov_params(),
+                                   rtol=RTOL)
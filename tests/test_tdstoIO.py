@@ -0,0 +1,88 @@
+################################################################################
+# The contents of this file are Teradata Public Content
+# and have been released to the Public Domain.
+# Licensed under BSD; see "license.txt" file for more information.
+# Copyright (c) 2023 by Teradata
+################################################################################
+#
+# R And Python Analytics with SCRIPT Table Operator
+# Orange Book supplementary material
+# Alexander Kolovos - October 2026 - v.2.6
+#
+# Tests of the input parsing and chunk sizing of the shared module tdstoIO.py
+# File     : test_tdstoIO.py
+#
+# Usage: python -m pytest tests
+#
+# Requires pytest, numpy, and pandas add-on packages.
+#
+################################################################################
+
+import io
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'scripts'))
+import tdstoIO
+
+
+def test_sci_blanks_in_numeric_columns():
+    schema = tdstoIO.StoSchema(['id', 'x'], {'id': tdstoIO.INT})
+    df = schema.parse(b'1\t1 E002\n2\t1.5E 02\n3\t-2.5e -1\n')
+    assert df['x'].tolist() == [100.0, 150.0, -0.25]
+
+
+def test_sci_blanks_keep_text_columns():
+    schema = tdstoIO.StoSchema(['id', 'name', 'x'],
+                               {'id': tdstoIO.INT, 'name': tdstoIO.STR})
+    df = schema.parse(b'1\tStore 5 E 2\t1 E002\n2\tAisle 3e 4\t7\n')
+    assert df['name'].tolist() == ['Store 5 E 2', 'Aisle 3e 4']
+    assert df['x'].tolist() == [100.0, 7.0]
+    assert df['id'].tolist() == [1, 2]
+
+
+def test_int_column_with_null_is_float():
+    schema = tdstoIO.StoSchema(['id', 'n'], {'id': tdstoIO.INT,
+                                             'n': tdstoIO.INT})
+    df = schema.parse(b'1\t4\n2\t\n')
+    assert df['id'].dtype == np.int64
+    assert df['n'].dtype == np.float64
+    assert df['n'][0] == 4.0 and np.isnan(df['n'][1])
+
+
+def _chunk(nRows, nRowsAsked):
+    df = pd.DataFrame({'x': np.zeros(nRows)})
+    df.attrs['nRowsAsked'] = nRowsAsked
+    return df
+
+
+def test_sizer_spent_budget_keeps_min_rows(capsys):
+    sizer = tdstoIO.StoChunkSizer(memLimit=1 << 20)
+    assert sizer.nRows == 500
+    assert sizer.update(_chunk(500, 500), secs=0.01) == 500
+    assert sizer.update(_chunk(500, 500), secs=0.01) == 500
+    assert capsys.readouterr().err.count('Memory budget') == 1
+
+
+def test_sizer_grows_on_chunk_read_ahead_at_old_size():
+    sizer = tdstoIO.StoChunkSizer(memLimit=8 << 30, initRows=1000)
+    assert sizer.update(_chunk(1000, 1000), secs=0.01) == 2000
+    # Read ahead with the size of 1000 rows before the growth
+    assert sizer.update(_chunk(1000, 1000), secs=0.01) == 4000
+    # Short last chunk
+    assert sizer.update(_chunk(10, 4000), secs=0.01) == 4000
+
+
+def test_prefetch_chunks_carry_asked_rows():
+    # A chunk read ahead may have the size asked before the latest call
+    schema = tdstoIO.StoSchema(['x'], {})
+    reader = tdstoIO.StoPrefetchReader(schema,
+                                       stream=io.BytesIO(b'1\n' * 3500))
+    chunks = [reader.getChunk(n) for n in (1000, 2000, 4000)]
+    assert chunks[0].attrs['nRowsAsked'] == 1000
+    assert chunks[1].attrs['nRowsAsked'] in (1000, 2000)
+    assert all(df.shape[0] == df.attrs['nRowsAsked'] for df in chunks[:2])
+    assert chunks[2].shape[0] < chunks[2].attrs['nRowsAsked']
@@ -0,0 +1,65 @@
+################################################################################
+# The contents of this file are Teradata Public Content
+# and have been released to the Public Domain.
+# Licensed under BSD; see "license.txt" file for more information.
+# Copyright (c) 2023 by Teradata
+################################################################################
+#
+# R And Python Analytics with SCRIPT Table Operator
+# Orange Book supplementary material
+# Alexander Kolovos - October 2026 - v.2.6
+#
+# Tests of the blocked silhouette coefficients of the shared module
+# tdstoSilhouette.py against scikit-learn
+# File     : test_tdstoSilhouette.py
+#
+# Usage: python -m pytest tests
+#
+# Requires pytest, numpy, and scikit-learn add-on packages.
+#
+################################################################################
+
+import os
+import sys
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'scripts'))
+import tdstoSilhouette
+
+metrics = pytest.importorskip('sklearn.metrics')
+
+
+def _clusters():
+    """Return 3000 observations in 4 clusters and 3 single-member
+    clusters."""
+    rng = np.random.default_rng(8)
+    centers = np.array([[0., 0.], [5., 0.], [0., 5.], [5., 5.]])
+    labels = rng.integers(0, 4, 3000)
+    X = centers[labels] + rng.normal(0, 1.5, (3000, 2))
+    for label, row in zip((10, 11, 12), (5, 1500, 2999)):
+        labels[row] = label
+    return X, labels
+
+
+@pytest.mark.parametrize('bufferMB', [0, 1])
+def test_silhouette_samples_match_scikit_learn(bufferMB):
+    # A buffer of 1 MB holds the distances of 43 observations to all 3000,
+    # and with 0 MB every block is a single observation.
+    X, labels = _clusters()
+    coeffs = tdstoSilhouette.silhouetteSamples(X, labels, bufferMB=bufferMB)
+    expected = metrics.silhouette_samples(X, labels)
+    np.testing.assert_allclose(coeffs, expected, rtol=1e-9, atol=1e-12)
+    assert np.all(coeffs[[5, 1500, 2999]] == 0.0)
+    coeffs, score = tdstoSilhouette.silhouetteScore(X, labels, bufferMB)
+    assert np.isclose(score, metrics.silhouette_score(X, labels), rtol=1e-9)
+
+
+def test_silhouette_samples_of_rows():
+    X, labels = _clusters()
+    rows = np.arange(0, 3000, 7)
+    coeffs = tdstoSilhouette.silhouetteSamples(X, labels, rows, bufferMB=1)
+    np.testing.assert_allclose(coeffs,
+                               metrics.silhouette_samples(X, labels)[rows],
+                               rtol=1e-9, atol=1e-12)
@@ -0,0 +1,111 @@
+################################################################################
+# The contents of this file are Teradata Public Content
+# and have been released to the Public Domain.
+# Licensed under BSD; see "license.txt" file for more information.
+# Copyright (c) 2023 by Teradata
+################################################################################
+#
+# R And Python Analytics with SCRIPT Table Operator
+# Orange Book supplementary material
+# Alexander Kolovos - October 2026 - v.2.6
+#
+# Tests of the mergeable sketches of the shared module tdstoSketch.py
+# File     : test_tdstoSketch.py
+#
+# Usage: python -m pytest tests
+#
+# Requires pytest and numpy add-on packages.
+#
+################################################################################
+
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'scripts'))
+# The quantile sketch draws its random numbers from a generator seeded at
+# import time
+os.environ['TDSTO_RANDOM_SEED'] = '20260101'
+import tdstoSketch
+
+# Documented accuracy: KLL rank error with k = 200, and HyperLogLog standard
+# error with p = 12
+KLL_RANK_ERROR = 0.017
+HLL_STD_ERROR = 1.04 / np.sqrt(1 << 12)
+
+
+def _parts(values, nParts, rng):
+    """Split values into nParts uneven parts, like the rows of the AMPs."""
+    cuts = np.sort(rng.integers(0, values.size, nParts - 1))
+    return np.split(values, cuts)
+
+
+def _merged(values, nParts, rng, keys=None):
+    """Return the sketch of values summarized in parts and merged."""
+    sketches = []
+    for idx in _parts(np.arange(values.size), nParts, rng):
+        sketch = tdstoSketch.Sketch()
+        sketch.update(values[idx], keys=None if keys is None else keys[idx])
+        sketches.append(sketch.encode())
+    return tdstoSketch.mergeTexts(sketches)
+
+
+def test_encode_decode_round_trip():
+    rng = np.random.default_rng(1)
+    sketch = tdstoSketch.Sketch()
+    sketch.update(rng.lognormal(3, 1, 20000), keys=rng.integers(0, 5000,
+                                                                 20000))
+    text = sketch.encode()
+    assert '\t' not in text and '\n' not in text
+    decoded = tdstoSketch.Sketch.decode(text)
+    assert decoded.encode() == text
+    assert vars(decoded.moments) == vars(sketch.moments)
+    probs = np.linspace(0, 1, 11)
+    assert np.array_equal(decoded.quantiles.quantiles(probs),
+                          sketch.quantiles.quantiles(probs))
+    assert decoded.distinct.count() == sketch.distinct.count()
+
+
+def test_merged_moments_equal_single_pass():
+    rng = np.random.default_rng(2)
+    values = rng.normal(1000, 250, 100000)
+    single = tdstoSketch.Moments()
+    single.update(values)
+    merged = _merged(values, 8, rng).moments
+    assert merged.n == single.n == values.size
+    assert merged.min == single.min == values.min()
+    assert merged.max == single.max == values.max()
+    assert np.isclose(merged.mean, single.mean, rtol=1e-12)
+    assert np.isclose(merged.m2, single.m2, rtol=1e-10)
+    assert np.isclose(merged.variance(), np.var(values, ddof=1), rtol=1e-10)
+
+
+def test_quantile_rank_error_within_bound():
+    rng = np.random.default_rng(3)
+    values = rng.exponential(100, 200000)
+    sortedValues = np.sort(values)
+    probs = np.linspace(0.01, 0.99, 99)
+    estimates = _merged(values, 8, rng).quantiles.quantiles(probs)
+    ranks = np.searchsorted(sortedValues, estimates, side='right')
+    assert np.all(np.abs(ranks / values.size - probs) <= KLL_RANK_ERROR)
+
+
+def test_quantiles_exact_up_to_k_values():
+    values = np.random.default_rng(4).normal(0, 1, 200)
+    sketch = tdstoSketch.Sketch()
+    sketch.update(values)
+    probs = np.linspace(0.05, 0.95, 19)
+    assert np.array_equal(sketch.quantiles.quantiles(probs),
+                          np.quantile(values, probs, method='inverted_cdf'))
+
+
+def test_distinct_count_within_standard_errors():
+    rng = np.random.default_rng(5)
+    for nDistinct in (300, 50000):
+        keys = rng.integers(0, 1 << 40, nDistinct)
+        keys = keys[rng.integers(0, nDistinct, 4 * nDistinct)]
+        values = rng.normal(0, 1, keys.size)
+        count = _merged(values, 8, rng, keys).distinct.count()
+        trueCount = np.unique(keys).size
+        assert abs(count - trueCount) <= 3 * HLL_STD_ERROR * trueCount